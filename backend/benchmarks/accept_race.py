@@ -0,0 +1,90 @@
+"""
+Stress test: simultaneous accepts of the same ride
+Each round requests a ride and fires ACCEPTS_PER_RIDE accepts from different
+pullers at once, then checks exactly one winner, every loser got a 400, the
+database agrees with the winner and no accept took longer than the budget.
+Exits 1 on any violation (pass DATABASE_URL via BENCH_DATABASE_URL to run
+it against Postgres)
+"""
+import asyncio
+import sys
+import time
+import httpx
+from benchmarks.common import SessionLocal, percentile, reset_database, seed_locations, seed_pullers
+from main import app
+from models.db_models import Puller, PullerStatus, Ride, RideStatus
+
+ROUNDS = 20
+ACCEPTS_PER_RIDE = 100
+LATENCY_BUDGET_MS = 2000
+
+
+async def accept(client, ride_id, puller_id):
+    start = time.perf_counter()
+    response = await client.post(f"/api/pullers/{ride_id}/accept", params={"puller_id": puller_id})
+    return puller_id, response.status_code, (time.perf_counter() - start) * 1000
+
+
+def check_database(ride_id, winner):
+    """Ride assigned to the winner, and only the winner marked busy"""
+    db = SessionLocal()
+    try:
+        ride = db.query(Ride).filter(Ride.ride_id == ride_id).first()
+        busy = [p.puller_id for p in db.query(Puller).filter(Puller.status == PullerStatus.BUSY)]
+        errors = []
+        if ride.status != RideStatus.PULLER_ASSIGNED or ride.puller_id != winner:
+            errors.append(f"ride is {ride.status.name} for {ride.puller_id}, winner was {winner}")
+        if busy != [winner]:
+            errors.append(f"busy pullers {busy}, expected [{winner}]")
+        # Free the winner for the next round
+        db.query(Puller).filter(Puller.status == PullerStatus.BUSY).update({Puller.status: PullerStatus.AVAILABLE})
+        db.commit()
+        return errors
+    finally:
+        db.close()
+
+
+async def run():
+    reset_database()
+    db = SessionLocal()
+    seed_locations(db)
+    puller_ids = seed_pullers(db, ACCEPTS_PER_RIDE)
+    db.close()
+
+    failures = []
+    latencies = []
+    transport = httpx.ASGITransport(app=app)
+    async with app.router.lifespan_context(app):
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=30) as client:
+            for round_no in range(ROUNDS):
+                response = await client.post("/api/rides/request", json={
+                    "user_id": f"user_race{round_no:03d}", "pickup_location": "CUET", "destination": "Pahartoli"
+                })
+                ride_id = response.json()["ride_id"]
+
+                results = await asyncio.gather(*(accept(client, ride_id, pid) for pid in puller_ids))
+                latencies.extend(ms for _, _, ms in results)
+                winners = [pid for pid, status, _ in results if status == 200]
+                unexpected = sorted({status for _, status, _ in results if status not in (200, 400)})
+
+                if len(winners) != 1:
+                    failures.append(f"{ride_id}: {len(winners)} winners")
+                if unexpected:
+                    failures.append(f"{ride_id}: unexpected status codes {unexpected}")
+                if len(winners) == 1:
+                    failures.extend(f"{ride_id}: {error}" for error in check_database(ride_id, winners[0]))
+
+    worst = max(latencies)
+    print(f"{ROUNDS} rounds x {ACCEPTS_PER_RIDE} simultaneous accepts")
+    print(f"p50 {percentile(latencies, 50):.1f}ms  p99 {percentile(latencies, 99):.1f}ms  max {worst:.1f}ms")
+    if worst > LATENCY_BUDGET_MS:
+        failures.append(f"slowest accept took {worst:.0f}ms (budget {LATENCY_BUDGET_MS}ms)")
+
+    for failure in failures:
+        print(f"FAIL  {failure}")
+    print("OK" if not failures else f"{len(failures)} failure(s)")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(run()))
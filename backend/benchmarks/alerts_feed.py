@@ -0,0 +1,59 @@
+"""
+Benchmark: puller alerts feed (GET /api/pullers/{puller_id}/alerts)
+Reports SQL statements per request, latency and response size at
+10/100/1000 pending rides, for full polls and for unchanged ?since= polls
+"""
+from benchmarks.common import (
+    QueryCounter, SessionLocal, percentile, reset_database, seed_locations,
+    seed_pending_rides, seed_pullers, timed
+)
+from fastapi.testclient import TestClient
+from main import app
+from services.alert_service import ALERT_TOP_K
+
+# Pending backlog size -> number of timed requests (rides expire after 60s)
+BACKLOG_SIZES = {10: 200, 100: 200, 1000: 50}
+
+
+def measure(client, url, params, request_count, check):
+    latencies = []
+    with QueryCounter() as counter:
+        for _ in range(request_count):
+            response, elapsed = timed(client.get, url, params=params)
+            assert response.status_code == 200
+            check(response.json())
+            latencies.append(elapsed)
+    return (counter.count / request_count, percentile(latencies, 50),
+            percentile(latencies, 99), len(response.content))
+
+
+def run():
+    print(f"{'pending':>8} {'poll':>6} {'queries/req':>12} {'p50 ms':>8} {'p99 ms':>8} {'bytes':>8}")
+    for size, request_count in BACKLOG_SIZES.items():
+        # Seeded before the app starts - its startup loads the feed, and its
+        # background jobs never see the tables being dropped
+        reset_database()
+        db = SessionLocal()
+        seed_locations(db)
+        puller_id = seed_pullers(db, 1)[0]
+        seed_pending_rides(db, size, age_seconds=0)
+        db.close()
+
+        with TestClient(app) as client:
+            # Warm up connection pool and caches
+            url = f"/api/pullers/{puller_id}/alerts"
+            cursor = client.get(url).json()["cursor"]
+
+            def full(body):
+                assert 0 < len(body["alerts"]) <= min(size, ALERT_TOP_K)
+
+            def unchanged(body):
+                assert not (body["added"] or body["changed"] or body["removed"])
+
+            for label, params, check in (("full", None, full), ("delta", {"since": cursor}, unchanged)):
+                queries, p50, p99, size_bytes = measure(client, url, params, request_count, check)
+                print(f"{size:>8} {label:>6} {queries:>12.1f} {p50:>8.2f} {p99:>8.2f} {size_bytes:>8}")
+
+
+if __name__ == "__main__":
+    run()
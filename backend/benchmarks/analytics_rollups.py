@@ -0,0 +1,63 @@
+"""
+Benchmark: admin analytics from rides vs from daily rollups
+Times the per-route/status aggregate straight over a year of rides against
+summing the rollup tables (all time and last 30 days), checks both agree, and
+reports the one-off backfill and the recurring compaction cost
+"""
+from datetime import datetime, timedelta
+from sqlalchemy import func
+from benchmarks.common import QueryCounter, SessionLocal, percentile, reset_database, seed_pullers, timed
+from benchmarks.query_plans import seed_rides
+from models.db_models import Ride, User
+from services.analytics_rollups import AnalyticsRollups, summarize
+
+RIDE_COUNTS = (100_000, 500_000)
+REPEATS = 10
+
+
+def scan_rides(db, since=None):
+    """What analytics costs without rollups - GROUP BY over the rides themselves"""
+    query = db.query(Ride.pickup, Ride.destination, Ride.status, func.count(), func.sum(Ride.points_awarded))
+    if since is not None:
+        query = query.filter(Ride.requested_at >= since)
+    return query.group_by(Ride.pickup, Ride.destination, Ride.status).all()
+
+
+def measure(fn, *args):
+    latencies = []
+    with QueryCounter() as counter:
+        for _ in range(REPEATS):
+            result, elapsed = timed(fn, *args)
+            latencies.append(elapsed)
+    return result, percentile(latencies, 50), counter.count / REPEATS
+
+
+def run():
+    print(f"{'rides':>8} {'range':>8} {'scan ms':>9} {'rollup ms':>10} {'stmts':>6} {'match':>6}")
+    for count in RIDE_COUNTS:
+        reset_database()
+        db = SessionLocal()
+        puller_ids = seed_pullers(db, 200)
+        db.add(User(user_id="user_bench", laser_frequency=None))
+        db.commit()
+        db.close()
+        seed_rides(count, puller_ids, "user_bench")
+
+        db = SessionLocal()
+        rollups = AnalyticsRollups()
+        days = rollups.load(db)
+        _, backfill_ms = timed(rollups.compact, db)
+        _, compact_ms = timed(rollups.compact, db)
+
+        last_month = (datetime.utcnow() - timedelta(days=30)).date()
+        for label, since in (("all", None), ("30 days", last_month)):
+            rows, scan_ms, _ = measure(scan_rides, db, since)
+            summary, rollup_ms, statements = measure(summarize, db, since)
+            match = sum(row[3] for row in rows) == summary["total_rides"]
+            print(f"{count:>8} {label:>8} {scan_ms:>9.1f} {rollup_ms:>10.2f} {statements:>6.0f} {str(match):>6}")
+        print(f"{'':>8} backfill {days} days {backfill_ms:.0f}ms, compaction (today + yesterday) {compact_ms:.1f}ms")
+        db.close()
+
+
+if __name__ == "__main__":
+    run()
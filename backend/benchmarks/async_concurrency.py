@@ -0,0 +1,91 @@
+"""
+Benchmark: concurrent requests against the async endpoints
+Fires bursts of simultaneous long-polls and alert reads through the ASGI app
+(no thread pool cap of 40 in the path) and reports wall time, p50/p99 and the
+peak number of requests in flight
+"""
+import asyncio
+import time
+import httpx
+from benchmarks.common import SessionLocal, percentile, reset_database, seed_locations, seed_pullers
+from main import app
+
+PULLER_COUNT = 50
+RIDE_COUNT = 200
+LONG_POLLS = 500
+LONG_POLL_WAIT = 2
+ALERT_READS = 1000
+
+
+class InFlight:
+    """Tracks how many requests are open at once"""
+
+    def __init__(self):
+        self.current = 0
+        self.peak = 0
+
+    async def run(self, coro):
+        self.current += 1
+        self.peak = max(self.peak, self.current)
+        start = time.perf_counter()
+        try:
+            return await coro, (time.perf_counter() - start) * 1000
+        finally:
+            self.current -= 1
+
+
+def report(label, started, results, expected_status):
+    elapsed = time.perf_counter() - started
+    latencies = [ms for _, ms in results]
+    bad = sum(1 for response, _ in results if response.status_code != expected_status)
+    print(f"{label:>22} {len(results):>6} {elapsed:>8.2f}s {percentile(latencies, 50):>9.1f} "
+          f"{percentile(latencies, 99):>9.1f} {bad:>5}")
+
+
+async def run():
+    reset_database()
+    db = SessionLocal()
+    seed_locations(db)
+    puller_ids = seed_pullers(db, PULLER_COUNT)
+    db.close()
+
+    transport = httpx.ASGITransport(app=app)
+    async with app.router.lifespan_context(app):
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=30) as client:
+            etags = {}
+            for i in range(RIDE_COUNT):
+                response = await client.post("/api/rides/request", json={
+                    "user_id": f"user_bench{i:05d}", "pickup_location": "CUET", "destination": "Pahartoli"
+                })
+                ride_id = response.json()["ride_id"]
+                etags[ride_id] = (await client.get(f"/api/rides/{ride_id}/status")).headers["etag"]
+
+            print(f"{'scenario':>22} {'reqs':>6} {'wall':>9} {'p50 ms':>9} {'p99 ms':>9} {'bad':>5}")
+
+            # Unchanged rides - every poll parks for the full wait, then 304s
+            tracker = InFlight()
+            ride_ids = list(etags)
+            started = time.perf_counter()
+            results = await asyncio.gather(*(
+                tracker.run(client.get(
+                    f"/api/rides/{ride_ids[i % RIDE_COUNT]}/status",
+                    params={"wait": LONG_POLL_WAIT},
+                    headers={"If-None-Match": etags[ride_ids[i % RIDE_COUNT]]}
+                ))
+                for i in range(LONG_POLLS)
+            ))
+            report(f"long-poll wait={LONG_POLL_WAIT}s", started, results, 304)
+            print(f"{'peak in flight':>22} {tracker.peak:>6}")
+
+            tracker = InFlight()
+            started = time.perf_counter()
+            results = await asyncio.gather(*(
+                tracker.run(client.get(f"/api/pullers/{puller_ids[i % PULLER_COUNT]}/alerts"))
+                for i in range(ALERT_READS)
+            ))
+            report("alerts", started, results, 200)
+            print(f"{'peak in flight':>22} {tracker.peak:>6}")
+
+
+if __name__ == "__main__":
+    asyncio.run(run())
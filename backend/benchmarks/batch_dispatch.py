@@ -0,0 +1,176 @@
+"""
+Benchmark: batch dispatch
+1. Solve time of the minimum-cost assignment - dense rides x pullers
+   distance matrices (100x100, 1000x1000) and the matrix a dispatch tick
+   actually builds (each ride's BATCH_CANDIDATES nearest pullers in range)
+2. Simulation of a busy half hour, same demand and fleet for each policy:
+   race (every puller in range sees the ride, whoever reacts first wins -
+   today's behaviour), greedy nearest (each ride instantly grabs its nearest
+   free puller - the best a race could hope for) and batch (matching every
+   BATCH_DISPATCH_SECONDS with services.batch_dispatch.assign)
+"""
+import numpy as np
+from benchmarks.common import percentile, timed
+from services.alert_service import ALERT_RADIUS_M, ALERT_TIMEOUT_SECONDS
+from services.batch_dispatch import BATCH_CANDIDATES, BATCH_DISPATCH_SECONDS, assign
+from services.puller_index import CELL_SIZE_DEG
+from utils.assignment import min_cost_assignment
+from utils.gps_utils import haversine_distances, haversine_matrix
+from utils.spatial_index import GridIndex
+
+SOLVE_SIZES = (100, 1000)
+SOLVE_REPEATS = 5
+# Roughly the Chattogram metro area
+CITY_CENTER = (22.40, 91.90)
+CITY_SPAN_DEG = 0.08
+
+SIM_SECONDS = 1800
+SIM_PULLERS = 150
+SIM_RIDES_PER_SECOND = 0.3
+SPEED_M_PER_S = 4.0  # e-rickshaw in city traffic
+RIDE_SECONDS = 240  # pickup to dropoff
+REACTION_SECONDS = (2, 10)  # how long pullers take to accept in a race
+
+
+def random_points(rng, count):
+    half = CITY_SPAN_DEG / 2
+    return np.column_stack([
+        rng.uniform(CITY_CENTER[0] - half, CITY_CENTER[0] + half, count),
+        rng.uniform(CITY_CENTER[1] - half, CITY_CENTER[1] + half, count),
+    ])
+
+
+def candidate_pairs(rides, pullers, k):
+    """Each ride's k nearest pullers within ALERT_RADIUS_M via the grid index, as a dispatch tick builds them"""
+    index = GridIndex(CELL_SIZE_DEG)
+    index.replace_all((j, lat, lng) for j, (lat, lng) in enumerate(pullers))
+    return {i: index.nearest(lat, lng, k, max_distance=ALERT_RADIUS_M) for i, (lat, lng) in enumerate(rides)}
+
+
+def solve_times():
+    rng = np.random.default_rng(11)
+    print(f"{'rides x pullers':>16} {'dense p50 ms':>13} {'dense avg m':>12} {'tick p50 ms':>12} "
+          f"{'tick avg m':>11} {'tick matched':>13}")
+    for size in SOLVE_SIZES:
+        rides, pullers = random_points(rng, size), random_points(rng, size)
+        cost = haversine_matrix(rides[:, 0], rides[:, 1], pullers[:, 0], pullers[:, 1])
+        candidates = candidate_pairs(rides, pullers, BATCH_CANDIDATES)
+        dense_ms, tick_ms = [], []
+        for _ in range(SOLVE_REPEATS):
+            (rows, cols), elapsed = timed(min_cost_assignment, cost)
+            dense_ms.append(elapsed)
+            matches, elapsed = timed(assign, candidates)
+            tick_ms.append(elapsed)
+        # Candidate-limited matching vs the true optimum over every pair
+        tick_avg = sum(distance for _, _, distance in matches) / len(matches)
+        print(f"{f'{size}x{size}':>16} {percentile(dense_ms, 50):>13.1f} {cost[rows, cols].mean():>12.0f} "
+              f"{percentile(tick_ms, 50):>12.1f} {tick_avg:>11.0f} {len(matches):>13}")
+
+
+class Fleet:
+    """Puller positions and the second each one is free again"""
+
+    def __init__(self, positions):
+        self.positions = positions.copy()
+        self.free_at = np.zeros(len(positions))
+
+    def available(self, now):
+        return np.flatnonzero(self.free_at <= now)
+
+    def dispatch(self, puller, pickup_distance, dropoff, now):
+        self.free_at[puller] = now + pickup_distance / SPEED_M_PER_S + RIDE_SECONDS
+        self.positions[puller] = dropoff
+
+
+def race_policy(rng):
+    def pick(waiting, rides, fleet, now):
+        taken = []
+        for ride in waiting:
+            free = fleet.available(now)
+            if not len(free):
+                break
+            distances = haversine_distances(*rides[ride][0], fleet.positions[free, 0], fleet.positions[free, 1])
+            in_range = np.flatnonzero(distances <= ALERT_RADIUS_M)
+            if not len(in_range):
+                continue
+            # Reaction time does not depend on distance - the quickest puller wins
+            winner = in_range[np.argmin(rng.uniform(*REACTION_SECONDS, len(in_range)))]
+            taken.append((ride, free[winner], distances[winner]))
+            fleet.dispatch(free[winner], distances[winner], rides[ride][1], now)
+        return taken
+    return pick
+
+
+def greedy_policy(waiting, rides, fleet, now):
+    taken = []
+    for ride in waiting:
+        free = fleet.available(now)
+        if not len(free):
+            break
+        distances = haversine_distances(*rides[ride][0], fleet.positions[free, 0], fleet.positions[free, 1])
+        nearest = int(np.argmin(distances))
+        if distances[nearest] <= ALERT_RADIUS_M:
+            taken.append((ride, free[nearest], distances[nearest]))
+            fleet.dispatch(free[nearest], distances[nearest], rides[ride][1], now)
+    return taken
+
+
+def batch_policy(waiting, rides, fleet, now):
+    if now % BATCH_DISPATCH_SECONDS:
+        return []
+    free = fleet.available(now)
+    if not len(free) or not waiting:
+        return []
+    pickups = np.array([rides[ride][0] for ride in waiting])
+    candidates = candidate_pairs(pickups, fleet.positions[free], BATCH_CANDIDATES)
+    taken = []
+    for row, column, distance in assign(candidates):
+        ride, puller = waiting[row], free[column]
+        taken.append((ride, puller, distance))
+        fleet.dispatch(puller, distance, rides[ride][1], now)
+    return taken
+
+
+def simulate(policy):
+    """Replay the same demand against a fresh fleet; returns (pickup meters, waits, timed out)"""
+    rng = np.random.default_rng(5)
+    fleet = Fleet(random_points(rng, SIM_PULLERS))
+    arrivals = rng.poisson(SIM_RIDES_PER_SECOND, SIM_SECONDS)
+    rides, requested_at = [], []
+    pickup_distances, waits, timed_out = [], [], 0
+    waiting = []
+    for now in range(SIM_SECONDS):
+        for _ in range(arrivals[now]):
+            pickup, dropoff = random_points(rng, 2)
+            waiting.append(len(rides))
+            rides.append((pickup, dropoff))
+            requested_at.append(now)
+        expired = [ride for ride in waiting if now - requested_at[ride] >= ALERT_TIMEOUT_SECONDS]
+        timed_out += len(expired)
+        waiting = [ride for ride in waiting if now - requested_at[ride] < ALERT_TIMEOUT_SECONDS]
+        taken = policy(waiting, rides, fleet, now)
+        for ride, _, distance in taken:
+            pickup_distances.append(distance)
+            waits.append(now - requested_at[ride])
+        assigned = {ride for ride, _, _ in taken}
+        waiting = [ride for ride in waiting if ride not in assigned]
+    return pickup_distances, waits, timed_out + len(waiting)
+
+
+def simulation():
+    print(f"\n{SIM_PULLERS} pullers, {SIM_RIDES_PER_SECOND * SIM_SECONDS:.0f} rides expected over {SIM_SECONDS}s")
+    print(f"{'policy':>16} {'served':>7} {'timeout':>8} {'pickup avg m':>13} {'pickup p90 m':>13} {'wait avg s':>11}")
+    policies = (("race", race_policy(np.random.default_rng(3))), ("greedy nearest", greedy_policy), ("batch", batch_policy))
+    for label, policy in policies:
+        distances, waits, timed_out = simulate(policy)
+        print(f"{label:>16} {len(distances):>7} {timed_out:>8} {np.mean(distances):>13.0f} "
+              f"{percentile(distances, 90):>13.0f} {np.mean(waits):>11.1f}")
+
+
+def run():
+    solve_times()
+    simulation()
+
+
+if __name__ == "__main__":
+    run()
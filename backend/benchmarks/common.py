@@ -0,0 +1,114 @@
+"""
+Shared helpers for the backend benchmarks
+Run from the backend directory, e.g. `python -m benchmarks.alerts_feed`
+Benchmarks always use a throwaway SQLite database (override with BENCH_DATABASE_URL)
+"""
+import os
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta
+
+os.environ["DATABASE_URL"] = os.getenv(
+    "BENCH_DATABASE_URL",
+    f"sqlite:///{tempfile.mkdtemp(prefix='aeras_bench_')}/bench.db"
+)
+
+from sqlalchemy import event
+from database import engine, async_engine, Base, SessionLocal
+from models.db_models import Location, Puller, Ride, User, RideStatus, PullerStatus
+from seed_data import LOCATIONS
+from services.points_ledger import open_account
+
+# Sync and async handlers run on separate engines - hooks go on both
+ENGINES = (engine, async_engine.sync_engine) if async_engine is not None else (engine,)
+
+
+class QueryCounter:
+    """Counts SQL statements sent to the engine while active"""
+
+    def __init__(self):
+        self.count = 0
+
+    def _on_execute(self, conn, cursor, statement, parameters, context, executemany):
+        self.count += 1
+
+    def __enter__(self):
+        for target in ENGINES:
+            event.listen(target, "before_cursor_execute", self._on_execute)
+        return self
+
+    def __exit__(self, *exc_info):
+        for target in ENGINES:
+            event.remove(target, "before_cursor_execute", self._on_execute)
+
+
+def percentile(samples, pct):
+    """Nearest-rank percentile of a list of samples"""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = max(0, min(len(ordered) - 1, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[index]
+
+
+def timed(fn, *args, **kwargs):
+    """Call fn and return (result, elapsed milliseconds)"""
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return result, (time.perf_counter() - start) * 1000
+
+
+def reset_database():
+    """Drop and recreate every table"""
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+
+
+def seed_locations(db):
+    for loc in LOCATIONS:
+        db.add(Location(**loc))
+    db.commit()
+
+
+def seed_pullers(db, count, status=PullerStatus.AVAILABLE, spread=0.05):
+    """Create pullers scattered around CUET and return their ids"""
+    import random
+    rng = random.Random(42)
+    puller_ids = []
+    for i in range(count):
+        puller_id = f"puller_bench{i:05d}"
+        db.add(Puller(
+            puller_id=puller_id,
+            name=f"Bench Puller {i}",
+            phone="01700000000",
+            current_lat=22.4599 + rng.uniform(-spread, spread),
+            current_lng=91.9712 + rng.uniform(-spread, spread),
+            status=status
+        ))
+        open_account(db, puller_id)
+        puller_ids.append(puller_id)
+    db.commit()
+    return puller_ids
+
+
+def seed_pending_rides(db, count, age_seconds=5):
+    """Create fresh PENDING rides between the seeded locations and return their ids"""
+    names = [loc["name"] for loc in LOCATIONS]
+    user = User(user_id=f"user_{uuid.uuid4().hex[:8]}", laser_frequency=None)
+    db.add(user)
+    requested_at = datetime.utcnow() - timedelta(seconds=age_seconds)
+    ride_ids = []
+    for i in range(count):
+        ride_id = f"ride_{uuid.uuid4().hex[:8]}"
+        db.add(Ride(
+            ride_id=ride_id,
+            user_id=user.user_id,
+            pickup=names[i % len(names)],
+            destination=names[(i + 1) % len(names)],
+            status=RideStatus.PENDING,
+            requested_at=requested_at
+        ))
+        ride_ids.append(ride_id)
+    db.commit()
+    return ride_ids
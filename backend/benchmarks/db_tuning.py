@@ -0,0 +1,111 @@
+"""
+Benchmark: mixed read/write throughput, default engine vs tuned engine
+Reader threads run the alerts feed query while writer threads stream
+location updates and new rides into the same SQLite file, once with
+create_engine defaults (rollback journal) and once with database.py's pool
+settings and SQLite pragmas (WAL, synchronous=NORMAL, busy_timeout, mmap)
+"""
+import os
+import random
+import tempfile
+import threading
+import time
+import uuid
+from datetime import datetime
+from benchmarks.common import percentile, seed_locations, seed_pending_rides, seed_pullers
+from database import Base, apply_sqlite_pragmas, pool_options
+from models.db_models import Puller, Ride, RideStatus
+from sqlalchemy import create_engine, event, select, update
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+
+READERS = 8
+WRITERS = 2
+DURATION_SECONDS = 5
+PULLER_COUNT = 200
+PENDING_RIDES = 200
+
+
+def build_engine(url, tuned):
+    if not tuned:
+        return create_engine(url, connect_args={"check_same_thread": False})
+    engine = create_engine(url, connect_args={"check_same_thread": False}, **pool_options(url))
+    event.listen(engine, "connect", apply_sqlite_pragmas)
+    return engine
+
+
+def reader(Session, stop, stats):
+    while not stop.is_set():
+        start = time.perf_counter()
+        try:
+            with Session() as db:
+                db.execute(
+                    select(Ride.ride_id, Ride.pickup, Ride.requested_at)
+                    .where(Ride.status == RideStatus.PENDING)
+                ).all()
+            stats["reads"].append((time.perf_counter() - start) * 1000)
+        except OperationalError:
+            stats["errors"] += 1
+
+
+def writer(Session, stop, stats, puller_ids, seed):
+    rng = random.Random(seed)
+    while not stop.is_set():
+        start = time.perf_counter()
+        try:
+            with Session() as db:
+                db.execute(
+                    update(Puller)
+                    .where(Puller.puller_id == rng.choice(puller_ids))
+                    .values(current_lat=22.4 + rng.uniform(-0.05, 0.05), current_lng=91.9 + rng.uniform(-0.05, 0.05))
+                )
+                db.add(Ride(
+                    ride_id=f"ride_{uuid.uuid4().hex[:8]}",
+                    user_id="user_bench",
+                    pickup="CUET",
+                    destination="Pahartoli",
+                    status=RideStatus.COMPLETED,
+                    requested_at=datetime.utcnow()
+                ))
+                db.commit()
+            stats["writes"].append((time.perf_counter() - start) * 1000)
+        except OperationalError:
+            stats["errors"] += 1
+
+
+def run_mode(tuned):
+    path = os.path.join(tempfile.mkdtemp(prefix="aeras_tuning_"), "bench.db")
+    engine = build_engine(f"sqlite:///{path}", tuned)
+    Base.metadata.create_all(bind=engine)
+    Session = sessionmaker(bind=engine, autoflush=False)
+    with Session() as db:
+        seed_locations(db)
+        puller_ids = seed_pullers(db, PULLER_COUNT)
+        seed_pending_rides(db, PENDING_RIDES, age_seconds=0)
+
+    stats = {"reads": [], "writes": [], "errors": 0}
+    stop = threading.Event()
+    threads = [threading.Thread(target=reader, args=(Session, stop, stats)) for _ in range(READERS)]
+    threads += [threading.Thread(target=writer, args=(Session, stop, stats, puller_ids, i)) for i in range(WRITERS)]
+    for thread in threads:
+        thread.start()
+    time.sleep(DURATION_SECONDS)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    engine.dispose()
+
+    reads, writes = stats["reads"], stats["writes"]
+    print(f"{'tuned' if tuned else 'default':>8} {len(reads) / DURATION_SECONDS:>8.0f} {len(writes) / DURATION_SECONDS:>8.0f} "
+          f"{percentile(reads, 99):>10.2f} {percentile(writes, 99):>10.2f} {stats['errors']:>7}")
+
+
+def run():
+    print(f"{READERS} readers, {WRITERS} writers, {DURATION_SECONDS}s per mode")
+    print(f"{'mode':>8} {'reads/s':>8} {'writes/s':>8} {'read p99':>10} {'write p99':>10} {'errors':>7}")
+    run_mode(tuned=False)
+    run_mode(tuned=True)
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,110 @@
+"""
+Benchmark: admin ride export
+Streams GET /api/admin/export/rides as CSV and NDJSON straight through the
+ASGI app (TestClient buffers whole bodies) and reports rows/s and how much
+the process's peak RSS grew, against loading the same rows as ORM objects
+the way the JSON endpoints used to
+
+Usage: python -m benchmarks.exports [ride_count]   (default 500,000)
+"""
+import asyncio
+import resource
+import sys
+import time
+from datetime import datetime, timedelta
+from sqlalchemy import insert
+from benchmarks.common import SessionLocal, engine, reset_database
+from main import app
+from models.db_models import Ride, RideStatus
+
+DEFAULT_RIDE_COUNT = 500_000
+INSERT_CHUNK = 50_000
+
+
+def peak_rss_mb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def seed(count):
+    start = datetime.utcnow() - timedelta(days=365)
+    with engine.begin() as conn:
+        for offset in range(0, count, INSERT_CHUNK):
+            conn.execute(insert(Ride), [
+                {
+                    "ride_id": f"ride_export{i:08d}",
+                    "user_id": "user_bench",
+                    "puller_id": f"puller_bench{i % 1000:05d}",
+                    "pickup": "CUET",
+                    "destination": "Pahartoli",
+                    "status": RideStatus.COMPLETED,
+                    "requested_at": start + timedelta(seconds=i * 30),
+                    "completed_at": start + timedelta(seconds=i * 30 + 1200),
+                    "dropoff_distance_error": 12.5,
+                    "points_awarded": 8,
+                }
+                for i in range(offset, min(offset + INSERT_CHUNK, count))
+            ])
+
+
+async def stream_lines(path, query_string):
+    """Drive one GET through the ASGI app, counting body lines and dropping the bytes"""
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+        "scheme": "http", "path": path, "raw_path": path.encode(), "query_string": query_string.encode(),
+        "headers": [(b"host", b"bench")], "client": ("127.0.0.1", 0), "server": ("bench", 80),
+    }
+    disconnected = asyncio.Event()
+    lines = 0
+    requested = False
+
+    async def receive():
+        nonlocal requested
+        if not requested:
+            requested = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        await disconnected.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        nonlocal lines
+        if message["type"] == "http.response.start":
+            assert message["status"] == 200, message
+        elif message["type"] == "http.response.body":
+            lines += message.get("body", b"").count(b"\n")
+            if not message.get("more_body", False):
+                disconnected.set()
+
+    await app(scope, receive, send)
+    return lines
+
+
+def run(count):
+    reset_database()
+    seed(count)
+    print(f"{count:,} rides")
+    print(f"{'mode':>16} {'rows/s':>10} {'peak RSS +MB':>13}")
+
+    # Untimed pass first - SQLite's mmap'd pages count towards RSS once touched
+    asyncio.run(stream_lines("/api/admin/export/rides", "format=csv"))
+
+    for fmt in ("csv", "ndjson"):
+        before = peak_rss_mb()
+        start = time.perf_counter()
+        lines = asyncio.run(stream_lines("/api/admin/export/rides", f"format={fmt}"))
+        elapsed = time.perf_counter() - start
+        assert lines == count + (1 if fmt == "csv" else 0), lines
+        print(f"{f'stream {fmt}':>16} {count / elapsed:>10.0f} {peak_rss_mb() - before:>13.1f}")
+
+    # Baseline: materialize everything, as a load-it-all JSON endpoint would
+    before = peak_rss_mb()
+    start = time.perf_counter()
+    db = SessionLocal()
+    rides = db.query(Ride).all()
+    elapsed = time.perf_counter() - start
+    assert len(rides) == count
+    print(f"{'ORM .all()':>16} {count / elapsed:>10.0f} {peak_rss_mb() - before:>13.1f}")
+    db.close()
+
+
+if __name__ == "__main__":
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_RIDE_COUNT)
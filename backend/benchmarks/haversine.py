@@ -0,0 +1,41 @@
+"""
+Micro-benchmark: scalar haversine loop vs vectorized haversine_distances
+"""
+import random
+import numpy as np
+from benchmarks.common import timed
+from utils.gps_utils import haversine_distance, haversine_distances, haversine_matrix
+
+POINT_COUNTS = (1000, 10000, 100000)
+REPEATS = 5
+
+
+def scalar_loop(lat, lng, lats, lngs):
+    return [haversine_distance(lat, lng, plat, plng) for plat, plng in zip(lats, lngs)]
+
+
+def run():
+    rng = random.Random(3)
+    origin = (22.4599, 91.9712)
+    print(f"{'points':>8} {'scalar ms':>10} {'batch ms':>10} {'speedup':>8}")
+    for count in POINT_COUNTS:
+        lats = [22.40 + rng.uniform(-0.15, 0.15) for _ in range(count)]
+        lngs = [91.90 + rng.uniform(-0.15, 0.15) for _ in range(count)]
+        lat_array, lng_array = np.array(lats), np.array(lngs)
+
+        expected, _ = timed(scalar_loop, *origin, lats, lngs)
+        actual, _ = timed(haversine_distances, *origin, lat_array, lng_array)
+        assert np.allclose(actual, expected)
+
+        scalar_ms = min(timed(scalar_loop, *origin, lats, lngs)[1] for _ in range(REPEATS))
+        batch_ms = min(timed(haversine_distances, *origin, lat_array, lng_array)[1] for _ in range(REPEATS))
+        print(f"{count:>8} {scalar_ms:>10.3f} {batch_ms:>10.3f} {scalar_ms / batch_ms:>7.0f}x")
+
+    # Many-to-many agrees with the one-to-many rows
+    matrix = haversine_matrix(lats[:50], lngs[:50], lats[:200], lngs[:200])
+    assert matrix.shape == (50, 200)
+    assert np.allclose(matrix[7], haversine_distances(lats[7], lngs[7], lats[:200], lngs[:200]))
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,240 @@
+"""
+Load harness: simulated ESP32 blocks and puller apps against the in-process app
+Blocks follow esp32code.ino (verify -> request -> long-poll status with ETag
+until green/red LED), pullers stream GPS fixes, delta-poll alerts and run accepted
+rides through pickup and complete. Reports throughput, p50/p95/p99 per
+endpoint, SQL statements per request, how long rides waited for an accept
+and how long blocks took to see it. Exits 1 on server errors or when --max-p99-ms is exceeded, so it can
+gate capacity regressions.
+
+    python -m benchmarks.load_harness --blocks 20 --pullers 100 --duration 30 --max-p99-ms 1500
+
+Set BENCH_DATABASE_URL to run against Postgres instead of a temp SQLite file,
+and DISPATCH_MODE=offer / batch to compare dispatch modes against the race
+"""
+import argparse
+import asyncio
+import random
+import sys
+import time
+from collections import Counter, defaultdict
+import httpx
+from benchmarks.common import QueryCounter, SessionLocal, percentile, reset_database, seed_locations, seed_pullers
+from main import app
+from seed_data import LOCATIONS
+
+# Simulated device timings (seconds)
+STATUS_WAIT_SECONDS = 5
+BLOCK_IDLE_SECONDS = (1.0, 3.0)
+ULTRASONIC_DURATION = 3.5
+LOCATION_INTERVAL_SECONDS = 2.0
+ALERT_POLL_SECONDS = 1.0
+PICKUP_DELAY_SECONDS = (0.2, 1.0)
+RIDE_DURATION_SECONDS = (0.5, 2.0)
+
+
+class Recorder:
+    """Latency samples and server errors per endpoint"""
+
+    def __init__(self):
+        self.samples = defaultdict(list)
+        self.errors = Counter()
+        self.rides = Counter()
+        self.requested_at = {}
+        self.accepted_at = {}
+        self.assign_ms = []
+        self.notify_ms = []
+
+    async def call(self, client, endpoint, method, url, **kwargs):
+        start = time.perf_counter()
+        try:
+            response = await client.request(method, url, **kwargs)
+        except httpx.HTTPError:
+            self.errors[endpoint] += 1
+            return None
+        self.samples[endpoint].append((time.perf_counter() - start) * 1000)
+        if response.status_code >= 500:
+            self.errors[endpoint] += 1
+        return response
+
+
+async def block(client, recorder, index, deadline, rng):
+    """One physical block at a pickup location"""
+    pickup = LOCATIONS[index % len(LOCATIONS)]["name"]
+    destinations = [loc["name"] for loc in LOCATIONS if loc["name"] != pickup]
+    response = await recorder.call(client, "POST /api/rides/verify", "POST", "/api/rides/verify", json={
+        "laser_frequency": 500.0 + index, "ultrasonic_duration": ULTRASONIC_DURATION, "location_block": pickup
+    })
+    if response is None or response.status_code != 200:
+        return
+    user_id = response.json()["user_id"]
+
+    while time.monotonic() < deadline:
+        response = await recorder.call(client, "POST /api/rides/request", "POST", "/api/rides/request", json={
+            "user_id": user_id, "pickup_location": pickup, "destination": rng.choice(destinations)
+        })
+        if response is None or response.status_code != 201:
+            await asyncio.sleep(rng.uniform(*BLOCK_IDLE_SECONDS))
+            continue
+        ride_id = response.json()["ride_id"]
+        recorder.rides["requested"] += 1
+        recorder.requested_at[ride_id] = time.perf_counter()
+
+        etag, assigned = None, False
+        while time.monotonic() < deadline:
+            headers = {"If-None-Match": etag} if etag else {}
+            response = await recorder.call(
+                client, "GET /api/rides/{ride_id}/status", "GET", f"/api/rides/{ride_id}/status",
+                params={"wait": STATUS_WAIT_SECONDS}, headers=headers
+            )
+            if response is None or response.status_code not in (200, 304):
+                break
+            if response.status_code == 304:
+                continue
+            etag = response.headers.get("etag")
+            status = response.json()
+            if status["led_yellow"] and not assigned:
+                assigned = True
+                accepted = recorder.accepted_at.pop(ride_id, None)
+                if accepted is not None:
+                    recorder.notify_ms.append((time.perf_counter() - accepted) * 1000)
+            if status["led_green"]:
+                break
+            if status["led_red"]:
+                recorder.rides["expired"] += 1
+                break
+        await asyncio.sleep(rng.uniform(*BLOCK_IDLE_SECONDS))
+
+
+async def puller(client, recorder, puller_id, deadline, rng):
+    """One puller app - GPS fixes, alert polling, ride lifecycle"""
+    lat, lng = 22.4599 + rng.uniform(-0.05, 0.05), 91.9712 + rng.uniform(-0.05, 0.05)
+    next_fix = 0.0
+    cursor, known = None, {}
+    while time.monotonic() < deadline:
+        if time.monotonic() >= next_fix:
+            lat, lng = lat + rng.uniform(-0.0005, 0.0005), lng + rng.uniform(-0.0005, 0.0005)
+            await recorder.call(
+                client, "PUT /api/pullers/{puller_id}/location", "PUT", f"/api/pullers/{puller_id}/location",
+                params={"lat": lat, "lng": lng}
+            )
+            next_fix = time.monotonic() + LOCATION_INTERVAL_SECONDS
+
+        # Delta polling: after the first full read only feed changes come back
+        response = await recorder.call(
+            client, "GET /api/pullers/{puller_id}/alerts", "GET", f"/api/pullers/{puller_id}/alerts",
+            params={"since": cursor} if cursor is not None else None
+        )
+        if response is not None and response.status_code == 200:
+            body = response.json()
+            if cursor is None or body.get("reset"):
+                known = {}
+            for alert in body.get("alerts", []) + body.get("added", []) + body.get("changed", []):
+                known[alert["ride_id"]] = alert
+            for ride_id in body.get("removed", []):
+                known.pop(ride_id, None)
+            cursor = body["cursor"]
+        alerts = sorted(known.values(), key=lambda alert: alert["distance_to_pickup"])
+        if not alerts:
+            await asyncio.sleep(ALERT_POLL_SECONDS * rng.uniform(0.5, 1.5))
+            continue
+
+        # Most pullers go for the closest ride, which is what makes accepts collide
+        ride_id = alerts[0]["ride_id"] if rng.random() < 0.7 else rng.choice(alerts)["ride_id"]
+        response = await recorder.call(
+            client, "POST /api/pullers/{ride_id}/accept", "POST", f"/api/pullers/{ride_id}/accept",
+            params={"puller_id": puller_id}
+        )
+        known.pop(ride_id, None)
+        if response is None or response.status_code != 200:
+            recorder.rides["lost_accepts"] += 1
+            await asyncio.sleep(ALERT_POLL_SECONDS * rng.uniform(0.5, 1.5))
+            continue
+        recorder.accepted_at[ride_id] = time.perf_counter()
+        recorder.rides["accepted"] += 1
+        requested = recorder.requested_at.pop(ride_id, None)
+        if requested is not None:
+            recorder.assign_ms.append((recorder.accepted_at[ride_id] - requested) * 1000)
+        details = response.json()["ride_details"]
+
+        await asyncio.sleep(rng.uniform(*PICKUP_DELAY_SECONDS))
+        await recorder.call(
+            client, "POST /api/pullers/{ride_id}/pickup", "POST", f"/api/pullers/{ride_id}/pickup",
+            params={"puller_id": puller_id}
+        )
+        await asyncio.sleep(rng.uniform(*RIDE_DURATION_SECONDS))
+        response = await recorder.call(
+            client, "POST /api/pullers/{ride_id}/complete", "POST", f"/api/pullers/{ride_id}/complete",
+            json={"puller_id": puller_id, "dropoff_lat": details["destination_lat"], "dropoff_lng": details["destination_lng"]}
+        )
+        if response is not None and response.status_code == 200:
+            recorder.rides["completed"] += 1
+            lat, lng = details["destination_lat"], details["destination_lng"]
+
+
+def report(recorder, elapsed, statements, max_p99_ms):
+    failures = []
+    total = sum(len(samples) for samples in recorder.samples.values())
+    print(f"\n{'endpoint':<40} {'reqs':>7} {'req/s':>7} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'errors':>7}")
+    for endpoint in sorted(recorder.samples):
+        samples = recorder.samples[endpoint]
+        p99 = percentile(samples, 99)
+        print(f"{endpoint:<40} {len(samples):>7} {len(samples) / elapsed:>7.1f} {percentile(samples, 50):>8.1f} "
+              f"{percentile(samples, 95):>8.1f} {p99:>8.1f} {recorder.errors[endpoint]:>7}")
+        # Long-polls are held open on purpose - their latency is the wait, not the server
+        if max_p99_ms and p99 > max_p99_ms and not endpoint.endswith("/status"):
+            failures.append(f"{endpoint} p99 {p99:.0f}ms > {max_p99_ms:.0f}ms")
+    for endpoint, count in recorder.errors.items():
+        if count:
+            failures.append(f"{endpoint}: {count} server/transport error(s)")
+
+    print(f"\n{total} requests in {elapsed:.1f}s ({total / elapsed:.0f} req/s), "
+          f"{statements} SQL statements ({statements / max(total, 1):.2f} per request)")
+    print("rides: " + ", ".join(f"{key} {value}" for key, value in sorted(recorder.rides.items())))
+    if recorder.assign_ms:
+        attempts = recorder.rides["accepted"] + recorder.rides["lost_accepts"]
+        print(f"request -> accepted: p50 {percentile(recorder.assign_ms, 50):.0f}ms, "
+              f"p99 {percentile(recorder.assign_ms, 99):.0f}ms, "
+              f"{attempts / recorder.rides['accepted']:.1f} accept attempts per accepted ride")
+    if recorder.notify_ms:
+        print(f"accept -> block sees yellow LED: p50 {percentile(recorder.notify_ms, 50):.0f}ms, "
+              f"p99 {percentile(recorder.notify_ms, 99):.0f}ms")
+    for failure in failures:
+        print(f"FAIL  {failure}")
+    return failures
+
+
+async def run(args):
+    rng = random.Random(args.seed)
+    reset_database()
+    db = SessionLocal()
+    seed_locations(db)
+    puller_ids = seed_pullers(db, args.pullers)
+    db.close()
+
+    recorder = Recorder()
+    # Unhandled server exceptions come back as 500s and count as errors
+    transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+    async with app.router.lifespan_context(app):
+        async with httpx.AsyncClient(transport=transport, base_url="http://load", timeout=STATUS_WAIT_SECONDS + 30) as client:
+            with QueryCounter() as counter:
+                start = time.monotonic()
+                deadline = start + args.duration
+                await asyncio.gather(
+                    *(block(client, recorder, i, deadline, random.Random(rng.random())) for i in range(args.blocks)),
+                    *(puller(client, recorder, pid, deadline, random.Random(rng.random())) for pid in puller_ids)
+                )
+                elapsed = time.monotonic() - start
+
+    print(f"{args.blocks} blocks, {args.pullers} pullers, {args.duration}s")
+    return 1 if report(recorder, elapsed, counter.count, args.max_p99_ms) else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--blocks", type=int, default=20)
+    parser.add_argument("--pullers", type=int, default=100)
+    parser.add_argument("--duration", type=float, default=30)
+    parser.add_argument("--max-p99-ms", type=float, default=0, help="fail if any endpoint's p99 exceeds this")
+    parser.add_argument("--seed", type=int, default=1)
+    sys.exit(asyncio.run(run(parser.parse_args())))
@@ -0,0 +1,48 @@
+"""
+Benchmark: puller GPS ingestion
+One PUT per fix vs POST /api/pullers/locations/batch, reporting fixes/s and
+SQL statements per fix
+"""
+import random
+import time
+from benchmarks.common import QueryCounter, SessionLocal, reset_database, seed_pullers
+from fastapi.testclient import TestClient
+from main import app
+
+PULLER_COUNT = 500
+FIXES = 5000
+BATCH_SIZES = (100, 1000)
+
+
+def run():
+    rng = random.Random(5)
+    reset_database()
+    db = SessionLocal()
+    puller_ids = seed_pullers(db, PULLER_COUNT)
+    db.close()
+    fixes = [
+        {"puller_id": rng.choice(puller_ids), "lat": 22.40 + rng.uniform(-0.1, 0.1), "lng": 91.90 + rng.uniform(-0.1, 0.1)}
+        for _ in range(FIXES)
+    ]
+    with TestClient(app) as client:
+        print(f"{'mode':>16} {'fixes/s':>10} {'stmts/fix':>10}")
+
+        with QueryCounter() as counter:
+            start = time.perf_counter()
+            for fix in fixes:
+                client.put(f"/api/pullers/{fix['puller_id']}/location", params={"lat": fix["lat"], "lng": fix["lng"]})
+            elapsed = time.perf_counter() - start
+        print(f"{'single PUT':>16} {FIXES / elapsed:>10.0f} {counter.count / FIXES:>10.3f}")
+
+        for batch_size in BATCH_SIZES:
+            with QueryCounter() as counter:
+                start = time.perf_counter()
+                for offset in range(0, FIXES, batch_size):
+                    response = client.post("/api/pullers/locations/batch", json={"fixes": fixes[offset:offset + batch_size]})
+                    assert response.status_code == 200 and not response.json()["unknown_pullers"]
+                elapsed = time.perf_counter() - start
+            print(f"{f'batch of {batch_size}':>16} {FIXES / elapsed:>10.0f} {counter.count / FIXES:>10.3f}")
+
+
+if __name__ == "__main__":
+    run()
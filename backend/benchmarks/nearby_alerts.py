@@ -0,0 +1,82 @@
+"""
+Benchmark: alerts poll against a city-wide pending backlog
+Pending rides are spread over PICKUP_GRID x PICKUP_GRID pickup points
+covering ~40 x 40 km. Compares the poll with every ride measured and fully
+sorted (radius and top-k disabled) against the default ALERT_RADIUS_M /
+ALERT_TOP_K lookup over the per-cell ride index
+"""
+import random
+from datetime import datetime
+from sqlalchemy import insert
+from benchmarks.common import SessionLocal, engine, percentile, reset_database, seed_pullers, timed
+from fastapi.testclient import TestClient
+from main import app
+from models.db_models import Location, Ride, RideStatus, User
+from routers import pullers
+from services.alert_service import ALERT_RADIUS_M, ALERT_TOP_K
+
+BACKLOG_SIZES = (1_000, 10_000, 25_000)
+PICKUP_GRID = 20
+CENTER = (22.40, 91.90)
+SPAN_DEG = 0.36
+REQUESTS = 20
+
+
+def seed_city(ride_count):
+    rng = random.Random(5)
+    names = []
+    db = SessionLocal()
+    for i in range(PICKUP_GRID):
+        for j in range(PICKUP_GRID):
+            name = f"Stop {i:02d}-{j:02d}"
+            db.add(Location(
+                name=name,
+                lat=CENTER[0] - SPAN_DEG / 2 + SPAN_DEG * i / (PICKUP_GRID - 1),
+                lng=CENTER[1] - SPAN_DEG / 2 + SPAN_DEG * j / (PICKUP_GRID - 1)
+            ))
+            names.append(name)
+    db.add(User(user_id="user_bench", laser_frequency=None))
+    db.commit()
+    puller_id = seed_pullers(db, 1, spread=0.0)[0]
+    db.close()
+
+    now = datetime.utcnow()
+    with engine.begin() as conn:
+        conn.execute(insert(Ride), [
+            {"ride_id": f"ride_city{i:06d}", "user_id": "user_bench", "pickup": rng.choice(names),
+             "destination": rng.choice(names), "status": RideStatus.PENDING, "requested_at": now}
+            for i in range(ride_count)
+        ])
+    return puller_id
+
+
+def measure(client, url):
+    latencies = []
+    for _ in range(REQUESTS):
+        response, elapsed = timed(client.get, url)
+        assert response.status_code == 200
+        latencies.append(elapsed)
+    return percentile(latencies, 50), percentile(latencies, 99), len(response.json()["alerts"]), len(response.content)
+
+
+def run():
+    print(f"radius {ALERT_RADIUS_M:.0f}m, top {ALERT_TOP_K}")
+    print(f"{'pending':>8} {'mode':>10} {'p50 ms':>8} {'p99 ms':>8} {'alerts':>7} {'bytes':>9}")
+    for size in BACKLOG_SIZES:
+        # Seeded before the app starts - its startup loads the registry and
+        # feed, and its background jobs never see the tables being dropped
+        reset_database()
+        puller_id = seed_city(size)
+        with TestClient(app) as client:
+            url = f"/api/pullers/{puller_id}/alerts"
+
+            for mode, radius, top_k in (("city-wide", float("inf"), size), ("nearby", ALERT_RADIUS_M, ALERT_TOP_K)):
+                pullers.ALERT_RADIUS_M, pullers.ALERT_TOP_K = radius, top_k
+                client.get(url)
+                p50, p99, alerts, size_bytes = measure(client, url)
+                print(f"{size:>8} {mode:>10} {p50:>8.2f} {p99:>8.2f} {alerts:>7} {size_bytes:>9}")
+            pullers.ALERT_RADIUS_M, pullers.ALERT_TOP_K = ALERT_RADIUS_M, ALERT_TOP_K
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,61 @@
+"""
+Benchmark: k-nearest available puller search
+Compares the old full scan (haversine every puller + full sort) against the
+grid spatial index used by alert_service.distribute_alerts
+"""
+import random
+from benchmarks.common import percentile, timed
+from utils.gps_utils import haversine_distance
+from utils.spatial_index import GridIndex
+from services.puller_index import CELL_SIZE_DEG
+
+PULLER_COUNTS = (1000, 10000, 100000)
+QUERIES = 200
+K = 5
+# Roughly the Chattogram metro area
+CITY_CENTER = (22.40, 91.90)
+CITY_SPAN_DEG = 0.30
+
+
+def full_scan(pullers, lat, lng, k):
+    by_distance = [
+        (puller_id, haversine_distance(plat, plng, lat, lng))
+        for puller_id, plat, plng in pullers
+    ]
+    by_distance.sort(key=lambda x: x[1])
+    return by_distance[:k]
+
+
+def run():
+    rng = random.Random(7)
+    print(f"{'pullers':>8} {'scan p50 ms':>12} {'scan p99 ms':>12} {'index p50 ms':>13} {'index p99 ms':>13} {'speedup':>8}")
+    for count in PULLER_COUNTS:
+        pullers = [
+            (f"puller_{i}",
+             CITY_CENTER[0] + rng.uniform(-CITY_SPAN_DEG / 2, CITY_SPAN_DEG / 2),
+             CITY_CENTER[1] + rng.uniform(-CITY_SPAN_DEG / 2, CITY_SPAN_DEG / 2))
+            for i in range(count)
+        ]
+        index = GridIndex(CELL_SIZE_DEG)
+        index.replace_all(pullers)
+
+        queries = [
+            (CITY_CENTER[0] + rng.uniform(-CITY_SPAN_DEG / 2, CITY_SPAN_DEG / 2),
+             CITY_CENTER[1] + rng.uniform(-CITY_SPAN_DEG / 2, CITY_SPAN_DEG / 2))
+            for _ in range(QUERIES)
+        ]
+        scan_times, index_times = [], []
+        for lat, lng in queries:
+            expected, scan_ms = timed(full_scan, pullers, lat, lng, K)
+            actual, index_ms = timed(index.nearest, lat, lng, K)
+            assert [p for p, _ in actual] == [p for p, _ in expected]
+            scan_times.append(scan_ms)
+            index_times.append(index_ms)
+
+        speedup = percentile(scan_times, 50) / max(percentile(index_times, 50), 1e-9)
+        print(f"{count:>8} {percentile(scan_times, 50):>12.3f} {percentile(scan_times, 99):>12.3f} "
+              f"{percentile(index_times, 50):>13.3f} {percentile(index_times, 99):>13.3f} {speedup:>7.0f}x")
+
+
+if __name__ == "__main__":
+    run()
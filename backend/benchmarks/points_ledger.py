@@ -0,0 +1,117 @@
+"""
+Benchmark: points ledger
+1. Concurrent points awards for one puller - ADJUSTMENTS admin adjustments
+   of that puller's review rides fired at once; every award must land in
+   the balance the dashboard reports, without server errors
+2. Balance reads over a long ledger - from the opening snapshot (the
+   whole history is tail) vs after a periodic snapshot, now and as of a
+   point mid-history (before that snapshot, so still a long tail)
+"""
+import asyncio
+import sys
+from datetime import datetime, timedelta
+import httpx
+from sqlalchemy import insert
+from benchmarks.common import QueryCounter, SessionLocal, engine, percentile, reset_database, seed_pullers, timed
+from main import app
+from models.db_models import PointsHistory, Ride, RideStatus
+from services.points_ledger import balance_as_of, take_snapshots
+
+ADJUSTMENTS = 200
+POINTS_PER_ADJUSTMENT = 3
+LEDGER_ENTRIES = 200_000
+REPEATS = 20
+
+
+def seed_reviews(puller_id, count):
+    with engine.begin() as conn:
+        conn.execute(insert(Ride), [
+            {"ride_id": f"ride_adjust{i:05d}", "user_id": "user_bench", "puller_id": puller_id,
+             "pickup": "CUET", "destination": "Pahartoli", "status": RideStatus.PENDING_REVIEW,
+             "requested_at": datetime.utcnow(), "completed_at": datetime.utcnow(),
+             "dropoff_distance_error": 150.0, "points_awarded": 0}
+            for i in range(count)
+        ])
+
+
+def seed_ledger(puller_id, count):
+    """count entries of 1 point, one a minute, ending an hour ago"""
+    start = datetime.utcnow() - timedelta(minutes=count + 60)
+    with engine.begin() as conn:
+        conn.execute(insert(PointsHistory), [
+            {"transaction_id": f"txn_seed{i:07d}", "puller_id": puller_id, "ride_id": f"ride_seed{i:07d}",
+             "points_change": 1, "reason": "seed", "created_at": start + timedelta(minutes=i)}
+            for i in range(count)
+        ])
+    return start
+
+
+async def concurrent_awards(puller_id):
+    failures = []
+    transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+    async with app.router.lifespan_context(app):
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=60) as client:
+            responses = await asyncio.gather(*(
+                client.post(f"/api/admin/reviews/ride_adjust{i:05d}/resolve",
+                            json={"action": "adjust", "points_override": POINTS_PER_ADJUSTMENT})
+                for i in range(ADJUSTMENTS)
+            ))
+            dashboard = (await client.get(f"/api/pullers/{puller_id}/dashboard")).json()
+
+    ok = sum(1 for response in responses if response.status_code == 200)
+    errors = sum(1 for response in responses if response.status_code >= 500)
+    expected = ok * POINTS_PER_ADJUSTMENT
+    print(f"{ADJUSTMENTS} concurrent adjustments: {ok} ok, {errors} server errors, "
+          f"balance {dashboard['points']} (expected {expected}), rides {dashboard['total_rides']}")
+    if errors:
+        failures.append(f"{errors} adjustments failed")
+    if dashboard["points"] != expected or dashboard["total_rides"] != ok:
+        failures.append("balance does not match the awards that succeeded")
+    return failures
+
+
+def measure(db, puller_id, as_of):
+    latencies = []
+    with QueryCounter() as counter:
+        for _ in range(REPEATS):
+            balance, elapsed = timed(balance_as_of, db, puller_id, as_of)
+            latencies.append(elapsed)
+    return balance, percentile(latencies, 50), counter.count / REPEATS
+
+
+def balance_reads(puller_id):
+    start = seed_ledger(puller_id, LEDGER_ENTRIES)
+    midpoint = start + timedelta(minutes=LEDGER_ENTRIES // 2)
+    db = SessionLocal()
+    try:
+        print(f"\n{LEDGER_ENTRIES:,} ledger entries")
+        print(f"{'read':>26} {'points':>8} {'p50 ms':>8} {'stmts':>6}")
+        for label, as_of in (("now", None), ("mid-history", midpoint)):
+            balance, p50, statements = measure(db, puller_id, as_of)
+            print(f"{'opening only, ' + label:>26} {balance['points']:>8} {p50:>8.2f} {statements:>6.0f}")
+        result, elapsed = timed(take_snapshots, db)
+        print(f"snapshot job: {result['pullers']} puller(s) in {elapsed:.0f}ms")
+        for label, as_of in (("now", None), ("mid-history", midpoint)):
+            balance, p50, statements = measure(db, puller_id, as_of)
+            print(f"{'periodic, ' + label:>26} {balance['points']:>8} {p50:>8.2f} {statements:>6.0f}")
+    finally:
+        db.close()
+
+
+def run():
+    reset_database()
+    db = SessionLocal()
+    puller_ids = seed_pullers(db, 2)
+    db.close()
+    seed_reviews(puller_ids[0], ADJUSTMENTS)
+
+    failures = asyncio.run(concurrent_awards(puller_ids[0]))
+    balance_reads(puller_ids[1])
+
+    for failure in failures:
+        print(f"FAIL  {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(run())
@@ -0,0 +1,195 @@
+"""
+Query plan audit: drive every API endpoint against a seeded rides table,
+capture each SQL statement the routers issue, EXPLAIN it, and fail (exit 1)
+if any statement does a full scan of `rides`
+
+Usage: python -m benchmarks.query_plans [ride_count]   (default 1,000,000)
+"""
+import random
+import sys
+import uuid
+from datetime import datetime, timedelta
+from sqlalchemy import event, insert, text
+from benchmarks.common import (
+    ENGINES, SessionLocal, engine, reset_database, seed_locations, seed_pullers
+)
+from fastapi.testclient import TestClient
+from main import app
+from models.db_models import Ride, RideStatus, User
+from services.analytics_rollups import analytics_rollups
+from seed_data import LOCATIONS
+
+DEFAULT_RIDE_COUNT = 1_000_000
+PULLER_COUNT = 1000
+INSERT_CHUNK = 50_000
+
+# Endpoints allowed to scan the whole rides table, with the reason why
+ALLOWED_FULL_SCANS = {
+    "GET /api/admin/overview": "per-status GROUP BY over the status index, cached for ADMIN_STATS_TTL_SECONDS",
+    "GET /api/admin/export/rides": "bulk export streams every ride in the requested range by design",
+}
+
+# Status mix of the seeded history
+STATUS_WEIGHTS = [
+    (RideStatus.COMPLETED, 80),
+    (RideStatus.TIMEOUT, 15),
+    (RideStatus.PENDING_REVIEW, 4),
+    (RideStatus.PICKUP_CONFIRMED, 1),
+]
+
+
+def seed_rides(ride_count, puller_ids, user_id):
+    """Bulk-insert a year of ride history"""
+    rng = random.Random(11)
+    names = [loc["name"] for loc in LOCATIONS]
+    statuses = [status for status, weight in STATUS_WEIGHTS for _ in range(weight)]
+    start = datetime.utcnow() - timedelta(days=365)
+    with engine.begin() as conn:
+        for offset in range(0, ride_count, INSERT_CHUNK):
+            rows = []
+            for i in range(offset, min(offset + INSERT_CHUNK, ride_count)):
+                status = rng.choice(statuses)
+                requested_at = start + timedelta(seconds=rng.randint(0, 365 * 86400))
+                completed = status in (RideStatus.COMPLETED, RideStatus.PENDING_REVIEW)
+                rows.append({
+                    "ride_id": f"ride_seed{i:08d}",
+                    "user_id": user_id,
+                    "puller_id": None if status == RideStatus.TIMEOUT else rng.choice(puller_ids),
+                    "pickup": rng.choice(names),
+                    "destination": rng.choice(names),
+                    "status": status,
+                    "requested_at": requested_at,
+                    "completed_at": requested_at + timedelta(minutes=20) if completed else None,
+                    "dropoff_distance_error": rng.uniform(0, 150) if completed else None,
+                    "points_awarded": 8 if status == RideStatus.COMPLETED else 0,
+                })
+            conn.execute(insert(Ride), rows)
+        conn.execute(text("ANALYZE"))
+
+
+class StatementRecorder:
+    """Records (endpoint label, SQL, parameters) for every statement executed"""
+
+    def __init__(self):
+        self.label = "startup"
+        self.statements = []
+
+    def __call__(self, conn, cursor, statement, parameters, context, executemany):
+        if not executemany:
+            self.statements.append((self.label, statement, parameters))
+
+
+def drive_endpoints(client, recorder, puller_id):
+    """Exercise every router endpoint once"""
+    def call(method, path, **kwargs):
+        recorder.label = f"{method} {path.split('?')[0]}"
+        response = client.request(method, path, **kwargs)
+        assert response.status_code < 500, (method, path, response.text)
+        return response
+
+    email = f"audit_{uuid.uuid4().hex[:6]}@example.com"
+    call("POST", "/api/auth/signup", json={"email": email, "password": "pw", "name": "Audit",
+                                           "phone": "0170", "role": "puller"})
+    call("POST", "/api/auth/login", json={"email": email, "password": "pw"})
+
+    user_id = call("POST", "/api/rides/verify", json={
+        "laser_frequency": 777.0, "ultrasonic_duration": 3.5, "location_block": "CUET"
+    }).json()["user_id"]
+    ride_id = call("POST", "/api/rides/request", json={
+        "user_id": user_id, "pickup_location": "CUET", "destination": "Pahartoli"
+    }).json()["ride_id"]
+    call("GET", f"/api/rides/{ride_id}/status")
+    call("GET", f"/api/pullers/{puller_id}/alerts")
+    call("PUT", f"/api/pullers/{puller_id}/location?lat=22.46&lng=91.97")
+    call("POST", f"/api/pullers/{ride_id}/accept?puller_id={puller_id}")
+    call("POST", f"/api/rides/{ride_id}/user-reject")
+    call("POST", f"/api/pullers/{ride_id}/reject?puller_id={puller_id}")
+    call("POST", f"/api/pullers/{ride_id}/accept?puller_id={puller_id}")
+    call("POST", f"/api/rides/{ride_id}/user-accept")
+    call("GET", f"/api/pullers/{ride_id}/active?puller_id={puller_id}")
+    call("POST", f"/api/pullers/{ride_id}/pickup?puller_id={puller_id}")
+    # Far-off dropoff -> pending review, then resolved by the admin
+    call("POST", f"/api/pullers/{ride_id}/complete", json={
+        "puller_id": puller_id, "dropoff_lat": 22.50, "dropoff_lng": 91.70
+    })
+    call("POST", f"/api/admin/reviews/{ride_id}/resolve", json={"action": "adjust", "points_override": 3})
+
+    call("GET", f"/api/pullers/{puller_id}/dashboard")
+    call("GET", f"/api/pullers/{puller_id}/profile")
+    call("GET", f"/api/pullers/{puller_id}/balance?as_of=2020-01-01T00:00:00")
+    cursor = call("GET", f"/api/pullers/{puller_id}/history?limit=20").json()["next_cursor"]
+    call("GET", f"/api/pullers/{puller_id}/history?limit=20&cursor={cursor}&since=2020-01-01T00:00:00")
+    call("GET", f"/api/pullers/{puller_id}/history/export")
+    call("GET", "/api/admin/overview")
+    cursor = call("GET", "/api/admin/reviews/pending?limit=20").json()["next_cursor"]
+    call("GET", f"/api/admin/reviews/pending?limit=20&cursor={cursor}")
+    # The scheduler also runs this in the background; run it here under its own label
+    recorder.label = "analytics rollup compaction"
+    db = SessionLocal()
+    try:
+        analytics_rollups.compact(db)
+    finally:
+        db.close()
+    call("GET", "/api/admin/analytics")
+    call("GET", "/api/admin/analytics?since=2020-01-01&until=2030-01-01")
+    call("GET", "/api/admin/locations")
+    call("GET", "/api/admin/export/rides?format=ndjson&status=pending_review&since=2020-01-01T00:00:00")
+    call("GET", f"/api/admin/export/points?puller_id={puller_id}")
+
+
+def full_scans(conn, statement, parameters):
+    """Plan lines that read the entire rides table"""
+    if engine.dialect.name == "sqlite":
+        plan = conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters).fetchall()
+        return [row[-1] for row in plan if row[-1].startswith(("SCAN rides", "SCAN TABLE rides"))]
+    plan = conn.exec_driver_sql(f"EXPLAIN {statement}", parameters).fetchall()
+    return [row[0].strip() for row in plan if "Seq Scan on rides" in row[0]]
+
+
+def run(ride_count):
+    print(f"Seeding {ride_count:,} rides...")
+    reset_database()
+    db = SessionLocal()
+    seed_locations(db)
+    puller_ids = seed_pullers(db, PULLER_COUNT)
+    user = User(user_id="user_audit", laser_frequency=None)
+    db.add(user)
+    db.commit()
+    db.close()
+    seed_rides(ride_count, puller_ids, "user_audit")
+
+    recorder = StatementRecorder()
+    for target in ENGINES:
+        event.listen(target, "before_cursor_execute", recorder)
+    try:
+        with TestClient(app) as client:
+            drive_endpoints(client, recorder, puller_ids[0])
+    finally:
+        for target in ENGINES:
+            event.remove(target, "before_cursor_execute", recorder)
+
+    failures = 0
+    seen = set()
+    with engine.connect() as conn:
+        for label, statement, parameters in recorder.statements:
+            verb = statement.lstrip().split(None, 1)[0].upper()
+            if verb not in ("SELECT", "UPDATE", "DELETE") or (label, statement) in seen:
+                continue
+            seen.add((label, statement))
+            scans = full_scans(conn, statement, parameters)
+            if not scans:
+                continue
+            one_line = " ".join(statement.split())
+            if label in ALLOWED_FULL_SCANS:
+                print(f"ALLOWED  {label}: {scans} ({ALLOWED_FULL_SCANS[label]})")
+            else:
+                failures += 1
+                print(f"FAIL     {label}: {scans}\n         {one_line[:200]}")
+
+    print(f"\n{len(seen)} distinct statements audited, {failures} full scan(s) of rides")
+    return failures
+
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_RIDE_COUNT
+    sys.exit(1 if run(count) else 0)
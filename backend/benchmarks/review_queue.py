@@ -0,0 +1,70 @@
+"""
+Benchmark: admin review queue
+Latency and SQL statements for the first and the last page of
+GET /api/admin/reviews/pending as the PENDING_REVIEW backlog grows
+"""
+from datetime import datetime, timedelta
+from sqlalchemy import insert
+from benchmarks.common import QueryCounter, SessionLocal, engine, percentile, reset_database, seed_pullers, timed
+from fastapi.testclient import TestClient
+from main import app
+from models.db_models import Ride, RideStatus
+
+BACKLOG_SIZES = (1_000, 10_000, 50_000)
+PAGE_SIZE = 50
+REPEATS = 20
+
+
+def seed_reviews(count, puller_ids):
+    start = datetime.utcnow() - timedelta(days=30)
+    with engine.begin() as conn:
+        conn.execute(insert(Ride), [
+            {
+                "ride_id": f"ride_review{i:07d}",
+                "user_id": "user_bench",
+                "puller_id": puller_ids[i % len(puller_ids)],
+                "pickup": "CUET",
+                "destination": "Pahartoli",
+                "status": RideStatus.PENDING_REVIEW,
+                "requested_at": start + timedelta(seconds=i * 30),
+                "completed_at": start + timedelta(seconds=i * 30 + 1200),
+                "dropoff_distance_error": 150.0,
+            }
+            for i in range(count)
+        ])
+
+
+def measure(client, params):
+    latencies = []
+    with QueryCounter() as counter:
+        for _ in range(REPEATS):
+            response, elapsed = timed(client.get, "/api/admin/reviews/pending", params=params)
+            assert response.status_code == 200
+            latencies.append(elapsed)
+    return percentile(latencies, 50), counter.count / REPEATS, response.json()
+
+
+def run():
+    print(f"{'backlog':>8} {'page':>6} {'stmts/req':>10} {'p50 ms':>8}")
+    for size in BACKLOG_SIZES:
+        reset_database()
+        db = SessionLocal()
+        puller_ids = seed_pullers(db, 100)
+        db.close()
+        seed_reviews(size, puller_ids)
+
+        with TestClient(app) as client:
+            p50, statements, page = measure(client, {"limit": PAGE_SIZE})
+            print(f"{size:>8} {'first':>6} {statements:>10.1f} {p50:>8.2f}")
+
+            # Walk to the last page, then time fetching it
+            cursor = None
+            while page["next_cursor"]:
+                cursor = page["next_cursor"]
+                page = client.get("/api/admin/reviews/pending", params={"limit": PAGE_SIZE, "cursor": cursor}).json()
+            p50, statements, _ = measure(client, {"limit": PAGE_SIZE, "cursor": cursor})
+            print(f"{size:>8} {'last':>6} {statements:>10.1f} {p50:>8.2f}")
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,77 @@
+"""
+Benchmark: puller ride history
+First/last page latency and full NDJSON export time for one veteran
+puller as their history grows
+"""
+from datetime import datetime, timedelta
+from sqlalchemy import insert
+from benchmarks.common import QueryCounter, SessionLocal, engine, percentile, reset_database, seed_pullers, timed
+from fastapi.testclient import TestClient
+from main import app
+from models.db_models import Ride, RideStatus
+
+HISTORY_SIZES = (1_000, 10_000, 50_000)
+OTHER_PULLER_RIDES = 50_000
+PAGE_SIZE = 50
+REPEATS = 20
+
+
+def seed_history(puller_ids, count):
+    """count rides for the first puller, the rest spread over everyone else"""
+    start = datetime.utcnow() - timedelta(days=365)
+    rows = []
+    for i in range(count + OTHER_PULLER_RIDES):
+        completed_at = start + timedelta(seconds=i * 60)
+        rows.append({
+            "ride_id": f"ride_hist{i:07d}",
+            "user_id": "user_bench",
+            "puller_id": puller_ids[0] if i < count else puller_ids[1 + i % (len(puller_ids) - 1)],
+            "pickup": "CUET",
+            "destination": "Pahartoli",
+            "status": RideStatus.COMPLETED,
+            "requested_at": completed_at - timedelta(minutes=20),
+            "completed_at": completed_at,
+            "points_awarded": 8,
+        })
+    with engine.begin() as conn:
+        conn.execute(insert(Ride), rows)
+
+
+def page_p50(client, url, params):
+    latencies = []
+    with QueryCounter() as counter:
+        for _ in range(REPEATS):
+            response, elapsed = timed(client.get, url, params=params)
+            assert response.status_code == 200
+            latencies.append(elapsed)
+    return percentile(latencies, 50), counter.count / REPEATS
+
+
+def run():
+    print(f"{'rides':>7} {'page':>7} {'stmts/req':>10} {'p50 ms':>9}")
+    for size in HISTORY_SIZES:
+        reset_database()
+        db = SessionLocal()
+        puller_ids = seed_pullers(db, 20)
+        db.close()
+        seed_history(puller_ids, size)
+        url = f"/api/pullers/{puller_ids[0]}/history"
+
+        with TestClient(app) as client:
+            p50, statements = page_p50(client, url, {"limit": PAGE_SIZE})
+            print(f"{size:>7} {'first':>7} {statements:>10.1f} {p50:>9.2f}")
+
+            page, cursor = client.get(url, params={"limit": PAGE_SIZE}).json(), None
+            while page["next_cursor"]:
+                cursor = page["next_cursor"]
+                page = client.get(url, params={"limit": PAGE_SIZE, "cursor": cursor}).json()
+            p50, statements = page_p50(client, url, {"limit": PAGE_SIZE, "cursor": cursor})
+            print(f"{size:>7} {'last':>7} {statements:>10.1f} {p50:>9.2f}")
+
+            response, elapsed = timed(client.get, f"{url}/export")
+            assert len(response.text.splitlines()) == size
+            print(f"{size:>7} {'export':>7} {'':>10} {elapsed:>9.2f}")
+
+
+if __name__ == "__main__":
+    run()
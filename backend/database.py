@@ -1,21 +1,134 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event, exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
+import asyncio
 import os
 
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./aeras.db")
 
+def _async_url(url: str) -> str:
+    """Async driver URL for the same database (aiosqlite / asyncpg), whatever sync driver url names"""
+    scheme, _, rest = url.partition(":")
+    dialect = scheme.split("+", 1)[0]
+    if dialect == "sqlite":
+        return "sqlite+aiosqlite:" + rest
+    if dialect in ("postgresql", "postgres"):
+        return "postgresql+asyncpg:" + rest
+    return url
+
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL", _async_url(DATABASE_URL))
+
+# DB_ASYNC=0 serves the async endpoints from the sync engine instead
+DB_ASYNC = os.getenv("DB_ASYNC", "1") == "1"
+
+def _is_memory_sqlite(url: str) -> bool:
+    return url.startswith("sqlite") and (":memory:" in url or url.split("://", 1)[-1] in ("", "/"))
+
+def pool_options(url: str) -> dict:
+    """Connection pool settings for an engine on url, from DB_POOL_* env vars"""
+    if _is_memory_sqlite(url):
+        # One shared connection per thread / process - nothing to size
+        return {}
+    is_sqlite = url.startswith("sqlite")
+    options = {
+        "pool_size": int(os.getenv("DB_POOL_SIZE", "10")),
+        "max_overflow": int(os.getenv("DB_MAX_OVERFLOW", "20")),
+        "pool_timeout": float(os.getenv("DB_POOL_TIMEOUT", "30")),
+        # Server databases drop idle connections; a local SQLite file doesn't
+        "pool_pre_ping": os.getenv("DB_POOL_PRE_PING", "0" if is_sqlite else "1") == "1",
+        "pool_recycle": int(os.getenv("DB_POOL_RECYCLE", "-1" if is_sqlite else "1800")),
+    }
+    if url.startswith("sqlite+aiosqlite"):
+        # aiosqlite defaults to NullPool - a new connection (and thread) per checkout
+        options["poolclass"] = AsyncAdaptedQueuePool
+    return options
+
+# Applied to every new SQLite connection, set a value to "" to leave the default.
+# WAL lets readers run alongside the writer (timeout job, location updates),
+# NORMAL only fsyncs at checkpoints, which is safe in WAL mode
+SQLITE_PRAGMAS = {
+    "journal_mode": os.getenv("SQLITE_JOURNAL_MODE", "WAL"),
+    "synchronous": os.getenv("SQLITE_SYNCHRONOUS", "NORMAL"),
+    "busy_timeout": os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"),
+    "mmap_size": os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024)),
+}
+
+def apply_sqlite_pragmas(dbapi_connection, connection_record):
+    """connect event hook - tune a fresh SQLite connection"""
+    cursor = dbapi_connection.cursor()
+    for pragma, value in SQLITE_PRAGMAS.items():
+        if value:
+            cursor.execute(f"PRAGMA {pragma}={value}")
+    cursor.close()
+
 engine = create_engine(
     DATABASE_URL, 
-    connect_args={"check_same_thread": False} if "sqlite" in DATABASE_URL else {}
+    connect_args={"check_same_thread": False} if "sqlite" in DATABASE_URL else {},
+    **pool_options(DATABASE_URL)
 )
 
+def _create_async_engine(url: str):
+    """Async engine on url, or None when its driver is missing or not async"""
+    if not DB_ASYNC:
+        return None
+    try:
+        return create_async_engine(url, **pool_options(url))
+    except (ImportError, exc.InvalidRequestError) as e:
+        print(f"No async database driver ({e}) - async endpoints run on the sync engine")
+        return None
+
+# Async engine for the hot endpoints - requests waiting on the database
+# don't hold a threadpool worker
+async_engine = _create_async_engine(ASYNC_DATABASE_URL)
+
+if DATABASE_URL.startswith("sqlite"):
+    event.listen(engine, "connect", apply_sqlite_pragmas)
+if async_engine is not None and ASYNC_DATABASE_URL.startswith("sqlite"):
+    event.listen(async_engine.sync_engine, "connect", apply_sqlite_pragmas)
+
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+AsyncSessionLocal = (
+    async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False) if async_engine is not None else None
+)
 Base = declarative_base()
 
+class ThreadedSession:
+    """
+    AsyncSession stand-in over a sync Session, used without an async driver:
+    each call runs in a worker thread, so handlers written for get_async_db
+    work unchanged (at threadpool concurrency)
+    """
+    def __init__(self, session: Session):
+        self.sync_session = session
+    
+    async def execute(self, *args, **kwargs):
+        return await asyncio.to_thread(self.sync_session.execute, *args, **kwargs)
+    
+    async def commit(self):
+        await asyncio.to_thread(self.sync_session.commit)
+    
+    async def rollback(self):
+        await asyncio.to_thread(self.sync_session.rollback)
+    
+    async def run_sync(self, fn, *args, **kwargs):
+        return await asyncio.to_thread(fn, self.sync_session, *args, **kwargs)
+
 def get_db():
     db = SessionLocal()
     try:
         yield db
     finally:
         db.close()
+
+async def get_async_db():
+    if AsyncSessionLocal is None:
+        db = SessionLocal()
+        try:
+            yield ThreadedSession(db)
+        finally:
+            db.close()
+        return
+    async with AsyncSessionLocal() as db:
+        yield db
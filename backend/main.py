@@ -1,54 +1,95 @@
 from fastapi import FastAPI, Depends, HTTPException, status
+from fastapi.responses import Response
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.orm import Session
 from datetime import datetime, timedelta
 from apscheduler.schedulers.background import BackgroundScheduler
 from contextlib import asynccontextmanager
+import asyncio
 import jwt
 import os
 from dotenv import load_dotenv
 
-from database import engine, Base, get_db, SessionLocal
+from database import engine, async_engine, Base, get_db, SessionLocal
 from models.db_models import User, Puller, Ride, Location, RideStatus
 from routers import rides, pullers, admin, auth
+from services.location_registry import location_registry
+from services.puller_index import puller_index
+from services.ride_events import ride_events
+from services.ride_timeouts import ride_timeouts, expire_rides, RIDE_TIMEOUT_SECONDS
+from services.alert_service import load_alerts_feed
+from services.ride_rejections import ride_rejections
+from services.ride_offers import DISPATCH_MODE, OFFER_WINDOW_SECONDS
+from services.batch_dispatch import dispatch_batch, BATCH_DISPATCH_SECONDS
+from services.offer_dispatch import offer_engine
+from services.location_ingest import location_buffer, LOCATION_WRITE_BUFFER_MS
+from services.analytics_rollups import analytics_rollups, ANALYTICS_ROLLUP_SECONDS
+from services.points_ledger import open_legacy_accounts, take_snapshots, POINTS_SNAPSHOT_SECONDS
+from services.request_metrics import request_metrics, instrument_engine, RequestMetricsMiddleware
 
 load_dotenv()
 
 # Create tables
 Base.metadata.create_all(bind=engine)
 
-# Initialize background scheduler for timeout tasks (MVP requirement)
-scheduler = BackgroundScheduler()
+# Per-route SQL statement / time / row counts for /metrics
+instrument_engine(engine)
+if async_engine is not None:
+    instrument_engine(async_engine.sync_engine)
+
+# Safety-net sweep interval - the timeout scheduler fires timeouts on time,
+# the sweep only catches rides it never saw (e.g. created by another process)
+TIMEOUT_SWEEP_SECONDS = 300
 
 def check_ride_timeouts():
     """
-    Background task to check for ride timeouts (MVP requirement)
-    Runs every 10 seconds, marks rides > 60 seconds as TIMEOUT
+    Background sweep for ride timeouts (MVP requirement)
+    Marks every PENDING ride older than 60 seconds as TIMEOUT in one bulk UPDATE
     """
     db = SessionLocal()
     try:
-        timeout_threshold = datetime.utcnow() - timedelta(seconds=60)
-        
-        # Find pending rides that have exceeded 60 seconds
-        expired_rides = db.query(Ride).filter(
-            Ride.status == RideStatus.PENDING,
-            Ride.requested_at < timeout_threshold
-        ).all()
-        
-        for ride in expired_rides:
-            ride.status = RideStatus.TIMEOUT
-            print(f"Ride {ride.ride_id} marked as TIMEOUT")
-        
-        if expired_rides:
-            db.commit()
-            print(f"Marked {len(expired_rides)} rides as timeout")
+        timeout_threshold = datetime.utcnow() - timedelta(seconds=RIDE_TIMEOUT_SECONDS)
+        expire_rides(db, Ride.requested_at < timeout_threshold)
     except Exception as e:
         print(f"Error in timeout checker: {e}")
         db.rollback()
     finally:
         db.close()
 
+def compact_analytics_rollups():
+    """Refresh the daily analytics rollups for days whose rides can still change"""
+    db = SessionLocal()
+    try:
+        analytics_rollups.compact(db)
+    except Exception as e:
+        print(f"Error compacting analytics rollups: {e}")
+    finally:
+        db.close()
+
+def snapshot_points_ledger():
+    """Roll puller balances forward from the points ledger and reconcile it against rides"""
+    db = SessionLocal()
+    try:
+        result = take_snapshots(db)
+        if result["mismatches"]:
+            print(f"Points ledger: {result['mismatches']} entries disagree with their rides")
+    except Exception as e:
+        print(f"Error snapshotting points ledger: {e}")
+        db.rollback()
+    finally:
+        db.close()
+
+def dispatch_ride_batch():
+    """Offer pending rides to the pullers of a minimum total pickup distance matching (DISPATCH_MODE=batch)"""
+    db = SessionLocal()
+    try:
+        dispatch_batch(db)
+    except Exception as e:
+        print(f"Error in batch dispatch: {e}")
+    finally:
+        db.close()
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """
@@ -56,15 +97,63 @@ async def lifespan(app: FastAPI):
     Replaces deprecated @app.on_event decorators
     """
     # Startup
+    # Ride status versions and long-poll waiters, WebSocket connections, the
+    # alerts feed and dispatch offers live in this process's memory - a second
+    # worker would hand out its own ETags and never wake the other's waiters
+    if int(os.getenv("WEB_CONCURRENCY", "1")) > 1:
+        raise RuntimeError("AERAS keeps live ride state in memory - run a single worker (WEB_CONCURRENCY=1)")
     print("AERAS Backend started")
-    scheduler.add_job(check_ride_timeouts, 'interval', seconds=10)
+    ride_events.bind_loop(asyncio.get_running_loop())
+    offer_engine.bind_loop(asyncio.get_running_loop())
+    db = SessionLocal()
+    try:
+        count = location_registry.load(db)
+        print(f"Location registry loaded ({count} locations)")
+        count = puller_index.load(db)
+        print(f"Puller index loaded ({count} available pullers)")
+        count = ride_timeouts.load(db)
+        print(f"Ride timeouts armed ({count} pending rides)")
+        count = load_alerts_feed(db)
+        print(f"Alerts feed loaded ({count} pending rides)")
+        count = ride_rejections.load(db)
+        print(f"Ride rejections loaded ({count} pending rides)")
+        count = open_legacy_accounts(db)
+        if count:
+            print(f"Points ledger opened for {count} existing pullers")
+        count = analytics_rollups.load(db)
+        if count:
+            print(f"Analytics rollups backfilling {count} days")
+    finally:
+        db.close()
+    
+    ride_timeouts.start()
+    # Background scheduler for periodic maintenance jobs - one per startup,
+    # since a shut down scheduler cannot be started again
+    scheduler = BackgroundScheduler()
+    scheduler.add_job(check_ride_timeouts, 'interval', seconds=TIMEOUT_SWEEP_SECONDS)
+    scheduler.add_job(
+        compact_analytics_rollups, 'interval', seconds=ANALYTICS_ROLLUP_SECONDS, next_run_time=datetime.now()
+    )
+    scheduler.add_job(snapshot_points_ledger, 'interval', seconds=POINTS_SNAPSHOT_SECONDS)
+    if DISPATCH_MODE == "batch":
+        scheduler.add_job(dispatch_ride_batch, 'interval', seconds=BATCH_DISPATCH_SECONDS)
+        print(f"Batch dispatch enabled ({BATCH_DISPATCH_SECONDS}s ticks)")
+    elif DISPATCH_MODE == "offer":
+        print(f"Sequential offer dispatch enabled ({OFFER_WINDOW_SECONDS}s windows)")
     scheduler.start()
-    print("Background timeout checker started (10s interval)")
+    print(f"Ride timeout scheduler started ({TIMEOUT_SWEEP_SECONDS}s safety sweep)")
+    if LOCATION_WRITE_BUFFER_MS > 0:
+        scheduler.add_job(location_buffer.flush, 'interval', seconds=LOCATION_WRITE_BUFFER_MS / 1000)
+        print(f"Location write buffer enabled ({LOCATION_WRITE_BUFFER_MS}ms flush)")
     
     yield
     
     # Shutdown
+    ride_timeouts.stop()
     scheduler.shutdown()
+    location_buffer.flush()
+    if async_engine is not None:
+        await async_engine.dispose()
     print("Background scheduler stopped")
 
 app = FastAPI(title="AERAS E-Rickshaw Backend", lifespan=lifespan)
@@ -78,6 +167,9 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Outermost, so the recorded wall time covers every other middleware
+app.add_middleware(RequestMetricsMiddleware)
+
 # Include routers
 app.include_router(auth.router, prefix="/api/auth", tags=["auth"])
 app.include_router(rides.router, prefix="/api/rides", tags=["rides"])
@@ -88,6 +180,11 @@ app.include_router(admin.router, prefix="/api/admin", tags=["admin"])
 def read_root():
     return {"message": "AERAS E-Rickshaw API"}
 
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    """Per-route request and SQL totals, Prometheus text format"""
+    return Response(request_metrics.render(), media_type="text/plain; version=0.0.4")
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
@@ -0,0 +1,36 @@
+"""
+Add the query indexes declared in models/db_models.py to an existing database
+Base.metadata.create_all only creates missing tables, so databases created
+before an index was declared need this one-off migration (safe to re-run)
+"""
+from sqlalchemy import inspect, text
+from database import engine, Base
+import models.db_models  # Registers the tables on Base.metadata
+
+def migrate_indexes():
+    inspector = inspect(engine)
+    existing_tables = set(inspector.get_table_names())
+    
+    created = 0
+    for table in Base.metadata.sorted_tables:
+        if table.name not in existing_tables:
+            continue  # create_all will build it together with its indexes
+        existing = {index["name"] for index in inspector.get_indexes(table.name)}
+        for index in table.indexes:
+            if index.name in existing:
+                print(f"✓  {index.name}")
+                continue
+            index.create(bind=engine)
+            created += 1
+            print(f"✅ Created {index.name} on {table.name}")
+    
+    if created:
+        # Refresh planner statistics so the new indexes get used
+        with engine.begin() as conn:
+            conn.execute(text("ANALYZE"))
+    print(f"\n✅ {created} index(es) created")
+
+if __name__ == "__main__":
+    print("🔧 Migrating database indexes...")
+    print()
+    migrate_indexes()
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Float, Integer, Enum, DateTime, ForeignKey, Boolean
+from sqlalchemy import Column, String, Float, Integer, Enum, DateTime, Date, ForeignKey, Boolean, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 import enum
@@ -52,6 +52,11 @@ class Puller(Base):
     
     user = relationship("User")
     rides = relationship("Ride", back_populates="puller")
+    
+    __table_args__ = (
+        # Overview online-puller counts and the available-puller index load
+        Index("ix_pullers_status", "status"),
+    )
 
 class Location(Base):
     __tablename__ = "locations"
@@ -80,6 +85,18 @@ class Ride(Base):
     
     user = relationship("User", back_populates="rides")
     puller = relationship("Puller", back_populates="rides")
+    
+    __table_args__ = (
+        # Pending alerts feed, timeout sweep (status, requested_at < ?) and
+        # per-status counts (index-only)
+        Index("ix_rides_status_requested_at", "status", "requested_at"),
+        # Puller dashboard / history: (puller_id, status) ordered by completed_at
+        Index("ix_rides_puller_status_completed_at", "puller_id", "status", "completed_at"),
+        # Puller ride history: keyset pages over (completed_at, ride_id) per puller
+        Index("ix_rides_puller_completed_at_ride_id", "puller_id", "completed_at", "ride_id"),
+        # Admin review queue: keyset pages over (completed_at, ride_id) per status
+        Index("ix_rides_status_completed_at_ride_id", "status", "completed_at", "ride_id"),
+    )
 
 class PointsHistory(Base):
     __tablename__ = "points_history"
@@ -93,3 +110,66 @@ class PointsHistory(Base):
     
     puller = relationship("Puller")
     ride = relationship("Ride")
+    
+    __table_args__ = (
+        # Points export / per-puller history filtered by date, ledger tail sums
+        Index("ix_points_history_puller_created_at", "puller_id", "created_at"),
+        # Ledger snapshot job: entries written since the last snapshot
+        Index("ix_points_history_created_at", "created_at"),
+    )
+
+class PointsSnapshot(Base):
+    """A puller's balance over every points_history entry created at or before as_of"""
+    __tablename__ = "points_snapshots"
+    
+    puller_id = Column(String, ForeignKey("pullers.puller_id"), primary_key=True)
+    as_of = Column(DateTime, primary_key=True)
+    kind = Column(String)  # "opening" (signup / legacy balance) or "periodic" (snapshot job)
+    points = Column(Integer, default=0)
+    total_rides = Column(Integer, default=0)
+    
+    __table_args__ = (
+        # Snapshot job watermark: latest periodic as_of
+        Index("ix_points_snapshots_kind_as_of", "kind", "as_of"),
+    )
+
+class RideDailyRollup(Base):
+    """Ride counts per requested day x route x status, rebuilt from rides by services.analytics_rollups"""
+    __tablename__ = "ride_daily_rollups"
+    
+    day = Column(Date, primary_key=True)
+    pickup = Column(String, primary_key=True)
+    destination = Column(String, primary_key=True)
+    status = Column(Enum(RideStatus), primary_key=True)
+    ride_count = Column(Integer, default=0)
+    points_awarded = Column(Integer, default=0)
+    dropoff_error_sum = Column(Float, default=0.0)
+    dropoff_error_count = Column(Integer, default=0)
+
+class PullerDailyRollup(Base):
+    """Finished rides, points and dropoff accuracy per requested day x puller"""
+    __tablename__ = "puller_daily_rollups"
+    
+    day = Column(Date, primary_key=True)
+    puller_id = Column(String, ForeignKey("pullers.puller_id"), primary_key=True)
+    rides_finished = Column(Integer, default=0)
+    points_awarded = Column(Integer, default=0)
+    dropoff_error_sum = Column(Float, default=0.0)
+    dropoff_error_count = Column(Integer, default=0)
+
+class RideRejection(Base):
+    """A puller declined a ride's alert - it stays hidden from them until the ride expires"""
+    __tablename__ = "ride_rejections"
+    
+    # (ride_id, puller_id) key doubles as the startup index: rejections of PENDING rides
+    ride_id = Column(String, ForeignKey("rides.ride_id"), primary_key=True)
+    puller_id = Column(String, ForeignKey("pullers.puller_id"), primary_key=True)
+    rejected_at = Column(DateTime, default=datetime.utcnow)
+
+class RideOffer(Base):
+    """The latest exclusive offer on a dispatched ride - accept_ride's UPDATE only lets its holder claim it until it expires"""
+    __tablename__ = "ride_offers"
+    
+    ride_id = Column(String, ForeignKey("rides.ride_id"), primary_key=True)
+    puller_id = Column(String, ForeignKey("pullers.puller_id"))
+    expires_at = Column(DateTime)
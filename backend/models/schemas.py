@@ -58,6 +58,19 @@ class LocationResponse(BaseModel):
     lat: float
     lng: float
 
+class LocationUpdateRequest(BaseModel):
+    lat: float
+    lng: float
+
+class LocationFix(BaseModel):
+    puller_id: str
+    lat: float
+    lng: float
+    recorded_at: Optional[datetime] = None  # Device timestamp - newest fix wins
+
+class LocationBatchRequest(BaseModel):
+    fixes: list[LocationFix]
+
 class PullerProfileResponse(BaseModel):
     puller_id: str
     name: str
@@ -1,9 +1,19 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy import tuple_
+from sqlalchemy.orm import Session, joinedload, load_only
 from database import get_db
-from models.db_models import Ride, RideStatus, Puller, User, PointsHistory, PullerStatus
-from models.schemas import ResolveReviewRequest
-from datetime import datetime
+from models.db_models import Ride, RideStatus, Puller, User, PointsHistory, PullerStatus, Location
+from models.schemas import ResolveReviewRequest, LocationUpdateRequest
+from services.location_registry import location_registry
+from services.alert_service import load_alerts_feed
+from services.ride_versions import ride_versions
+from services.stats_cache import ride_status_counts, puller_status_counts
+from services.exports import stream_export, EXPORT_MEDIA_TYPES
+from services.analytics_rollups import analytics_rollups, summarize
+from utils.pagination import encode_cursor, decode_cursor
+from datetime import date, datetime
+from typing import Literal, Optional
 import uuid
 
 router = APIRouter()
@@ -11,17 +21,19 @@ router = APIRouter()
 @router.get("/overview")
 def get_overview(db: Session = Depends(get_db)):
     """Get real-time admin overview (MVP requirement)"""
-    active_rides = db.query(Ride).filter(
-        Ride.status.in_([RideStatus.PENDING, RideStatus.PULLER_ASSIGNED, RideStatus.PICKUP_CONFIRMED])
-    ).count()
+    # Served from one GROUP BY per table, cached for a couple of seconds
+    ride_counts = ride_status_counts(db)
+    puller_counts = puller_status_counts(db)
     
-    online_pullers = db.query(Puller).filter(
-        Puller.status.in_([PullerStatus.AVAILABLE, PullerStatus.BUSY])
-    ).count()
+    active_rides = sum(ride_counts.get(status, 0) for status in (
+        RideStatus.PENDING, RideStatus.PULLER_ASSIGNED, RideStatus.PICKUP_CONFIRMED
+    ))
     
-    pending_reviews = db.query(Ride).filter(
-        Ride.status == RideStatus.PENDING_REVIEW
-    ).count()
+    online_pullers = sum(puller_counts.get(status, 0) for status in (
+        PullerStatus.AVAILABLE, PullerStatus.BUSY
+    ))
+    
+    pending_reviews = ride_counts.get(RideStatus.PENDING_REVIEW, 0)
     
     return {
         "active_rides": active_rides,
@@ -29,26 +41,55 @@ def get_overview(db: Session = Depends(get_db)):
         "pending_reviews": pending_reviews
     }
 
+# Review queue page size (default / max)
+REVIEW_PAGE_SIZE = 50
+MAX_REVIEW_PAGE_SIZE = 200
+
 @router.get("/reviews/pending")
-def get_pending_reviews(db: Session = Depends(get_db)):
-    """Get rides pending admin review (distance > 100m) - MVP requirement"""
-    pending_rides = db.query(Ride).filter(
-        Ride.status == RideStatus.PENDING_REVIEW
-    ).all()
-    
-    reviews = []
-    for ride in pending_rides:
-        puller = db.query(Puller).filter(Puller.puller_id == ride.puller_id).first()
-        
-        reviews.append({
+def get_pending_reviews(
+    cursor: str = None,
+    limit: int = Query(REVIEW_PAGE_SIZE, ge=1, le=MAX_REVIEW_PAGE_SIZE),
+    db: Session = Depends(get_db)
+):
+    """
+    Get rides pending admin review (distance > 100m) - MVP requirement
+    Oldest first, one query per page: puller joined in, keyset pagination on
+    (completed_at, ride_id) - pass next_cursor back as cursor for the next page
+    """
+    query = db.query(Ride).options(
+        load_only(Ride.ride_id, Ride.destination, Ride.dropoff_distance_error, Ride.completed_at),
+        joinedload(Ride.puller).load_only(Puller.name)
+    ).filter(Ride.status == RideStatus.PENDING_REVIEW)
+    
+    if cursor:
+        try:
+            after_completed_at, after_ride_id = decode_cursor(cursor, datetime, str)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        query = query.filter(
+            tuple_(Ride.completed_at, Ride.ride_id) > tuple_(after_completed_at, after_ride_id)
+        )
+    
+    # One extra row tells whether another page exists
+    pending_rides = query.order_by(Ride.completed_at, Ride.ride_id).limit(limit + 1).all()
+    next_cursor = None
+    if len(pending_rides) > limit:
+        pending_rides = pending_rides[:limit]
+        last = pending_rides[-1]
+        next_cursor = encode_cursor(last.completed_at, last.ride_id)
+    
+    reviews = [
+        {
             "ride_id": ride.ride_id,
-            "puller_name": puller.name if puller else "Unknown",
+            "puller_name": ride.puller.name if ride.puller else "Unknown",
             "destination": ride.destination,
             "distance_error": ride.dropoff_distance_error or 0,
             "calculated_points": 0  # Would be adjusted by admin
-        })
+        }
+        for ride in pending_rides
+    ]
     
-    return {"rides": reviews}
+    return {"rides": reviews, "next_cursor": next_cursor}
 
 @router.post("/reviews/{ride_id}/resolve")
 def resolve_review(ride_id: str, request: ResolveReviewRequest, db: Session = Depends(get_db)):
@@ -79,11 +120,7 @@ def resolve_review(ride_id: str, request: ResolveReviewRequest, db: Session = De
         ride.points_awarded = points
         ride.status = RideStatus.COMPLETED
         
-        # Update puller points
-        puller.points += points
-        puller.total_rides += 1
-        
-        # Create points history entry
+        # Ledger entry - the puller's balance is derived from it
         transaction = PointsHistory(
             transaction_id=f"txn_{uuid.uuid4().hex[:8]}",
             puller_id=ride.puller_id,
@@ -95,7 +132,10 @@ def resolve_review(ride_id: str, request: ResolveReviewRequest, db: Session = De
     else:
         raise HTTPException(status_code=400, detail="Invalid action. Use 'approve' or 'adjust'")
     
+    puller_id = ride.puller_id
     db.commit()
+    ride_versions.bump(ride_id, puller_id)
+    analytics_rollups.mark_dirty(ride.requested_at.date())
     
     return {
         "success": True,
@@ -103,13 +143,98 @@ def resolve_review(ride_id: str, request: ResolveReviewRequest, db: Session = De
     }
 
 @router.get("/analytics")
-def get_analytics(db: Session = Depends(get_db)):
-    """Basic analytics (MVP requirement)"""
-    total_rides = db.query(Ride).count()
-    completed_rides = db.query(Ride).filter(Ride.status == RideStatus.COMPLETED).count()
+def get_analytics(since: Optional[date] = None, until: Optional[date] = None, db: Session = Depends(get_db)):
+    """Ride analytics for requested days in [since, until), summed from the daily rollups"""
+    if since and until and since >= until:
+        raise HTTPException(status_code=400, detail="since must be before until")
+    return summarize(db, since, until)
+
+def _export_response(build_query, columns, fmt: str, name: str) -> StreamingResponse:
+    fields = [column.name for column in columns]
+    return StreamingResponse(
+        stream_export(build_query, fields, fmt),
+        media_type=EXPORT_MEDIA_TYPES[fmt],
+        headers={"Content-Disposition": f'attachment; filename="{name}.{fmt}"'}
+    )
+
+@router.get("/export/rides")
+def export_rides(
+    format: Literal["csv", "ndjson"] = "csv",
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    status: Optional[RideStatus] = None,
+    puller_id: Optional[str] = None
+):
+    """Stream rides requested in [since, until) as CSV or NDJSON, constant memory"""
+    columns = list(Ride.__table__.columns)
     
+    def build_query(db: Session):
+        query = db.query(*columns)
+        if since:
+            query = query.filter(Ride.requested_at >= since)
+        if until:
+            query = query.filter(Ride.requested_at < until)
+        if status:
+            query = query.filter(Ride.status == status)
+        if puller_id:
+            query = query.filter(Ride.puller_id == puller_id)
+        return query
+    
+    return _export_response(build_query, columns, format, "rides")
+
+@router.get("/export/points")
+def export_points(
+    format: Literal["csv", "ndjson"] = "csv",
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    puller_id: Optional[str] = None
+):
+    """Stream points history entries created in [since, until) as CSV or NDJSON"""
+    columns = list(PointsHistory.__table__.columns)
+    
+    def build_query(db: Session):
+        query = db.query(*columns)
+        if since:
+            query = query.filter(PointsHistory.created_at >= since)
+        if until:
+            query = query.filter(PointsHistory.created_at < until)
+        if puller_id:
+            query = query.filter(PointsHistory.puller_id == puller_id)
+        return query
+    
+    return _export_response(build_query, columns, format, "points_history")
+
+@router.get("/locations")
+def list_locations(db: Session = Depends(get_db)):
+    """List known pickup/destination locations (served from the location registry)"""
+    locations = location_registry.all(db)
     return {
-        "total_rides": total_rides,
-        "completed_rides": completed_rides,
-        "completion_rate": (completed_rides / total_rides * 100) if total_rides > 0 else 0
+        "version": location_registry.version,
+        "locations": [
+            {"name": name, "lat": coords.lat, "lng": coords.lng}
+            for name, coords in sorted(locations.items())
+        ]
     }
+
+@router.put("/locations/{name}")
+def upsert_location(name: str, request: LocationUpdateRequest, db: Session = Depends(get_db)):
+    """Create or move a location and refresh the in-memory registry"""
+    location = db.query(Location).filter(Location.name == name).first()
+    if location:
+        location.lat = request.lat
+        location.lng = request.lng
+    else:
+        db.add(Location(name=name, lat=request.lat, lng=request.lng))
+    db.commit()
+    
+    location_registry.load(db)
+    # Pending rides are filed under their pickup's grid cell
+    load_alerts_feed(db)
+    return {"success": True, "version": location_registry.version}
+
+@router.post("/locations/reload")
+def reload_locations(db: Session = Depends(get_db)):
+    """Reload the location registry after locations were changed outside the API"""
+    count = location_registry.load(db)
+    load_alerts_feed(db)
+    return {"success": True, "locations": count, "version": location_registry.version}
@@ -7,6 +7,7 @@ import uuid
 from database import get_db
 from models.db_models import User, Puller, UserRole
 from models.schemas import SignUpRequest, LoginRequest, TokenResponse
+from services.points_ledger import open_account
 import os
 
 router = APIRouter()
@@ -64,6 +65,7 @@ def signup(request: SignUpRequest, db: Session = Depends(get_db)):
             phone=request.phone
         )
         db.add(puller)
+        open_account(db, puller_id)
         db.commit()
     
     token = create_access_token({"user_id": user_id, "email": request.email, "role": request.role.value})
@@ -1,110 +1,197 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, WebSocket
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from sqlalchemy import exc
+from sqlalchemy import exc, select, tuple_, update
 from datetime import datetime, timedelta
-from database import get_db
-from models.db_models import Ride, Puller, RideStatus, PullerStatus, Location, User, PointsHistory
-from models.schemas import RideAlertResponse, PullerProfileResponse, ActiveRideResponse, RideCompleteRequest, RideCompleteResponse
+from database import get_db, get_async_db
+from models.db_models import Ride, Puller, RideStatus, PullerStatus, User, PointsHistory
+from models.schemas import RideAlertResponse, PullerProfileResponse, ActiveRideResponse, RideCompleteRequest, RideCompleteResponse, LocationBatchRequest
 from services.points_service import calculate_points
+from services.points_ledger import balance_as_of
+from services.location_registry import location_registry
+from services.puller_index import puller_index
+from services.alert_service import ALERT_RADIUS_M, ALERT_TOP_K, withdraw_offers
+from services.alert_windows import alert_windows
+from services.alerts_feed import alerts_feed
+from services.analytics_rollups import analytics_rollups
+from services.ride_rejections import ride_rejections
+from services.ride_offers import ride_offers, claimable_by, end_offer, DISPATCH_MODE
+from services.offer_dispatch import offer_engine
+from services.ride_events import ride_events, RIDE_TAKEN
+from services.ride_versions import ride_versions
+from services.ride_timeouts import ride_timeouts
+from services.exports import stream_export, EXPORT_MEDIA_TYPES
+from services.location_ingest import apply_location_fixes, coalesce_fixes, location_buffer, LOCATION_WRITE_BUFFER_MS
 from utils.gps_utils import haversine_distance
+from utils.pagination import encode_cursor, decode_cursor
 import uuid
+from typing import Literal, Optional
 
 router = APIRouter()
 
-# Alert timeout in seconds (MVP requirement - matches ride timeout in main.py)
-ALERT_TIMEOUT_SECONDS = 60
+def _localize_alerts(nearby: list[tuple[dict, float]]) -> list[dict]:
+    """Per-puller copies of feed alerts [(alert, meters)] with expires_in and distance_to_pickup"""
+    now = datetime.utcnow()
+    localized = []
+    for alert, distance in nearby:
+        # Only show if not expired
+        expires_in = int((alert["expires_at"] - now).total_seconds())
+        if expires_in > 0:
+            localized.append({**alert, "distance_to_pickup": distance, "expires_in": expires_in})
+    return localized
+
+async def _puller_position(db: AsyncSession, puller_id: str) -> Optional[tuple[float, float]]:
+    """(lat, lng) of the puller - from the index while AVAILABLE, else from the database"""
+    found = puller_index.positions((puller_id,))
+    if found:
+        return found[0][1:]
+    puller = (await db.execute(
+        select(Puller.current_lat, Puller.current_lng).where(Puller.puller_id == puller_id)
+    )).first()
+    return (puller.current_lat, puller.current_lng) if puller else None
+
+def _hidden_from(puller_id: str):
+    # Rides this puller rejected or that are offered to someone else are
+    # skipped before they are measured
+    return ride_offers.hidden_from(puller_id, ride_rejections.rejected_by(puller_id))
+
+def _window_reset(puller_id: str, position: tuple[float, float]) -> tuple[int, list[dict]]:
+    """(cursor, the puller's full window of localized alerts), remembered for their next delta poll"""
+    # Only rides filed under grid cells near the puller are measured, and the
+    # nearest k are kept with a bounded heap (no scan or sort of the backlog)
+    cursor, nearby = alerts_feed.nearest(*position, ALERT_TOP_K, ALERT_RADIUS_M, exclude=_hidden_from(puller_id))
+    alerts = _localize_alerts(nearby)
+    alert_windows.store(puller_id, cursor, *position, (alert["ride_id"] for alert in alerts))
+    return cursor, alerts
+
+def _window_delta(puller_id: str, since: int, position: tuple[float, float]) -> Optional[dict]:
+    """Exact changes to the window the puller holds at since, or None if it has to be reset"""
+    window = alert_windows.get(puller_id)
+    if window is None or window.cursor != since or window.cell != alert_windows.cell_of(*position):
+        return None
+    if since == alerts_feed.cursor and not window.stale:
+        return {"cursor": since, "added": [], "changed": [], "removed": []}
+
+    ranked = alerts_feed.nearest_since(
+        since, *position, ALERT_TOP_K, ALERT_RADIUS_M, exclude=_hidden_from(puller_id)
+    )
+    if ranked is None:
+        return None
+    cursor, nearby, touched = ranked
+    alerts = _localize_alerts(nearby)
+    current = {alert["ride_id"] for alert in alerts}
+    alert_windows.store(puller_id, cursor, *position, current)
+    return {
+        "cursor": cursor,
+        "added": [alert for alert in alerts if alert["ride_id"] not in window.ride_ids],
+        "changed": [
+            alert for alert in alerts if alert["ride_id"] in window.ride_ids and alert["ride_id"] in touched
+        ],
+        "removed": [ride_id for ride_id in window.ride_ids if ride_id not in current]
+    }
 
 @router.get("/{puller_id}/alerts")
-def get_alerts(puller_id: str, db: Session = Depends(get_db)):
+async def get_alerts(puller_id: str, since: Optional[int] = None, db: AsyncSession = Depends(get_async_db)):
     """
     Get available ride alerts for puller (MVP requirements)
-    Returns alerts sorted by distance with 30-second expiration
+    Returns the ALERT_TOP_K nearest rides within ALERT_RADIUS_M, nearest
+    first, with 30-second expiration and a feed cursor. Polling with
+    ?since=<cursor> returns the alerts that entered ("added") or left
+    ("removed") that window after it and those in it that changed, plus
+    the next cursor - applied to the client's list it stays the current
+    top k. If the server cannot diff against the client's list (another
+    cursor, the puller moved to another grid cell, a restart) the response
+    carries "reset": true and "added" is the full current window instead
     """
-    puller = db.query(Puller).filter(Puller.puller_id == puller_id).first()
-    if not puller:
+    position = await _puller_position(db, puller_id)
+    if since is not None:
+        if not position:
+            return {"cursor": alerts_feed.cursor, "added": [], "changed": [], "removed": [], "reset": True}
+        delta = _window_delta(puller_id, since, position)
+        if delta is not None:
+            return delta
+        cursor, alerts = _window_reset(puller_id, position)
+        return {"cursor": cursor, "added": alerts, "changed": [], "removed": [], "reset": True}
+
+    if not position:
         # Return empty alerts instead of 404 - better UX
         return {"alerts": []}
-    
-    # Get pending rides
-    pending_rides = db.query(Ride).filter(
-        Ride.status == RideStatus.PENDING
-    ).all()
-    
-    alerts = []
-    for ride in pending_rides:
-        pickup_loc = db.query(Location).filter(Location.name == ride.pickup).first()
-        dest_loc = db.query(Location).filter(Location.name == ride.destination).first()
-        
-        if pickup_loc and dest_loc:
-            # Distance from puller to pickup
-            distance_to_pickup = haversine_distance(
-                puller.current_lat, puller.current_lng,
-                pickup_loc.lat, pickup_loc.lng
-            )
-            
-            # Calculate potential points (distance from pickup to destination)
-            route_distance = haversine_distance(
-                pickup_loc.lat, pickup_loc.lng,
-                dest_loc.lat, dest_loc.lng
-            )
-            
-            # Estimate potential points (assuming perfect dropoff)
-            potential_points = 10  # Best case scenario
-            
-            # Calculate expiration time
-            time_elapsed = (datetime.utcnow() - ride.requested_at).total_seconds()
-            expires_in = max(0, int(ALERT_TIMEOUT_SECONDS - time_elapsed))
-            
-            # Only show if not expired
-            if expires_in > 0:
-                alerts.append({
-                    "ride_id": ride.ride_id,
-                    "pickup": ride.pickup,
-                    "destination": ride.destination,
-                    "distance_to_pickup": distance_to_pickup,
-                    "potential_points": potential_points,
-                    "expires_in": expires_in,
-                    "requested_at": ride.requested_at.isoformat()
-                })
-    
-    # Sort by distance (nearest first)
-    alerts.sort(key=lambda x: x["distance_to_pickup"])
-    return {"alerts": alerts}
+
+    cursor, alerts = _window_reset(puller_id, position)
+    return {"alerts": alerts, "cursor": cursor}
+
+@router.websocket("/{puller_id}/ws")
+async def ride_events_socket(websocket: WebSocket, puller_id: str):
+    """
+    Push ride events to a puller instead of polling /alerts
+    Events: ride_new and ride_offer (alert payload, ride_offer with
+    offer_expires_in), ride_taken, ride_expired and offer_withdrawn (ride_id)
+    """
+    await ride_events.serve(puller_id, websocket)
 
 @router.post("/{ride_id}/accept")
-def accept_ride(ride_id: str, puller_id: str, db: Session = Depends(get_db)):
+async def accept_ride(ride_id: str, puller_id: str, db: AsyncSession = Depends(get_async_db)):
     """
     Accept ride with RACE CONDITION PROTECTION (MVP critical requirement)
-    Uses database transaction with row locking - first-accept wins
+    Single conditional UPDATE guarded on status=PENDING - first-accept wins
+    on any backend (SQLite ignores FOR UPDATE), no row locks held across reads
     """
     try:
-        # Start transaction with row-level lock
-        ride = db.query(Ride).filter(Ride.ride_id == ride_id).with_for_update().first()
+        ride = (await db.execute(
+            select(Ride.pickup, Ride.destination, Ride.status, Ride.requested_at).where(Ride.ride_id == ride_id)
+        )).first()
         
         if not ride:
             raise HTTPException(status_code=404, detail="Ride not found")
         
-        # Check if already accepted by another puller
+        # Cheap early exit - the UPDATE below is what actually decides
         if ride.status != RideStatus.PENDING:
             raise HTTPException(status_code=400, detail="Ride already accepted by another puller")
         
-        # Get puller and location details
-        puller = db.query(Puller).filter(Puller.puller_id == puller_id).first()
-        if not puller:
-            raise HTTPException(status_code=404, detail="Puller not found")
-        
-        pickup_loc = db.query(Location).filter(Location.name == ride.pickup).first()
-        dest_loc = db.query(Location).filter(Location.name == ride.destination).first()
-        
-        # Update ride status (first-accept wins)
-        ride.puller_id = puller_id
-        ride.status = RideStatus.PULLER_ASSIGNED
-        ride.accepted_at = datetime.utcnow()
+        # Update ride status (first-accept wins, losers match zero rows).
+        # Dispatched rides can only be taken by the puller holding a live
+        # offer - checked in the same UPDATE, so an offer that lapses or
+        # moves on mid-request can't let the wrong puller in
+        now = datetime.utcnow()
+        claim = update(Ride).where(Ride.ride_id == ride_id, Ride.status == RideStatus.PENDING)
+        if DISPATCH_MODE != "race":
+            claim = claim.where(claimable_by(puller_id, now))
+        claimed = await db.execute(
+            claim.values(puller_id=puller_id, status=RideStatus.PULLER_ASSIGNED, accepted_at=now)
+        )
+        if claimed.rowcount != 1:
+            await db.rollback()
+            if DISPATCH_MODE != "race" and (await db.execute(
+                select(Ride.status).where(Ride.ride_id == ride_id)
+            )).scalar() == RideStatus.PENDING:
+                raise HTTPException(status_code=400, detail="Ride is offered to another puller")
+            raise HTTPException(status_code=400, detail="Ride already accepted by another puller")
         
         # Update puller status
-        puller.status = PullerStatus.BUSY
+        busy = await db.execute(
+            update(Puller).where(Puller.puller_id == puller_id).values(status=PullerStatus.BUSY)
+        )
+        if busy.rowcount != 1:
+            await db.rollback()
+            raise HTTPException(status_code=404, detail="Puller not found")
+        
+        await db.commit()
+        puller_index.set(puller_id, None, None, PullerStatus.BUSY)
+        ride_timeouts.cancel(ride_id)
+        ride_versions.bump(ride_id, puller_id)
+        alerts_feed.remove(ride_id)
+        offer_engine.cancel(ride_id)
+        # An offer the puller held on another ride moves on straight away
+        dropped = ride_offers.accepted(ride_id, puller_id)
+        if dropped is not None:
+            withdraw_offers()
+            offer_engine.declined(dropped, puller_id)
+        ride_events.publish(RIDE_TAKEN, {"ride_id": ride_id})
+        analytics_rollups.ride_changed(ride.requested_at)
         
-        db.commit()
+        pickup_loc = await location_registry.get_async(ride.pickup, db)
+        dest_loc = await location_registry.get_async(ride.destination, db)
         
         # Return ride details for navigation
         return {
@@ -120,18 +207,39 @@ def accept_ride(ride_id: str, puller_id: str, db: Session = Depends(get_db)):
             }
         }
         
+    except HTTPException:
+        raise
     except exc.IntegrityError:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=400, detail="Ride already accepted by another puller")
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=500, detail=f"Error accepting ride: {str(e)}")
 
 @router.post("/{ride_id}/reject")
 def reject_ride(ride_id: str, puller_id: str, db: Session = Depends(get_db)):
     """Puller rejects ride alert - removes from their alert list (MVP requirement)"""
-    # Note: Ride stays available to other pullers, this is just removing it from this puller's view
-    # In a full implementation, we'd track rejections in a separate table
+    # Ride stays available to other pullers, it is only hidden from this
+    # puller's alerts and pushes until it expires
+    ride = db.query(Ride.status, Ride.requested_at).filter(Ride.ride_id == ride_id).first()
+    if not ride:
+        raise HTTPException(status_code=404, detail="Ride not found")
+    if not puller_index.is_known(puller_id):
+        if not db.query(Puller.puller_id).filter(Puller.puller_id == puller_id).first():
+            raise HTTPException(status_code=404, detail="Puller not found")
+        puller_index.mark_known(puller_id)
+    
+    # Rides no longer PENDING are out of every alert list already
+    if ride.status == RideStatus.PENDING:
+        ride_rejections.reject(db, puller_id, ride_id, ride.requested_at)
+        # The feed is shared, so only this puller's window learns of it -
+        # their next delta poll lists the ride as removed
+        alert_windows.mark_stale(puller_id)
+        # A declined offer moves on to the next puller
+        if ride_offers.decline(ride_id, puller_id):
+            end_offer(db, ride_id, puller_id)
+            db.commit()
+        offer_engine.declined(ride_id, puller_id)
     return {"success": True, "message": "Ride removed from your alerts"}
 
 @router.get("/{ride_id}/active")
@@ -147,8 +255,8 @@ def get_active_ride(ride_id: str, puller_id: str, db: Session = Depends(get_db))
     if ride.puller_id != puller_id:
         raise HTTPException(status_code=403, detail="Not your ride")
     
-    pickup_loc = db.query(Location).filter(Location.name == ride.pickup).first()
-    dest_loc = db.query(Location).filter(Location.name == ride.destination).first()
+    pickup_loc = location_registry.get(ride.pickup, db)
+    dest_loc = location_registry.get(ride.destination, db)
     puller = db.query(Puller).filter(Puller.puller_id == puller_id).first()
     
     if not pickup_loc or not dest_loc or not puller:
@@ -182,7 +290,10 @@ def confirm_pickup(ride_id: str, puller_id: str, db: Session = Depends(get_db)):
     
     ride.status = RideStatus.PICKUP_CONFIRMED
     ride.pickup_confirmed_at = datetime.utcnow()
+    requested_at = ride.requested_at
     db.commit()
+    ride_versions.bump(ride_id, puller_id)
+    analytics_rollups.ride_changed(requested_at)
     
     return {"success": True}
 
@@ -200,7 +311,7 @@ def complete_ride(ride_id: str, request: RideCompleteRequest, db: Session = Depe
         raise HTTPException(status_code=403, detail="Not your ride")
     
     # Get destination location
-    dest_loc = db.query(Location).filter(Location.name == ride.destination).first()
+    dest_loc = location_registry.get(ride.destination, db)
     if not dest_loc:
         raise HTTPException(status_code=404, detail="Destination not found")
     
@@ -233,13 +344,11 @@ def complete_ride(ride_id: str, request: RideCompleteRequest, db: Session = Depe
         ride.points_awarded = 0  # No points until approved
         points_status = "pending"
     else:
-        # Award points immediately
+        # Award points immediately - an append to the ledger, the
+        # balance is derived from it (services.points_ledger)
         ride.status = RideStatus.COMPLETED
         ride.points_awarded = points
-        puller.points += points
-        puller.total_rides += 1
         
-        # Create points history entry
         transaction = PointsHistory(
             transaction_id=f"txn_{uuid.uuid4().hex[:8]}",
             puller_id=request.puller_id,
@@ -253,7 +362,12 @@ def complete_ride(ride_id: str, request: RideCompleteRequest, db: Session = Depe
     # Set puller back to available
     puller.status = PullerStatus.AVAILABLE
     
+    requested_at = ride.requested_at
     db.commit()
+    puller_index.sync(puller)
+    ride_versions.bump(ride_id, request.puller_id)
+    # Long rides can finish on a day the rollups consider settled
+    analytics_rollups.ride_changed(requested_at)
     
     # Calculate ride duration
     duration_seconds = int((ride.completed_at - ride.pickup_confirmed_at).total_seconds()) if ride.pickup_confirmed_at else 0
@@ -270,21 +384,158 @@ def complete_ride(ride_id: str, request: RideCompleteRequest, db: Session = Depe
     }
 
 @router.put("/{puller_id}/location")
-def update_location(puller_id: str, lat: float, lng: float, db: Session = Depends(get_db)):
-    puller = db.query(Puller).filter(Puller.puller_id == puller_id).first()
+async def update_location(puller_id: str, lat: float, lng: float, db: AsyncSession = Depends(get_async_db)):
+    if LOCATION_WRITE_BUFFER_MS > 0:
+        # Unknown ids get the same 404 as the direct write - only an id the
+        # index has not seen yet (signed up since startup) costs a query
+        if not puller_index.is_known(puller_id):
+            if not (await db.execute(select(Puller.puller_id).where(Puller.puller_id == puller_id))).first():
+                raise HTTPException(status_code=404, detail="Puller not found")
+            puller_index.mark_known(puller_id)
+        # Coalesced in memory, written by the periodic flush
+        location_buffer.add(puller_id, lat, lng)
+        return {"success": True, "buffered": True}
+    
+    puller = (await db.execute(
+        select(Puller).where(Puller.puller_id == puller_id)
+    )).scalar_one_or_none()
     if not puller:
         raise HTTPException(status_code=404, detail="Puller not found")
     
     puller.current_lat = lat
     puller.current_lng = lng
-    db.commit()
+    status = puller.status
+    await db.commit()
+    puller_index.set(puller_id, lat, lng, status)
+    ride_versions.bump_puller(puller_id)
     
     return {"success": True}
 
+@router.post("/locations/batch")
+def update_locations_batch(request: LocationBatchRequest, db: Session = Depends(get_db)):
+    """
+    Bulk GPS ingestion: many fixes (many pullers, or a buffered device track)
+    applied in one transaction - only the newest fix per puller is written
+    """
+    latest = coalesce_fixes(
+        (fix.puller_id, fix.lat, fix.lng, fix.recorded_at) for fix in request.fixes
+    )
+    updated = apply_location_fixes(db, latest)
+    
+    return {
+        "success": True,
+        "received": len(request.fixes),
+        "updated": len(updated),
+        "unknown_pullers": sorted(set(latest) - set(updated))
+    }
+
+# History page size (default / max)
+HISTORY_PAGE_SIZE = 50
+MAX_HISTORY_PAGE_SIZE = 200
+
+# Only what the history views show - no full ORM objects
+HISTORY_COLUMNS = (
+    Ride.ride_id, Ride.pickup, Ride.destination, Ride.status, Ride.requested_at,
+    Ride.completed_at, Ride.points_awarded, Ride.dropoff_distance_error
+)
+
+def _history_query(db: Session, puller_id: str, since: Optional[datetime], until: Optional[datetime]):
+    """Finished rides of a puller completed in [since, until), newest first"""
+    query = db.query(*HISTORY_COLUMNS).filter(
+        Ride.puller_id == puller_id,
+        Ride.completed_at.isnot(None)
+    )
+    if since:
+        query = query.filter(Ride.completed_at >= since)
+    if until:
+        query = query.filter(Ride.completed_at < until)
+    return query.order_by(Ride.completed_at.desc(), Ride.ride_id.desc())
+
+def _history_page(db: Session, puller_id: str, since: Optional[datetime], until: Optional[datetime],
+                  after: Optional[tuple], limit: int) -> list:
+    """
+    One page of _history_query starting strictly after the
+    (completed_at, ride_id) key `after` - one index seek per page
+    """
+    query = _history_query(db, puller_id, since, until)
+    if after:
+        query = query.filter(tuple_(Ride.completed_at, Ride.ride_id) < tuple_(*after))
+    return query.limit(limit).all()
+
+def _history_item(row) -> dict:
+    return {
+        "ride_id": row.ride_id,
+        "pickup": row.pickup,
+        "destination": row.destination,
+        "status": row.status.value,
+        "requested_at": row.requested_at.isoformat() if row.requested_at else None,
+        "completed_at": row.completed_at.isoformat(),
+        "points_awarded": row.points_awarded,
+        "dropoff_distance_error": row.dropoff_distance_error
+    }
+
 @router.get("/{puller_id}/history")
-def get_history(puller_id: str, db: Session = Depends(get_db)):
-    rides = db.query(Ride).filter(Ride.puller_id == puller_id).all()
-    return rides
+def get_history(
+    puller_id: str,
+    cursor: str = None,
+    limit: int = Query(HISTORY_PAGE_SIZE, ge=1, le=MAX_HISTORY_PAGE_SIZE),
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    db: Session = Depends(get_db)
+):
+    """
+    Puller's finished rides, newest first, optionally within [since, until)
+    Keyset pagination on (completed_at, ride_id) - pass next_cursor back as cursor
+    """
+    after = None
+    if cursor:
+        try:
+            after = decode_cursor(cursor, datetime, str)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+    
+    # One extra row tells whether another page exists
+    rows = _history_page(db, puller_id, since, until, after, limit + 1)
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1].completed_at, rows[-1].ride_id)
+    
+    return {"rides": [_history_item(row) for row in rows], "next_cursor": next_cursor}
+
+@router.get("/{puller_id}/history/export")
+def export_history(
+    puller_id: str,
+    format: Literal["csv", "ndjson"] = "ndjson",
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None
+):
+    """Full ride history as NDJSON (one ride per line) or CSV, streamed like the admin exports"""
+    return StreamingResponse(
+        stream_export(lambda db: _history_query(db, puller_id, since, until),
+                      [column.name for column in HISTORY_COLUMNS], format),
+        media_type=EXPORT_MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{puller_id}_history.{format}"'}
+    )
+
+@router.get("/{puller_id}/balance")
+def get_balance(puller_id: str, as_of: Optional[datetime] = None, db: Session = Depends(get_db)):
+    """Points and rewarded rides from ledger entries created at or before as_of (default now)"""
+    if not db.query(Puller.puller_id).filter(Puller.puller_id == puller_id).first():
+        raise HTTPException(status_code=404, detail="Puller not found")
+    
+    as_of = as_of or datetime.utcnow()
+    balance = balance_as_of(db, puller_id, as_of)
+    snapshot_as_of = balance["snapshot_as_of"]
+    if snapshot_as_of is None:
+        raise HTTPException(status_code=400, detail="as_of is before the puller's points ledger was opened")
+    return {
+        "puller_id": puller_id,
+        "as_of": as_of.isoformat(),
+        "points": balance["points"],
+        "total_rides": balance["total_rides"],
+        "snapshot_as_of": snapshot_as_of.isoformat() if snapshot_as_of else None
+    }
 
 @router.get("/{puller_id}/dashboard")
 def get_dashboard(puller_id: str, db: Session = Depends(get_db)):
@@ -314,10 +565,11 @@ def get_dashboard(puller_id: str, db: Session = Depends(get_db)):
             "duration": duration
         })
     
+    balance = balance_as_of(db, puller_id)
     return {
         "name": puller.name,
-        "points": puller.points,
-        "total_rides": puller.total_rides,
+        "points": balance["points"],
+        "total_rides": balance["total_rides"],
         "status": puller.status.value,
         "recent_rides": rides_list
     }
@@ -330,12 +582,13 @@ def get_profile(puller_id: str, db: Session = Depends(get_db)):
         raise HTTPException(status_code=404, detail="Puller not found")
     
     user = db.query(User).filter(User.user_id == puller.user_id).first()
+    balance = balance_as_of(db, puller_id)
     
     return {
         "puller_id": puller_id,
         "name": user.name if user else puller.name,
-        "points": puller.points,
-        "total_rides": puller.total_rides,
+        "points": balance["points"],
+        "total_rides": balance["total_rides"],
         "rating": 0.0,
         "status": puller.status.value
     }
@@ -1,11 +1,20 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Header, Response
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
+from typing import Optional
 import uuid
 from datetime import datetime
-from database import get_db
-from models.db_models import Ride, RideStatus, User, Puller, Location
+from database import get_db, get_async_db
+from models.db_models import Ride, RideStatus, User, Puller
 from models.schemas import RideRequest, RideStatusResponse, VerifyUserRequest, VerifyUserResponse
 from services.alert_service import distribute_alerts
+from services.offer_dispatch import offer_engine
+from services.ride_offers import DISPATCH_MODE
+from services.location_registry import location_registry
+from services.analytics_rollups import analytics_rollups
+from services.ride_versions import ride_versions
+from services.ride_timeouts import ride_timeouts
 from utils.gps_utils import haversine_distance
 
 router = APIRouter()
@@ -40,10 +49,17 @@ def verify_user(request: VerifyUserRequest, db: Session = Depends(get_db)):
         "message": "User verified successfully"
     }
 
+def _dispatch(ride: Ride, db: Session):
+    """Alert nearby pullers - in offer mode, one at a time starting with the nearest"""
+    nearest_pullers = distribute_alerts(ride, db)
+    if DISPATCH_MODE == "offer" and nearest_pullers is not None:
+        offer_engine.dispatch(ride.ride_id, nearest_pullers)
+
 @router.post("/request", status_code=201)
 def request_ride(request: RideRequest, db: Session = Depends(get_db)):
     """Create ride request and broadcast to nearby pullers"""
     ride_id = f"ride_{uuid.uuid4().hex[:8]}"
+    requested_at = datetime.utcnow()
     
     ride = Ride(
         ride_id=ride_id,
@@ -51,24 +67,30 @@ def request_ride(request: RideRequest, db: Session = Depends(get_db)):
         pickup=request.pickup_location,
         destination=request.destination,
         status=RideStatus.PENDING,
-        requested_at=datetime.utcnow()
+        requested_at=requested_at
     )
     db.add(ride)
     db.commit()
+    ride_versions.bump(ride_id, None)
+    ride_timeouts.schedule(ride_id, requested_at)
     
     # Distribute alerts to nearby pullers
-    distribute_alerts(ride_id, request.pickup_location, db)
+    _dispatch(ride, db)
     
     return {"success": True, "ride_id": ride_id}
 
-@router.get("/{ride_id}/status", response_model=RideStatusResponse)
-def get_ride_status(ride_id: str, db: Session = Depends(get_db)):
-    """
-    Get ride status for LED control (ESP32 polls this every 2-3 seconds)
-    Returns LED states: Yellow (puller assigned), Red (timeout), Green (pickup confirmed)
-    Also returns distance from puller to pickup location
-    """
-    ride = db.query(Ride).filter(Ride.ride_id == ride_id).first()
+# Longest a status poll may be held open waiting for a change (seconds)
+MAX_STATUS_WAIT_SECONDS = 25
+
+async def _read_ride_status(ride_id: str, db: AsyncSession) -> tuple[dict, Optional[str]]:
+    """Load ride LED status from the database, returns (status payload, ETag)"""
+    # Version captured before the read, so a change racing with it can only
+    # make the ETag older than the data (next poll re-reads), never newer
+    etag = ride_versions.etag(ride_id)
+    
+    ride = (await db.execute(
+        select(Ride).where(Ride.ride_id == ride_id)
+    )).scalar_one_or_none()
     if not ride:
         raise HTTPException(status_code=404, detail="Ride not found")
     
@@ -80,8 +102,10 @@ def get_ride_status(ride_id: str, db: Session = Depends(get_db)):
     # Calculate distance from puller to pickup if puller is assigned
     distance_to_pickup = None
     if ride.puller_id:
-        puller = db.query(Puller).filter(Puller.puller_id == ride.puller_id).first()
-        pickup_location = db.query(Location).filter(Location.name == ride.pickup).first()
+        puller = (await db.execute(
+            select(Puller).where(Puller.puller_id == ride.puller_id)
+        )).scalar_one_or_none()
+        pickup_location = await location_registry.get_async(ride.pickup, db)
         
         if puller and pickup_location and puller.current_lat and puller.current_lng:
             # Calculate straight-line distance in meters
@@ -92,6 +116,9 @@ def get_ride_status(ride_id: str, db: Session = Depends(get_db)):
                 pickup_location.lng
             )
     
+    if etag is None:
+        etag = ride_versions.track(ride_id, ride.puller_id)
+    
     return {
         "status": ride.status.value,
         "led_yellow": led_yellow,
@@ -99,7 +126,39 @@ def get_ride_status(ride_id: str, db: Session = Depends(get_db)):
         "led_green": led_green,
         "puller_id": ride.puller_id,
         "distance_to_pickup": distance_to_pickup
-    }
+    }, etag
+
+@router.get("/{ride_id}/status", response_model=RideStatusResponse)
+async def get_ride_status(
+    ride_id: str,
+    response: Response,
+    wait: float = 0,
+    if_none_match: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Get ride status for LED control (ESP32 polls this every 2-3 seconds)
+    Returns LED states: Yellow (puller assigned), Red (timeout), Green (pickup confirmed)
+    Also returns distance from puller to pickup location
+    
+    Conditional GET: send the last ETag as If-None-Match and an unchanged ride
+    returns 304 without touching the database. With ?wait=N (seconds, max 25)
+    an unchanged poll is held open until the ride changes (long-polling)
+    """
+    etag = ride_versions.etag(ride_id)
+    if etag is not None and if_none_match == etag:
+        changed = False
+        if wait > 0:
+            changed = await ride_versions.wait_for_change(
+                ride_id, etag, min(wait, MAX_STATUS_WAIT_SECONDS)
+            )
+        if not changed:
+            return Response(status_code=304, headers={"ETag": etag})
+    
+    payload, etag = await _read_ride_status(ride_id, db)
+    if etag is not None:
+        response.headers["ETag"] = etag
+    return payload
 
 @router.post("/{ride_id}/user-accept")
 def user_accept_ride(ride_id: str, db: Session = Depends(get_db)):
@@ -113,7 +172,11 @@ def user_accept_ride(ride_id: str, db: Session = Depends(get_db)):
     
     ride.status = RideStatus.PICKUP_CONFIRMED
     ride.pickup_confirmed_at = datetime.utcnow()
+    puller_id = ride.puller_id
+    requested_at = ride.requested_at
     db.commit()
+    ride_versions.bump(ride_id, puller_id)
+    analytics_rollups.ride_changed(requested_at)
     
     return {"success": True}
 
@@ -131,9 +194,15 @@ def user_reject_ride(ride_id: str, db: Session = Depends(get_db)):
     ride.status = RideStatus.PENDING
     ride.puller_id = None
     ride.accepted_at = None
+    requested_at = ride.requested_at
     db.commit()
+    ride_versions.bump(ride_id, None)
+    analytics_rollups.ride_changed(requested_at)
+    
+    # Original deadline still applies (requested_at + 60s)
+    ride_timeouts.schedule(ride_id, requested_at)
     
     # Re-distribute to remaining pullers
-    distribute_alerts(ride_id, ride.pickup, db)
+    _dispatch(ride, db)
     
     return {"success": True}
@@ -7,6 +7,7 @@ from models.db_models import Location, Puller, User, UserRole, Ride, RideStatus
 from datetime import datetime, timedelta
 import uuid
 import bcrypt
+from services.points_ledger import open_legacy_accounts
 
 # MVP Required Coordinates
 LOCATIONS = [
@@ -204,6 +205,8 @@ def seed_demo_pullers():
             db.add(puller)
         
         db.commit()
+        # Open their points ledger now, so balances are readable without a server restart
+        open_legacy_accounts(db)
         print(f"✅ Successfully seeded {len(demo_pullers)} demo pullers with user accounts")
         print(f"   📧 Default password: demo123")
         for puller in demo_pullers:
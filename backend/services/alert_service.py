@@ -1,32 +1,118 @@
+from datetime import datetime, timedelta
 from sqlalchemy.orm import Session
-from models.db_models import Puller, Location, PullerStatus
+from models.db_models import Ride, RideStatus
+from services.alerts_feed import alerts_feed
+from services.location_registry import location_registry
+from services.puller_index import puller_index
+from services.ride_rejections import ride_rejections
+from services.ride_events import ride_events, RIDE_NEW, RIDE_OFFER, OFFER_WITHDRAWN
+from services.ride_offers import ride_offers, DISPATCH_MODE
+from services.ride_timeouts import RIDE_TIMEOUT_SECONDS
+import os
 
-def distribute_alerts(ride_id: str, pickup_location: str, db: Session):
+# Alert timeout in seconds (MVP requirement - matches the ride timeout)
+ALERT_TIMEOUT_SECONDS = RIDE_TIMEOUT_SECONDS
+
+# Number of nearest pullers returned for each new ride
+ALERT_FANOUT = 5
+
+# Pullers only see rides whose pickup is within this many meters, and at
+# most the ALERT_TOP_K nearest of them
+ALERT_RADIUS_M = float(os.getenv("ALERT_RADIUS_M", "10000"))
+ALERT_TOP_K = int(os.getenv("ALERT_TOP_K", "20"))
+
+def alert_payload(ride_id: str, pickup: str, destination: str, requested_at: datetime) -> dict:
+    """Puller-independent part of an alert; distance_to_pickup and expires_in are added per puller"""
+    return {
+        "ride_id": ride_id,
+        "pickup": pickup,
+        "destination": destination,
+        "potential_points": 10,  # Best case scenario (perfect dropoff)
+        "requested_at": requested_at.isoformat(),
+        "expires_at": requested_at + timedelta(seconds=ALERT_TIMEOUT_SECONDS)
+    }
+
+def load_alerts_feed(db: Session) -> int:
+    """Fill the alerts feed with every PENDING ride in the database"""
+    rows = db.query(Ride.ride_id, Ride.pickup, Ride.destination, Ride.requested_at).filter(
+        Ride.status == RideStatus.PENDING
+    ).all()
+    entries = []
+    for row in rows:
+        pickup_loc = location_registry.get(row.pickup, db)
+        if pickup_loc and location_registry.get(row.destination, db):
+            entries.append((alert_payload(*row), pickup_loc.lat, pickup_loc.lng))
+    return alerts_feed.replace_all(entries)
+
+def alert_message(alert: dict) -> dict:
+    """JSON-ready copy of a feed alert with expires_in - same shape as an /alerts entry minus distance_to_pickup"""
+    expires_in = max(0, int((alert["expires_at"] - datetime.utcnow()).total_seconds()))
+    return {**alert, "expires_in": expires_in, "expires_at": alert["expires_at"].isoformat()}
+
+def broadcast_alert(alert: dict, lat: float, lng: float):
+    """Push a ride to every connected, available puller within ALERT_RADIUS_M of its pickup"""
+    connected = ride_events.connected_pullers()
+    if not connected:
+        return
+    rejecters = ride_rejections.rejecters(alert["ride_id"])
+    message = alert_message(alert)
+    ride_events.publish_many([
+        (puller_id, RIDE_NEW, {"alert": {**message, "distance_to_pickup": distance}})
+        for puller_id, distance in puller_index.within(lat, lng, ALERT_RADIUS_M)
+        if puller_id in connected and puller_id not in rejecters
+    ])
+
+def offer_alert(alert: dict, puller_id: str, distance: float, window: float):
+    """Give one puller an exclusive offer on a withheld ride and tell them over WebSocket"""
+    ride_offers.offer(alert["ride_id"], puller_id, window)
+    alerts_feed.touch(alert["ride_id"])
+    ride_events.publish(RIDE_OFFER, {
+        "alert": {**alert_message(alert), "distance_to_pickup": distance, "offer_expires_in": int(window)}
+    }, [puller_id])
+
+def withdraw_offers():
+    """Tell pullers whose offers lapsed or moved on to drop those rides"""
+    withdrawn = ride_offers.take_withdrawn()
+    if not withdrawn:
+        return
+    # Delta polls see the ride as changed, and so hidden from its old holder
+    for ride_id, _ in withdrawn:
+        alerts_feed.touch(ride_id)
+    ride_events.publish_many([
+        (puller_id, OFFER_WITHDRAWN, {"ride_id": ride_id}) for ride_id, puller_id in withdrawn
+    ])
+
+def open_alert(alert: dict, lat: float, lng: float):
+    """Hand a withheld ride over to the race - every puller in range sees it"""
+    ride_offers.open(alert["ride_id"])
+    alerts_feed.touch(alert["ride_id"])
+    broadcast_alert(alert, lat, lng)
+
+def distribute_alerts(ride: Ride, db: Session):
     """Distribute ride alerts to nearby available pullers"""
     
     # Get pickup location coordinates
-    pickup_loc = db.query(Location).filter(Location.name == pickup_location).first()
-    if not pickup_loc:
+    pickup_loc = location_registry.get(ride.pickup, db)
+    if not pickup_loc or not location_registry.get(ride.destination, db):
         return
     
-    # Get all available pullers
-    available_pullers = db.query(Puller).filter(
-        Puller.status == PullerStatus.AVAILABLE
-    ).all()
-    
-    # Sort by distance (simple version - in production use Haversine)
-    from utils.gps_utils import haversine_distance
-    pullers_by_distance = []
+    # File the ride under its pickup cell, where nearby pullers' polls find it.
+    # Dispatch modes keep it withheld until it is offered to one puller
+    alert = alert_payload(ride.ride_id, ride.pickup, ride.destination, ride.requested_at)
+    if DISPATCH_MODE != "race":
+        ride_offers.withhold(ride.ride_id)
+    alerts_feed.upsert(alert, pickup_loc.lat, pickup_loc.lng)
     
-    for puller in available_pullers:
-        distance = haversine_distance(
-            puller.current_lat, puller.current_lng,
-            pickup_loc.lat, pickup_loc.lng
-        )
-        pullers_by_distance.append((puller, distance))
+    # k-nearest search over the spatial index of available pullers
+    # (no table scan or full sort), minus pullers who rejected this ride
+    rejecters = ride_rejections.rejecters(ride.ride_id)
+    nearest_pullers = puller_index.nearest_available(
+        pickup_loc.lat, pickup_loc.lng, ALERT_FANOUT, db, exclude=rejecters
+    )
     
-    pullers_by_distance.sort(key=lambda x: x[1])
+    # Race mode: push the alert to every connected, available puller in
+    # range over WebSocket - same shape as an /alerts entry
+    if DISPATCH_MODE == "race":
+        broadcast_alert(alert, pickup_loc.lat, pickup_loc.lng)
     
-    # In production, broadcast to multiple pullers via WebSocket
-    # For now, this is just the infrastructure
-    return pullers_by_distance[:5]  # Return top 5 nearest pullers
+    return nearest_pullers  # [(puller_id, distance)] for the top 5 nearest pullers
@@ -0,0 +1,54 @@
+"""
+Per-puller alert windows for delta polling
+For each puller polling /alerts the server keeps the cursor it last
+answered, the grid cell the puller was in and the ride ids it was sent.
+A ?since= poll that matches all three is answered with the exact
+difference to a freshly ranked window, so the client's list stays the
+ALERT_TOP_K nearest rides; any mismatch (another cursor, the puller
+moved to another cell, a restart) gets a full reset instead. A window
+marked stale - the puller rejected a ride, which the shared feed does not
+record - is re-ranked on the next poll even if the feed has not changed
+"""
+import math
+import os
+import threading
+from typing import NamedTuple, Optional
+
+# Window cell edge in degrees (~1.1 km at the equator) - moving to another
+# cell re-ranks from scratch, moving within one keeps the window
+CELL_SIZE_DEG = float(os.getenv("ALERT_WINDOW_CELL_DEG", "0.01"))
+
+
+class AlertWindow(NamedTuple):
+    cursor: int
+    cell: tuple[int, int]
+    ride_ids: frozenset[str]
+    stale: bool = False
+
+
+class AlertWindows:
+    def __init__(self, cell_size_deg: float = CELL_SIZE_DEG):
+        self.cell_size = cell_size_deg
+        self._windows: dict[str, AlertWindow] = {}
+        self._lock = threading.Lock()
+
+    def cell_of(self, lat: float, lng: float) -> tuple[int, int]:
+        return (math.floor(lat / self.cell_size), math.floor(lng / self.cell_size))
+
+    def get(self, puller_id: str) -> Optional[AlertWindow]:
+        return self._windows.get(puller_id)
+
+    def store(self, puller_id: str, cursor: int, lat: float, lng: float, ride_ids):
+        """Remember the window just sent to the puller at (lat, lng)"""
+        with self._lock:
+            self._windows[puller_id] = AlertWindow(cursor, self.cell_of(lat, lng), frozenset(ride_ids))
+
+    def mark_stale(self, puller_id: str):
+        """The puller's view changed outside the feed - re-rank on their next poll"""
+        with self._lock:
+            window = self._windows.get(puller_id)
+            if window is not None:
+                self._windows[puller_id] = window._replace(stale=True)
+
+
+alert_windows = AlertWindows()
@@ -0,0 +1,152 @@
+"""
+Versioned feed of PENDING rides for delta alert polling
+Every change to the pending set (ride requested or re-opened, taken,
+expired) takes the next value of one global sequence and is appended to a
+bounded change log. GET /alerts?since=<seq> is answered from memory: an
+unchanged feed costs one integer comparison, otherwise only the rides
+touched after seq are returned. Pending rides are also bucketed by pickup
+in a grid, so a poll only measures rides in cells near the puller
+"""
+import os
+import threading
+import time
+from collections import deque
+from collections.abc import Container
+from typing import Optional
+from utils.spatial_index import GridIndex
+
+# Changes kept for delta reads - older cursors get a full resync
+MAX_FEED_LOG = int(os.getenv("ALERTS_FEED_LOG", "10000"))
+
+# Grid cell edge in degrees for pending ride pickups (~1.1 km at the equator)
+CELL_SIZE_DEG = float(os.getenv("RIDE_INDEX_CELL_DEG", "0.01"))
+
+
+class AlertsFeed:
+    def __init__(self):
+        # Sequences start at boot time in microseconds, so a cursor handed out
+        # by an earlier process is always older than the log and resyncs
+        self._seq = time.time_ns() // 1000
+        self._floor = self._seq  # the log holds every change after this
+        self._pending: dict[str, tuple[dict, int]] = {}  # ride_id -> (alert, seq it was added at)
+        self._log: deque[tuple[int, str]] = deque()
+        self._grid = GridIndex(CELL_SIZE_DEG)  # ride_id at its pickup
+        self._lock = threading.Lock()
+
+    @property
+    def cursor(self) -> int:
+        return self._seq
+
+    def _append(self, ride_id: str) -> int:
+        self._seq += 1
+        self._log.append((self._seq, ride_id))
+        if len(self._log) > MAX_FEED_LOG:
+            self._floor = self._log.popleft()[0]
+        return self._seq
+
+    def upsert(self, alert: dict, lat: float, lng: float):
+        """A ride became (or is still) PENDING - alert is its puller-independent payload, lat/lng its pickup"""
+        with self._lock:
+            seq = self._append(alert["ride_id"])
+            entry = self._pending.get(alert["ride_id"])
+            self._pending[alert["ride_id"]] = (alert, entry[1] if entry else seq)
+            self._grid.upsert(alert["ride_id"], lat, lng)
+
+    def remove(self, ride_id: str):
+        """A ride left PENDING (taken or expired)"""
+        with self._lock:
+            if self._pending.pop(ride_id, None) is not None:
+                self._grid.remove(ride_id)
+                self._append(ride_id)
+
+    def touch(self, ride_id: str):
+        """A pending ride changed without moving (offered, opened) - delta polls report it as changed"""
+        with self._lock:
+            if ride_id in self._pending:
+                self._append(ride_id)
+
+    def replace_all(self, entries: list[tuple[dict, float, float]]) -> int:
+        """Reset the feed to exactly these (alert, pickup lat, pickup lng) (startup); every earlier cursor resyncs"""
+        with self._lock:
+            self._seq += 1
+            self._floor = self._seq
+            self._log.clear()
+            self._pending = {alert["ride_id"]: (alert, self._seq) for alert, _, _ in entries}
+            self._grid.replace_all((alert["ride_id"], lat, lng) for alert, lat, lng in entries)
+            return len(self._pending)
+
+    def nearest(self, lat: float, lng: float, k: int, radius_m: float,
+                exclude: Container[str] = ()) -> tuple[int, list[tuple[dict, float]]]:
+        """(cursor, up to k [(alert, meters)] with pickups within radius_m, nearest first), skipping exclude"""
+        with self._lock:
+            return self._seq, [
+                (self._pending[ride_id][0], distance)
+                for ride_id, distance in self._grid.nearest(lat, lng, k, max_distance=radius_m, exclude=exclude)
+            ]
+
+    def get(self, ride_id: str) -> Optional[tuple[dict, float, float]]:
+        """(alert, pickup lat, pickup lng) of a pending ride, or None"""
+        with self._lock:
+            entry = self._pending.get(ride_id)
+            return (entry[0], *self._grid.position(ride_id)) if entry else None
+
+    def pending(self) -> list[tuple[dict, float, float]]:
+        """Every pending (alert, pickup lat, pickup lng)"""
+        with self._lock:
+            return [(alert, *self._grid.position(ride_id)) for ride_id, (alert, _) in self._pending.items()]
+
+    def snapshot(self) -> tuple[int, list[dict]]:
+        """(cursor, every pending alert)"""
+        with self._lock:
+            return self._seq, [alert for alert, _ in self._pending.values()]
+
+    def _touched(self, since: int) -> Optional[dict[str, int]]:
+        """{ride_id: latest seq} of rides changed after since, or None if the log cannot answer (lock held)"""
+        if since < self._floor or since > self._seq:
+            return None
+        touched = {}
+        for seq, ride_id in reversed(self._log):
+            if seq <= since:
+                break
+            touched.setdefault(ride_id, seq)
+        return touched
+
+    def changes_since(self, since: int) -> Optional[tuple[int, list[dict], list[dict], list[str]]]:
+        """
+        (cursor, added, changed, removed ride ids) after `since`, or None when
+        since is not a cursor this log can answer (caller falls back to a snapshot)
+        """
+        if since == self._seq:
+            return since, [], [], []
+        with self._lock:
+            touched = self._touched(since)
+            if touched is None:
+                return None
+
+            added, changed, removed = [], [], []
+            for ride_id in touched:
+                entry = self._pending.get(ride_id)
+                if entry is None:
+                    removed.append(ride_id)
+                elif entry[1] > since:
+                    added.append(entry[0])
+                else:
+                    changed.append(entry[0])
+            return self._seq, added, changed, removed
+
+    def nearest_since(self, since: int, lat: float, lng: float, k: int, radius_m: float,
+                      exclude: Container[str] = ()) -> Optional[tuple[int, list[tuple[dict, float]], set[str]]]:
+        """
+        (cursor, nearest() at cursor, ids of rides changed after since) read
+        under one lock, so the two agree - or None when since is too old
+        """
+        with self._lock:
+            touched = self._touched(since)
+            if touched is None:
+                return None
+            return self._seq, [
+                (self._pending[ride_id][0], distance)
+                for ride_id, distance in self._grid.nearest(lat, lng, k, max_distance=radius_m, exclude=exclude)
+            ], set(touched)
+
+alerts_feed = AlertsFeed()
@@ -0,0 +1,196 @@
+"""
+Daily analytics rollups
+Rides are folded into one row per requested day x route x status (plus one
+per day x puller) so /api/admin/analytics sums a few hundred rollup rows for
+any date range instead of scanning rides. A compaction job rebuilds the days
+that can still change - today, yesterday and any older day a ride status
+changed on (timeouts caught late, completions, review resolutions) - from
+the rides index, so rollups trail live data by at most ANALYTICS_ROLLUP_SECONDS
+"""
+import os
+import threading
+from datetime import date, datetime, time, timedelta
+from typing import Optional
+from sqlalchemy import case, delete, func, insert
+from sqlalchemy.orm import Session
+from models.db_models import Ride, RideStatus, RideDailyRollup, PullerDailyRollup
+
+ANALYTICS_ROLLUP_SECONDS = float(os.getenv("ANALYTICS_ROLLUP_SECONDS", "30"))
+
+# Rides a puller has finished (pending review rides carry no points yet)
+FINISHED_STATUSES = (RideStatus.COMPLETED, RideStatus.PENDING_REVIEW)
+
+TOP_ROUTES = 10
+TOP_PULLERS = 10
+
+
+def _day_range(day: date) -> tuple[datetime, datetime]:
+    start = datetime.combine(day, time.min)
+    return start, start + timedelta(days=1)
+
+
+def _requested_on(day: date) -> list:
+    """Rides requested on day - status IN (every status) lets SQLite seek
+    ix_rides_status_requested_at once per status instead of scanning"""
+    start, end = _day_range(day)
+    return [Ride.status.in_(list(RideStatus)), Ride.requested_at >= start, Ride.requested_at < end]
+
+
+def rebuild_day(db: Session, day: date):
+    """Replace day's rollup rows with fresh aggregates of its rides (caller commits)"""
+    db.execute(delete(RideDailyRollup).where(RideDailyRollup.day == day))
+    db.execute(delete(PullerDailyRollup).where(PullerDailyRollup.day == day))
+
+    ride_rows = db.query(
+        Ride.pickup, Ride.destination, Ride.status, func.count(),
+        func.coalesce(func.sum(Ride.points_awarded), 0),
+        func.coalesce(func.sum(Ride.dropoff_distance_error), 0.0),
+        func.count(Ride.dropoff_distance_error)
+    ).filter(*_requested_on(day)).group_by(Ride.pickup, Ride.destination, Ride.status).all()
+    if ride_rows:
+        db.execute(insert(RideDailyRollup), [
+            {"day": day, "pickup": pickup, "destination": destination, "status": status,
+             "ride_count": count, "points_awarded": points,
+             "dropoff_error_sum": error_sum, "dropoff_error_count": error_count}
+            for pickup, destination, status, count, points, error_sum, error_count in ride_rows
+        ])
+
+    start, end = _day_range(day)
+    puller_rows = db.query(
+        Ride.puller_id, func.count(),
+        func.coalesce(func.sum(Ride.points_awarded), 0),
+        func.coalesce(func.sum(Ride.dropoff_distance_error), 0.0),
+        func.count(Ride.dropoff_distance_error)
+    ).filter(
+        Ride.status.in_(FINISHED_STATUSES), Ride.requested_at >= start, Ride.requested_at < end,
+        Ride.puller_id.isnot(None)
+    ).group_by(Ride.puller_id).all()
+    if puller_rows:
+        db.execute(insert(PullerDailyRollup), [
+            {"day": day, "puller_id": puller_id, "rides_finished": count, "points_awarded": points,
+             "dropoff_error_sum": error_sum, "dropoff_error_count": error_count}
+            for puller_id, count, points, error_sum, error_count in puller_rows
+        ])
+
+
+class AnalyticsRollups:
+    def __init__(self):
+        self._dirty: set[date] = set()
+        self._lock = threading.Lock()
+
+    def mark_dirty(self, day: date):
+        """Rebuild day on the next compaction (a ride requested that day changed)"""
+        with self._lock:
+            self._dirty.add(day)
+
+    def ride_changed(self, requested_at: Optional[datetime]):
+        """A ride requested at requested_at changed status - queue its day unless compaction covers it anyway"""
+        if requested_at is None:
+            return
+        day = requested_at.date()
+        if day < datetime.utcnow().date() - timedelta(days=1):
+            self.mark_dirty(day)
+
+    def load(self, db: Session) -> int:
+        """Queue a backfill of every past day when the rollup tables are empty"""
+        if db.query(RideDailyRollup.day).first() is not None:
+            return 0
+        # min() per status is one index seek each; a bare min() would scan
+        earliest = [
+            db.query(func.min(Ride.requested_at)).filter(Ride.status == status).scalar()
+            for status in RideStatus
+        ]
+        earliest = [value for value in earliest if value is not None]
+        if not earliest:
+            return 0
+        day, today = min(earliest).date(), datetime.utcnow().date()
+        with self._lock:
+            while day < today:
+                self._dirty.add(day)
+                day += timedelta(days=1)
+            return len(self._dirty)
+
+    def compact(self, db: Session) -> int:
+        """Rebuild today, yesterday and every dirty day; returns days rebuilt"""
+        today = datetime.utcnow().date()
+        with self._lock:
+            days = self._dirty | {today, today - timedelta(days=1)}
+            self._dirty.clear()
+        try:
+            for day in sorted(days):
+                rebuild_day(db, day)
+                db.commit()
+        except Exception:
+            db.rollback()
+            with self._lock:
+                self._dirty.update(days)
+            raise
+        return len(days)
+
+
+analytics_rollups = AnalyticsRollups()
+
+
+def summarize(db: Session, since: Optional[date] = None, until: Optional[date] = None) -> dict:
+    """Ride analytics for requested days in [since, until), from the rollup tables only"""
+    ride_range, puller_range = [], []
+    if since is not None:
+        ride_range.append(RideDailyRollup.day >= since)
+        puller_range.append(PullerDailyRollup.day >= since)
+    if until is not None:
+        ride_range.append(RideDailyRollup.day < until)
+        puller_range.append(PullerDailyRollup.day < until)
+
+    completed = func.sum(case((RideDailyRollup.status == RideStatus.COMPLETED, RideDailyRollup.ride_count), else_=0))
+
+    by_status = {status.value: 0 for status in RideStatus}
+    points_awarded, error_sum, error_count = 0, 0.0, 0
+    for status, count, points, status_error_sum, status_error_count in db.query(
+        RideDailyRollup.status, func.sum(RideDailyRollup.ride_count), func.sum(RideDailyRollup.points_awarded),
+        func.sum(RideDailyRollup.dropoff_error_sum), func.sum(RideDailyRollup.dropoff_error_count)
+    ).filter(*ride_range).group_by(RideDailyRollup.status):
+        by_status[status.value] = count
+        points_awarded += points
+        error_sum += status_error_sum
+        error_count += status_error_count
+
+    daily = [
+        {"day": day.isoformat(), "total_rides": total, "completed_rides": done}
+        for day, total, done in db.query(
+            RideDailyRollup.day, func.sum(RideDailyRollup.ride_count), completed
+        ).filter(*ride_range).group_by(RideDailyRollup.day).order_by(RideDailyRollup.day)
+    ]
+
+    total = func.sum(RideDailyRollup.ride_count)
+    routes = [
+        {"pickup": pickup, "destination": destination, "total_rides": rides, "completed_rides": done}
+        for pickup, destination, rides, done in db.query(
+            RideDailyRollup.pickup, RideDailyRollup.destination, total, completed
+        ).filter(*ride_range).group_by(RideDailyRollup.pickup, RideDailyRollup.destination)
+        .order_by(total.desc()).limit(TOP_ROUTES)
+    ]
+
+    points = func.sum(PullerDailyRollup.points_awarded)
+    top_pullers = [
+        {"puller_id": puller_id, "rides_finished": rides, "points_awarded": puller_points,
+         "avg_dropoff_error": (puller_error_sum / puller_error_count) if puller_error_count else None}
+        for puller_id, rides, puller_points, puller_error_sum, puller_error_count in db.query(
+            PullerDailyRollup.puller_id, func.sum(PullerDailyRollup.rides_finished), points,
+            func.sum(PullerDailyRollup.dropoff_error_sum), func.sum(PullerDailyRollup.dropoff_error_count)
+        ).filter(*puller_range).group_by(PullerDailyRollup.puller_id)
+        .order_by(points.desc(), PullerDailyRollup.puller_id).limit(TOP_PULLERS)
+    ]
+
+    total_rides = sum(by_status.values())
+    completed_rides = by_status[RideStatus.COMPLETED.value]
+    return {
+        "total_rides": total_rides,
+        "completed_rides": completed_rides,
+        "completion_rate": (completed_rides / total_rides * 100) if total_rides > 0 else 0,
+        "rides_by_status": by_status,
+        "points_awarded": points_awarded,
+        "avg_dropoff_error": (error_sum / error_count) if error_count else None,
+        "daily": daily,
+        "top_routes": routes,
+        "top_pullers": top_pullers,
+    }
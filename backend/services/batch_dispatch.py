@@ -0,0 +1,109 @@
+"""
+Batch dispatch (DISPATCH_MODE=batch)
+Every BATCH_DISPATCH_SECONDS the withheld PENDING rides without a live
+offer are matched to available pullers in one minimum-cost assignment over
+pickup distance, and each ride is offered to its match alone for
+OFFER_WINDOW_SECONDS. A ride only competes for its BATCH_CANDIDATES
+nearest pullers in range (spatial index lookups), so the cost matrix stays
+small; pullers who rejected, declined or let the ride's offer lapse are
+never candidates again. Rides still unassigned DISPATCH_FALLBACK_SECONDS
+after they were requested are opened to every puller in range
+"""
+import os
+from datetime import datetime, timedelta
+import numpy as np
+from sqlalchemy.orm import Session
+from services.alert_service import ALERT_RADIUS_M, ALERT_TIMEOUT_SECONDS, offer_alert, open_alert, withdraw_offers
+from services.alerts_feed import alerts_feed
+from services.puller_index import puller_index
+from services.ride_offers import ride_offers, record_offer, DISPATCH_FALLBACK_SECONDS, OFFER_WINDOW_SECONDS
+from services.ride_rejections import ride_rejections
+from utils.assignment import min_cost_assignment
+
+BATCH_DISPATCH_SECONDS = float(os.getenv("BATCH_DISPATCH_SECONDS", "2"))
+
+# Nearest pullers each ride can be matched with
+BATCH_CANDIDATES = int(os.getenv("BATCH_CANDIDATES", "10"))
+
+# Cost of a ride/puller pair that is not a candidate - large enough that the
+# solver first matches as many rides as it can, then minimizes distance
+UNREACHABLE_M = 1e9
+
+
+class _AnyOf:
+    """Membership in any of several containers, without merging them"""
+    __slots__ = ("_containers",)
+
+    def __init__(self, *containers):
+        self._containers = containers
+
+    def __contains__(self, key) -> bool:
+        return any(key in container for container in self._containers)
+
+    def __bool__(self) -> bool:
+        return any(self._containers)
+
+
+def assign(candidates: dict[str, list[tuple[str, float]]]) -> list[tuple[str, str, float]]:
+    """
+    Minimum total pickup distance matching of rides to pullers
+    candidates maps ride_id -> [(puller_id, meters)] it may be matched with;
+    returns [(ride_id, puller_id, meters)] with every puller used at most once
+    """
+    ride_ids = [ride_id for ride_id, pairs in candidates.items() if pairs]
+    if not ride_ids:
+        return []
+    puller_ids = list(dict.fromkeys(puller_id for ride_id in ride_ids for puller_id, _ in candidates[ride_id]))
+    column = {puller_id: i for i, puller_id in enumerate(puller_ids)}
+    cost = np.full((len(ride_ids), len(puller_ids)), UNREACHABLE_M)
+    for row, ride_id in enumerate(ride_ids):
+        for puller_id, distance in candidates[ride_id]:
+            cost[row, column[puller_id]] = distance
+
+    rows, columns = min_cost_assignment(cost)
+    return [
+        (ride_ids[row], puller_ids[col], float(cost[row, col]))
+        for row, col in zip(rows.tolist(), columns.tolist())
+        if cost[row, col] < UNREACHABLE_M
+    ]
+
+
+def dispatch_batch(db: Session) -> dict:
+    """One dispatch tick; returns {"rides", "offered", "opened"}"""
+    # Rides open to the race once they are DISPATCH_FALLBACK_SECONDS old,
+    # i.e. this long before they expire
+    open_after = datetime.utcnow() + timedelta(seconds=ALERT_TIMEOUT_SECONDS - DISPATCH_FALLBACK_SECONDS)
+    pending = {alert["ride_id"]: (alert, lat, lng) for alert, lat, lng in alerts_feed.pending()}
+
+    waiting, opened = [], 0
+    unoffered = ride_offers.unoffered(pending)
+    # Holders of the offers that just lapsed drop them before they move on
+    withdraw_offers()
+    for ride_id in unoffered:
+        alert, lat, lng = pending[ride_id]
+        if alert["expires_at"] <= open_after:
+            open_alert(alert, lat, lng)
+            opened += 1
+        else:
+            waiting.append(ride_id)
+    if not waiting:
+        return {"rides": 0, "offered": 0, "opened": opened}
+
+    holding = ride_offers.holding_offers()
+    candidates = {}
+    for ride_id in waiting:
+        _, lat, lng = pending[ride_id]
+        exclude = _AnyOf(holding, ride_rejections.rejecters(ride_id), ride_offers.passed(ride_id))
+        candidates[ride_id] = puller_index.nearest_available(
+            lat, lng, BATCH_CANDIDATES, db, exclude=exclude, radius_m=ALERT_RADIUS_M
+        )
+
+    matches = assign(candidates)
+    # Written before anyone is told, so accept_ride's guard already knows the holder
+    expires_at = datetime.utcnow() + timedelta(seconds=OFFER_WINDOW_SECONDS)
+    for ride_id, puller_id, _ in matches:
+        record_offer(db, ride_id, puller_id, expires_at)
+    db.commit()
+    for ride_id, puller_id, distance in matches:
+        offer_alert(pending[ride_id][0], puller_id, distance, OFFER_WINDOW_SECONDS)
+    return {"rides": len(waiting), "offered": len(matches), "opened": opened}
@@ -0,0 +1,59 @@
+"""
+Streaming CSV / NDJSON exports
+Rows come off a yield_per query (a server-side cursor where the driver has
+one) and leave as text chunks of EXPORT_BATCH_ROWS rows, so memory stays
+flat however many rows an export covers
+"""
+import csv
+import enum
+import io
+import json
+from datetime import datetime
+from typing import Callable, Iterator
+from sqlalchemy.orm import Query, Session
+from database import SessionLocal
+
+EXPORT_MEDIA_TYPES = {
+    "csv": "text/csv",
+    "ndjson": "application/x-ndjson",
+}
+EXPORT_BATCH_ROWS = 2000
+
+
+def _plain(value):
+    if isinstance(value, enum.Enum):
+        return value.value
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+def stream_export(build_query: Callable[[Session], Query], fields: list[str], fmt: str) -> Iterator[str]:
+    """
+    Text chunks of the rows of build_query(db) - one value per field, in
+    order - as CSV (with a header row) or NDJSON. Runs on its own session
+    since a streamed response outlives the request's dependencies
+    """
+    db = SessionLocal()
+    try:
+        rows = build_query(db).yield_per(EXPORT_BATCH_ROWS)
+        buffer = io.StringIO()
+        writer = csv.writer(buffer) if fmt == "csv" else None
+        if writer:
+            writer.writerow(fields)
+
+        for count, row in enumerate(rows, 1):
+            if writer:
+                writer.writerow(["" if value is None else _plain(value) for value in row])
+            else:
+                buffer.write(json.dumps(dict(zip(fields, map(_plain, row)))))
+                buffer.write("\n")
+            if count % EXPORT_BATCH_ROWS == 0:
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+
+        if buffer.tell():
+            yield buffer.getvalue()
+    finally:
+        db.close()
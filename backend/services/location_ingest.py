@@ -0,0 +1,102 @@
+"""
+Puller GPS ingestion - the highest-QPS write path
+Fixes are coalesced to the latest one per puller and written with a single
+executemany UPDATE per batch instead of SELECT + UPDATE + COMMIT per fix
+"""
+import os
+import threading
+from datetime import datetime
+from typing import Optional
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+from database import SessionLocal
+from models.db_models import Puller
+from services.puller_index import puller_index
+from services.ride_versions import ride_versions
+
+# Flush interval for the single-fix write buffer; 0 writes every fix directly
+LOCATION_WRITE_BUFFER_MS = int(os.getenv("LOCATION_WRITE_BUFFER_MS", "0"))
+
+
+def coalesce_fixes(fixes) -> dict[str, tuple[float, float, Optional[datetime]]]:
+    """
+    Keep only the newest fix per puller from (puller_id, lat, lng, recorded_at)
+    Fixes without recorded_at count as newer than everything before them
+    """
+    latest: dict[str, tuple[float, float, Optional[datetime]]] = {}
+    for puller_id, lat, lng, recorded_at in fixes:
+        current = latest.get(puller_id)
+        if current and recorded_at and current[2] and recorded_at < current[2]:
+            continue
+        latest[puller_id] = (lat, lng, recorded_at)
+    return latest
+
+
+def apply_location_fixes(db: Session, latest: dict[str, tuple]) -> list[str]:
+    """
+    Write coalesced fixes in one transaction: one SELECT for existence plus
+    one executemany UPDATE. Returns the puller ids that were updated
+    """
+    if not latest:
+        return []
+    known = [puller_id for (puller_id,) in db.query(Puller.puller_id).filter(Puller.puller_id.in_(list(latest)))]
+    if not known:
+        return []
+    
+    db.execute(update(Puller), [
+        {"puller_id": puller_id, "current_lat": latest[puller_id][0], "current_lng": latest[puller_id][1]}
+        for puller_id in known
+    ])
+    db.commit()
+    
+    # Position only - a status read before the UPDATE may be stale by now
+    # (e.g. accepted meanwhile), and the index already tracks status
+    for puller_id in known:
+        lat, lng, _ = latest[puller_id]
+        puller_index.move(puller_id, lat, lng)
+        puller_index.mark_known(puller_id)
+        ride_versions.bump_puller(puller_id)
+    return known
+
+
+class LocationBuffer:
+    """Latest fix per puller between flushes (write coalescing)"""
+
+    def __init__(self):
+        self._pending: dict[str, tuple[float, float, Optional[datetime]]] = {}
+        self._lock = threading.Lock()
+
+    def add(self, puller_id: str, lat: float, lng: float, recorded_at: Optional[datetime] = None):
+        with self._lock:
+            current = self._pending.get(puller_id)
+            if current and recorded_at and current[2] and recorded_at < current[2]:
+                return
+            self._pending[puller_id] = (lat, lng, recorded_at)
+        # Nearest-puller searches see the move right away
+        puller_index.move(puller_id, lat, lng)
+
+    def __len__(self):
+        return len(self._pending)
+
+    def flush(self) -> int:
+        """Write everything buffered so far, returns pullers updated"""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        if not pending:
+            return 0
+        db = SessionLocal()
+        try:
+            return len(apply_location_fixes(db, pending))
+        except Exception as e:
+            print(f"Error flushing location buffer: {e}")
+            db.rollback()
+            # Put the fixes back unless newer ones arrived meanwhile
+            with self._lock:
+                for puller_id, fix in pending.items():
+                    self._pending.setdefault(puller_id, fix)
+            return 0
+        finally:
+            db.close()
+
+
+location_buffer = LocationBuffer()
@@ -0,0 +1,73 @@
+"""
+Process-wide in-memory registry of Location coordinates
+Locations change rarely, so hot endpoints resolve them from memory instead of
+querying the locations table on every request
+"""
+import threading
+import time
+from typing import NamedTuple, Optional
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from models.db_models import Location
+
+# Minimum seconds between reloads triggered by a lookup miss
+# (picks up locations seeded by another process without hammering the DB)
+MISS_RELOAD_INTERVAL_SECONDS = 30
+
+
+class Coordinates(NamedTuple):
+    lat: float
+    lng: float
+
+
+class LocationRegistry:
+    """Location name -> Coordinates, reloaded from the database on invalidation"""
+
+    def __init__(self):
+        self._locations: dict[str, Coordinates] = {}
+        self._lock = threading.Lock()
+        self._loaded = False
+        self._loaded_at = 0.0
+        self.version = 0  # Bumped on every reload
+
+    def load(self, db: Session) -> int:
+        """(Re)load every location from the database, returns location count"""
+        rows = db.query(Location.name, Location.lat, Location.lng).all()
+        locations = {name: Coordinates(lat, lng) for name, lat, lng in rows}
+        with self._lock:
+            self._locations = locations
+            self._loaded = True
+            self._loaded_at = time.monotonic()
+            self.version += 1
+        return len(locations)
+
+    def invalidate(self):
+        """Mark the registry stale - the next lookup reloads it"""
+        with self._lock:
+            self._loaded = False
+
+    def get(self, name: str, db: Session) -> Optional[Coordinates]:
+        """Resolve a location by name, loading from the database only when stale"""
+        if not self._loaded:
+            self.load(db)
+        coords = self._locations.get(name)
+        if coords is None and time.monotonic() - self._loaded_at > MISS_RELOAD_INTERVAL_SECONDS:
+            self.load(db)
+            coords = self._locations.get(name)
+        return coords
+
+    async def get_async(self, name: str, db: AsyncSession) -> Optional[Coordinates]:
+        """get() for async handlers - a warm hit never touches the session"""
+        if self._loaded:
+            coords = self._locations.get(name)
+            if coords is not None:
+                return coords
+        return await db.run_sync(lambda session: self.get(name, session))
+
+    def all(self, db: Session) -> dict[str, Coordinates]:
+        if not self._loaded:
+            self.load(db)
+        return dict(self._locations)
+
+
+location_registry = LocationRegistry()
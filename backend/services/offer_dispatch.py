@@ -0,0 +1,148 @@
+"""
+Sequential offer dispatch (DISPATCH_MODE=offer)
+A new ride is offered to its nearest available puller alone for
+OFFER_WINDOW_SECONDS (a ride_offer event); a reject or silence (an
+offer_withdrawn event to the holder) moves the offer to the next of the
+nearest pullers distribute_alerts found (each still within ALERT_RADIUS_M
+when its turn comes), and once they are used up - or DISPATCH_FALLBACK_SECONDS
+after the request, well before the ride timeout - the ride is opened to
+every puller in range. Windows are asyncio timers on the application's
+event loop, so nothing polls the database and only the puller holding the
+offer can accept. Offers are written to ride_offers (for accept_ride's
+guard) by one writer thread, in order, before the puller is told
+"""
+import asyncio
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Optional
+from database import SessionLocal
+from services.alert_service import ALERT_RADIUS_M, ALERT_TIMEOUT_SECONDS, offer_alert, open_alert, withdraw_offers
+from services.alerts_feed import alerts_feed
+from services.puller_index import puller_index
+from services.ride_offers import ride_offers, record_offer, DISPATCH_FALLBACK_SECONDS, OFFER_WINDOW_SECONDS
+from services.ride_rejections import ride_rejections
+from utils.gps_utils import haversine_distance
+
+# Shorter offers than this are not worth making - the ride is opened instead
+MIN_OFFER_SECONDS = 2
+
+
+def _record_offer(ride_id: str, puller_id: str, expires_at: datetime):
+    db = SessionLocal()
+    try:
+        record_offer(db, ride_id, puller_id, expires_at)
+        db.commit()
+    finally:
+        db.close()
+
+
+class _Dispatch:
+    __slots__ = ("candidates", "opens_at", "holder", "timer")
+
+    def __init__(self, candidates: list[tuple[str, float]], opens_at: datetime):
+        self.candidates = deque(candidates)  # [(puller_id, meters)] nearest first when requested
+        self.opens_at = opens_at  # fallback to broadcast
+        self.holder: Optional[str] = None
+        self.timer: Optional[asyncio.TimerHandle] = None
+
+
+class OfferEngine:
+    def __init__(self):
+        self._rides: dict[str, _Dispatch] = {}  # only touched on the event loop
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="offer-writer")
+
+    def bind_loop(self, loop: asyncio.AbstractEventLoop):
+        """Run offer timers on the application's event loop (called at startup)"""
+        self._loop = loop
+
+    def _call(self, fn, *args):
+        if self._loop is None or self._loop.is_closed():
+            return
+        self._loop.call_soon_threadsafe(fn, *args)
+
+    def dispatch(self, ride_id: str, candidates: list[tuple[str, float]]):
+        """Start offering a withheld ride to candidates [(puller_id, meters)], nearest first"""
+        self._call(self._start, ride_id, candidates)
+
+    def declined(self, ride_id: str, puller_id: str):
+        """puller_id rejected ride_id - move on if they held its offer"""
+        self._call(self._declined, ride_id, puller_id)
+
+    def cancel(self, ride_id: str):
+        """ride_id left PENDING - stop its timers"""
+        self._call(self._forget, ride_id)
+
+    def _start(self, ride_id: str, candidates: list[tuple[str, float]]):
+        entry = alerts_feed.get(ride_id)
+        if entry is None or ride_id in self._rides:
+            return
+        opens_at = entry[0]["expires_at"] - timedelta(seconds=ALERT_TIMEOUT_SECONDS - DISPATCH_FALLBACK_SECONDS)
+        self._rides[ride_id] = _Dispatch(candidates, opens_at)
+        self._advance(ride_id)
+
+    def _declined(self, ride_id: str, puller_id: str):
+        dispatch = self._rides.get(ride_id)
+        if dispatch is not None and dispatch.holder == puller_id:
+            self._advance(ride_id)
+
+    def _lapsed(self, ride_id: str, puller_id: str):
+        ride_offers.lapse(ride_id, puller_id)  # silence counts as a pass
+        withdraw_offers()
+        self._advance(ride_id)
+
+    def _forget(self, ride_id: str) -> Optional[_Dispatch]:
+        dispatch = self._rides.pop(ride_id, None)
+        if dispatch is not None and dispatch.timer is not None:
+            dispatch.timer.cancel()
+        return dispatch
+
+    def _advance(self, ride_id: str):
+        """Offer ride_id to its next eligible candidate, or open it to everyone"""
+        dispatch = self._rides.get(ride_id)
+        entry = alerts_feed.get(ride_id)
+        if dispatch is None or entry is None:
+            self._forget(ride_id)
+            return
+        if dispatch.timer is not None:
+            dispatch.timer.cancel()
+        alert, lat, lng = entry
+
+        window = min(OFFER_WINDOW_SECONDS, (dispatch.opens_at - datetime.utcnow()).total_seconds())
+        if window >= MIN_OFFER_SECONDS:
+            skip = (ride_rejections.rejecters(ride_id), ride_offers.passed(ride_id))
+            while dispatch.candidates:
+                puller_id, _ = dispatch.candidates.popleft()
+                # Never passed on this ride, still AVAILABLE, not busy with another offer
+                position = puller_index.positions([puller_id])
+                if not position or any(puller_id in pullers for pullers in skip) or ride_offers.holds_offer(puller_id):
+                    continue
+                # Measured again - the puller may have moved since the ride was requested
+                distance = haversine_distance(lat, lng, position[0][1], position[0][2])
+                if distance > ALERT_RADIUS_M:
+                    continue
+                dispatch.holder = puller_id
+                # Reserved in memory right away, so no other ride picks this puller meanwhile
+                ride_offers.offer(ride_id, puller_id, window)
+                self._loop.create_task(self._announce(ride_id, dispatch, alert, puller_id, distance, window))
+                return
+
+        self._forget(ride_id)
+        open_alert(alert, lat, lng)
+
+    async def _announce(self, ride_id: str, dispatch: _Dispatch, alert: dict, puller_id: str,
+                        distance: float, window: float):
+        """Write the offer for accept_ride's guard, then tell the puller and start their window"""
+        expires_at = datetime.utcnow() + timedelta(seconds=window)
+        try:
+            await self._loop.run_in_executor(self._writer, _record_offer, ride_id, puller_id, expires_at)
+        except Exception as e:
+            print(f"Error recording ride offer: {e}")
+        if self._rides.get(ride_id) is not dispatch or dispatch.holder != puller_id:
+            return  # taken, expired or moved on meanwhile
+        offer_alert(alert, puller_id, distance, window)
+        dispatch.timer = self._loop.call_later(window, self._lapsed, ride_id, puller_id)
+
+
+offer_engine = OfferEngine()
@@ -0,0 +1,129 @@
+"""
+Points ledger
+points_history is append-only and is the source of truth for balances:
+completions and admin adjustments only INSERT an entry, nothing updates the
+puller row. A puller's balance at time t is their latest snapshot at or
+before t plus the ledger entries after it, so reads cost two index seeks and
+a short tail. The snapshot job rolls active pullers forward, refreshes the
+cached Puller.points / total_rides columns (the API itself only reads
+balance_as_of) and cross-checks ride-backed entries against rides.points_awarded
+"""
+import os
+from datetime import datetime, timedelta
+from typing import Optional
+from sqlalchemy import func, insert, update
+from sqlalchemy.orm import Session
+from models.db_models import PointsHistory, PointsSnapshot, Puller, Ride
+
+POINTS_SNAPSHOT_SECONDS = float(os.getenv("POINTS_SNAPSHOT_SECONDS", "300"))
+
+# Snapshots stop this far behind now, so entries still in flight
+# (created_at set, transaction not yet committed) are never skipped
+POINTS_SNAPSHOT_LAG_SECONDS = 30
+
+# Opening snapshots of new accounts cover no ledger entries
+LEDGER_EPOCH = datetime(1970, 1, 1)
+
+OPENING = "opening"
+PERIODIC = "periodic"
+
+SNAPSHOT_BATCH_SIZE = 500
+
+
+def open_account(db: Session, puller_id: str):
+    """Zero opening snapshot for a new puller (caller commits)"""
+    db.add(PointsSnapshot(puller_id=puller_id, as_of=LEDGER_EPOCH, kind=OPENING, points=0, total_rides=0))
+
+
+def balance_as_of(db: Session, puller_id: str, as_of: Optional[datetime] = None) -> dict:
+    """
+    {points, total_rides, snapshot_as_of} over ledger entries created at or
+    before as_of (default now). All three are None when as_of predates the
+    puller's opening snapshot - a legacy puller's earlier balance was never
+    recorded
+    """
+    as_of = as_of or datetime.utcnow()
+    snapshot = db.query(PointsSnapshot.as_of, PointsSnapshot.points, PointsSnapshot.total_rides).filter(
+        PointsSnapshot.puller_id == puller_id, PointsSnapshot.as_of <= as_of
+    ).order_by(PointsSnapshot.as_of.desc()).first()
+    if snapshot is None:
+        return {"points": None, "total_rides": None, "snapshot_as_of": None}
+
+    points, rides = db.query(
+        func.coalesce(func.sum(PointsHistory.points_change), 0), func.count(PointsHistory.ride_id)
+    ).filter(
+        PointsHistory.puller_id == puller_id,
+        PointsHistory.created_at > snapshot.as_of,
+        PointsHistory.created_at <= as_of
+    ).one()
+
+    return {
+        "points": points + snapshot.points,
+        "total_rides": rides + snapshot.total_rides,
+        "snapshot_as_of": snapshot.as_of,
+    }
+
+
+def open_legacy_accounts(db: Session) -> int:
+    """
+    Opening snapshots for pullers created before the ledger (or by seed
+    scripts): their Puller.points / total_rides already include every
+    ledger entry they have, so the snapshot sits at their latest entry, or
+    at now if they have none. Run at startup, before any request writes to
+    the ledger
+    """
+    opened_at = datetime.utcnow()
+    last_entry = db.query(func.max(PointsHistory.created_at)).filter(
+        PointsHistory.puller_id == Puller.puller_id
+    ).scalar_subquery()
+    legacy = db.query(Puller.puller_id, Puller.points, Puller.total_rides, last_entry).filter(
+        ~db.query(PointsSnapshot).filter(PointsSnapshot.puller_id == Puller.puller_id).exists()
+    ).all()
+    if legacy:
+        db.execute(insert(PointsSnapshot), [
+            {"puller_id": puller_id, "as_of": as_of or opened_at, "kind": OPENING,
+             "points": points or 0, "total_rides": total_rides or 0}
+            for puller_id, points, total_rides, as_of in legacy
+        ])
+        db.commit()
+    return len(legacy)
+
+
+def take_snapshots(db: Session) -> dict:
+    """
+    Snapshot every puller with ledger entries since the last run, refresh
+    their cached balance columns and count ride-backed entries whose points
+    disagree with the ride. Returns {"pullers", "mismatches"}
+    """
+    cutoff = datetime.utcnow() - timedelta(seconds=POINTS_SNAPSHOT_LAG_SECONDS)
+    watermark = db.query(func.max(PointsSnapshot.as_of)).filter(PointsSnapshot.kind == PERIODIC).scalar()
+    watermark = watermark or LEDGER_EPOCH
+    if watermark >= cutoff:
+        return {"pullers": 0, "mismatches": 0}
+    window = [PointsHistory.created_at > watermark, PointsHistory.created_at <= cutoff]
+
+    # Balances are read first, so the write lock is only held for the inserts
+    active = [puller_id for (puller_id,) in db.query(PointsHistory.puller_id).filter(*window).distinct()]
+    balances = [{"puller_id": puller_id, **balance_as_of(db, puller_id, cutoff)} for puller_id in active]
+    # Legacy pullers opened after cutoff are still covered by their opening snapshot
+    balances = [b for b in balances if b["snapshot_as_of"] is not None]
+    # One transaction: a partial run would move the watermark past pullers it never snapshotted
+    for start in range(0, len(balances), SNAPSHOT_BATCH_SIZE):
+        batch = balances[start:start + SNAPSHOT_BATCH_SIZE]
+        db.execute(insert(PointsSnapshot), [
+            {"puller_id": b["puller_id"], "as_of": cutoff, "kind": PERIODIC,
+             "points": b["points"], "total_rides": b["total_rides"]}
+            for b in batch
+        ])
+        db.execute(update(Puller), [
+            {"puller_id": b["puller_id"], "points": b["points"], "total_rides": b["total_rides"]}
+            for b in batch
+        ])
+    db.commit()
+
+    mismatched = db.query(PointsHistory.transaction_id, PointsHistory.ride_id).join(
+        Ride, Ride.ride_id == PointsHistory.ride_id
+    ).filter(*window, PointsHistory.points_change != Ride.points_awarded).all()
+    for transaction_id, ride_id in mismatched:
+        print(f"Points ledger mismatch: {transaction_id} disagrees with {ride_id}.points_awarded")
+    return {"pullers": len(active), "mismatches": len(mismatched)}
@@ -0,0 +1,83 @@
+"""
+Process-wide spatial index of AVAILABLE puller positions
+Kept in sync by the endpoints that move pullers or change their status, so
+nearest-puller searches never scan the pullers table. Also remembers every
+puller id it has seen, so existence checks on hot paths need no query
+"""
+import os
+import threading
+from collections.abc import Container
+from typing import Optional
+from sqlalchemy.orm import Session
+from models.db_models import Puller, PullerStatus
+from utils.spatial_index import GridIndex
+
+# Grid cell edge in degrees (~1.1 km at the equator)
+CELL_SIZE_DEG = float(os.getenv("PULLER_INDEX_CELL_DEG", "0.01"))
+
+
+class PullerIndex:
+    def __init__(self):
+        self._grid = GridIndex(CELL_SIZE_DEG)
+        self._known: set[str] = set()  # puller ids of any status
+        self._loaded = False
+        self._load_lock = threading.Lock()
+
+    def load(self, db: Session) -> int:
+        """Rebuild the index from every AVAILABLE puller, returns puller count"""
+        with self._load_lock:
+            rows = db.query(Puller.puller_id, Puller.current_lat, Puller.current_lng).filter(
+                Puller.status == PullerStatus.AVAILABLE
+            ).all()
+            self._grid.replace_all((puller_id, lat or 0.0, lng or 0.0) for puller_id, lat, lng in rows)
+            self._known = {puller_id for (puller_id,) in db.query(Puller.puller_id)}
+            self._loaded = True
+            return len(rows)
+
+    def sync(self, puller: Puller):
+        """Reflect a puller's current position/status (call after commit)"""
+        self.set(puller.puller_id, puller.current_lat, puller.current_lng, puller.status)
+
+    def set(self, puller_id: str, lat: float, lng: float, status: PullerStatus):
+        self._known.add(puller_id)
+        if status == PullerStatus.AVAILABLE:
+            self._grid.upsert(puller_id, lat or 0.0, lng or 0.0)
+        else:
+            self._grid.remove(puller_id)
+
+    def move(self, puller_id: str, lat: float, lng: float):
+        """Update the position of a puller already in the index (status unknown)"""
+        if puller_id in self._grid:
+            self._grid.upsert(puller_id, lat, lng)
+
+    def is_known(self, puller_id: str) -> bool:
+        """puller_id exists as far as this process has seen - False may just mean not seen yet"""
+        return puller_id in self._known
+
+    def mark_known(self, puller_id: str):
+        """Remember a puller id confirmed in the database (e.g. signed up after startup)"""
+        self._known.add(puller_id)
+
+    def positions(self, puller_ids) -> list[tuple[str, float, float]]:
+        """[(puller_id, lat, lng)] for the given pullers that are AVAILABLE"""
+        found = []
+        for puller_id in puller_ids:
+            position = self._grid.position(puller_id)
+            if position is not None:
+                found.append((puller_id, *position))
+        return found
+
+    def within(self, lat: float, lng: float, radius_m: float) -> list[tuple[str, float]]:
+        """AVAILABLE pullers within radius_m meters as [(puller_id, meters)], unsorted"""
+        return self._grid.within(lat, lng, radius_m)
+
+    def nearest_available(self, lat: float, lng: float, k: int, db: Session,
+                          exclude: Optional[Container[str]] = None,
+                          radius_m: Optional[float] = None) -> list[tuple[str, float]]:
+        """k nearest AVAILABLE pullers (within radius_m) as [(puller_id, meters)], nearest first, skipping exclude"""
+        if not self._loaded:
+            self.load(db)
+        return self._grid.nearest(lat, lng, k, max_distance=radius_m, exclude=exclude)
+
+
+puller_index = PullerIndex()
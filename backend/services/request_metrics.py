@@ -0,0 +1,211 @@
+"""
+Per-route request metrics
+The middleware opens a RequestStats for every HTTP request in a context
+variable; engine event hooks charge each SQL statement run on its behalf
+(threadpool handlers and async sessions both inherit the context). Totals
+per route are rendered in Prometheus text format for /metrics
+"""
+import os
+import threading
+import time
+from contextvars import ContextVar
+from typing import Optional
+from sqlalchemy import event
+from starlette.datastructures import MutableHeaders
+
+# Echo per-request DB cost in response headers (X-DB-*, Server-Timing)
+METRICS_DEBUG_HEADERS = os.getenv("METRICS_DEBUG_HEADERS", "0") == "1"
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+class RequestStats:
+    """SQL cost of one request"""
+    __slots__ = ("statements", "db_seconds", "rows")
+
+    def __init__(self):
+        self.statements = 0
+        self.db_seconds = 0.0
+        self.rows = 0
+
+
+_current: ContextVar[Optional[RequestStats]] = ContextVar("request_stats", default=None)
+
+
+def current_stats() -> Optional[RequestStats]:
+    """Stats of the request being handled, None outside a request"""
+    return _current.get()
+
+
+class _RowCountingCursor:
+    """DBAPI cursor proxy that charges fetched rows to a request"""
+
+    def __init__(self, cursor, stats: RequestStats):
+        self._cursor = cursor
+        self._stats = stats
+
+    def fetchone(self):
+        row = self._cursor.fetchone()
+        if row is not None:
+            self._stats.rows += 1
+        return row
+
+    def fetchmany(self, *args, **kwargs):
+        rows = self._cursor.fetchmany(*args, **kwargs)
+        self._stats.rows += len(rows)
+        return rows
+
+    def fetchall(self):
+        rows = self._cursor.fetchall()
+        self._stats.rows += len(rows)
+        return rows
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current.get() is not None:
+        conn.info.setdefault("metrics_query_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _current.get()
+    if stats is None:
+        return
+    stats.db_seconds += time.perf_counter() - conn.info["metrics_query_start"].pop()
+    stats.statements += 1
+    if cursor.description is not None and context is not None:
+        # Rows are fetched after this hook returns - count them as they come out
+        context.cursor = _RowCountingCursor(cursor, stats)
+
+
+def instrument_engine(engine):
+    """Charge statements on engine (a sync Engine, or async_engine.sync_engine)"""
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+class _RouteTotals:
+    __slots__ = ("statuses", "buckets", "seconds", "statements", "db_seconds", "rows")
+
+    def __init__(self):
+        self.statuses: dict[int, int] = {}
+        self.buckets = [0] * len(LATENCY_BUCKETS)
+        self.seconds = 0.0
+        self.statements = 0
+        self.db_seconds = 0.0
+        self.rows = 0
+
+
+def _labels(method: str, route: str, **extra) -> str:
+    pairs = {"method": method, "route": route, **extra}
+    return ",".join(
+        '{}="{}"'.format(key, str(value).replace("\\", "\\\\").replace('"', '\\"'))
+        for key, value in pairs.items()
+    )
+
+
+class RequestMetrics:
+    """Process-wide totals per (method, route template)"""
+
+    def __init__(self):
+        self._routes: dict[tuple[str, str], _RouteTotals] = {}
+        self._lock = threading.Lock()
+
+    def record(self, method: str, route: str, status: int, seconds: float, stats: RequestStats):
+        with self._lock:
+            totals = self._routes.get((method, route))
+            if totals is None:
+                totals = self._routes[(method, route)] = _RouteTotals()
+            totals.statuses[status] = totals.statuses.get(status, 0) + 1
+            for i, bound in enumerate(LATENCY_BUCKETS):
+                if seconds <= bound:
+                    totals.buckets[i] += 1
+            totals.seconds += seconds
+            totals.statements += stats.statements
+            totals.db_seconds += stats.db_seconds
+            totals.rows += stats.rows
+
+    def reset(self):
+        with self._lock:
+            self._routes.clear()
+
+    def render(self) -> str:
+        """Prometheus text exposition of every route seen so far"""
+        with self._lock:
+            routes = sorted(self._routes.items())
+            lines = [
+                "# HELP aeras_http_requests_total HTTP requests by route and status",
+                "# TYPE aeras_http_requests_total counter",
+            ]
+            for (method, route), totals in routes:
+                for status, count in sorted(totals.statuses.items()):
+                    lines.append(f"aeras_http_requests_total{{{_labels(method, route, status=status)}}} {count}")
+
+            lines += [
+                "# HELP aeras_http_request_duration_seconds Wall time from request to last response byte",
+                "# TYPE aeras_http_request_duration_seconds histogram",
+            ]
+            for (method, route), totals in routes:
+                count = sum(totals.statuses.values())
+                for bound, bucket in zip(LATENCY_BUCKETS, totals.buckets):
+                    lines.append(f"aeras_http_request_duration_seconds_bucket{{{_labels(method, route, le=bound)}}} {bucket}")
+                lines.append(f"aeras_http_request_duration_seconds_bucket{{{_labels(method, route, le='+Inf')}}} {count}")
+                lines.append(f"aeras_http_request_duration_seconds_sum{{{_labels(method, route)}}} {totals.seconds:.6f}")
+                lines.append(f"aeras_http_request_duration_seconds_count{{{_labels(method, route)}}} {count}")
+
+            for name, help_text, attr, fmt in (
+                ("aeras_db_statements_total", "SQL statements executed", "statements", "{}"),
+                ("aeras_db_duration_seconds_total", "Time spent executing SQL", "db_seconds", "{:.6f}"),
+                ("aeras_db_rows_total", "Rows fetched from SQL results", "rows", "{}"),
+            ):
+                lines += [f"# HELP {name} {help_text}", f"# TYPE {name} counter"]
+                for (method, route), totals in routes:
+                    lines.append(f"{name}{{{_labels(method, route)}}} {fmt.format(getattr(totals, attr))}")
+        return "\n".join(lines) + "\n"
+
+
+request_metrics = RequestMetrics()
+
+
+class RequestMetricsMiddleware:
+    """ASGI middleware timing each HTTP request and recording its SQL cost"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats()
+        token = _current.set(stats)
+        start = time.perf_counter()
+        status = 500
+
+        async def send_with_metrics(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if METRICS_DEBUG_HEADERS:
+                    headers = MutableHeaders(scope=message)
+                    headers.append("X-DB-Statements", str(stats.statements))
+                    headers.append("X-DB-Rows", str(stats.rows))
+                    headers.append("X-DB-Time-Ms", f"{stats.db_seconds * 1000:.2f}")
+                    headers.append("Server-Timing", f"db;dur={stats.db_seconds * 1000:.2f}, "
+                                                    f"app;dur={(time.perf_counter() - start) * 1000:.2f}")
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_metrics)
+        finally:
+            _current.reset(token)
+            # FastAPI leaves the matched route in the scope - label by its template
+            # so /rides/{ride_id} is one series, not one per ride
+            route = scope.get("route")
+            request_metrics.record(
+                scope["method"], getattr(route, "path", "unmatched"), status,
+                time.perf_counter() - start, stats
+            )
@@ -0,0 +1,114 @@
+"""
+Ride event hub - pushes ride lifecycle events to pullers over WebSocket
+Sync handlers run in the threadpool (and the timeout job in its own thread),
+so publishing only enqueues; each connection drains its own queue on the
+application's event loop, which keeps per-puller ordering intact
+"""
+import asyncio
+import json
+import threading
+from typing import Iterable, Optional
+from fastapi import WebSocket, WebSocketDisconnect
+
+# Event types pushed to pullers
+RIDE_NEW = "ride_new"
+RIDE_TAKEN = "ride_taken"
+RIDE_EXPIRED = "ride_expired"
+RIDE_OFFER = "ride_offer"
+OFFER_WITHDRAWN = "offer_withdrawn"
+
+# Undelivered events per connection before a stalled client is dropped
+MAX_QUEUED_EVENTS = 256
+
+
+class RideEventHub:
+    def __init__(self):
+        self._queues: dict[str, set[asyncio.Queue]] = {}
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def bind_loop(self, loop: asyncio.AbstractEventLoop):
+        """Remember the event loop that owns the sockets (called at startup)"""
+        self._loop = loop
+
+    def connected_pullers(self) -> set[str]:
+        with self._lock:
+            return set(self._queues)
+
+    async def serve(self, puller_id: str, websocket: WebSocket):
+        """Accept a puller socket and stream its events until it disconnects"""
+        if self._loop is None:
+            self._loop = asyncio.get_running_loop()
+        await websocket.accept()
+        queue: asyncio.Queue = asyncio.Queue(MAX_QUEUED_EVENTS)
+        with self._lock:
+            self._queues.setdefault(puller_id, set()).add(queue)
+        
+        # Client messages are ignored (keep-alive pings); reading them is how
+        # a disconnect is noticed
+        async def receive():
+            try:
+                while True:
+                    await websocket.receive_text()
+            except WebSocketDisconnect:
+                pass
+        
+        async def send():
+            while True:
+                message = await queue.get()
+                if message is None:  # Queue overflowed - drop the client
+                    await websocket.close(code=1013)
+                    return
+                await websocket.send_text(message)
+        
+        tasks = [asyncio.create_task(receive()), asyncio.create_task(send())]
+        try:
+            await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            for task in tasks:
+                task.cancel()
+            with self._lock:
+                queues = self._queues.get(puller_id)
+                if queues:
+                    queues.discard(queue)
+                    if not queues:
+                        del self._queues[puller_id]
+
+    def publish(self, event_type: str, payload: dict, puller_ids: Optional[Iterable[str]] = None):
+        """Send one event to the given pullers (default: every connected puller)"""
+        message = json.dumps({"type": event_type, **payload})
+        with self._lock:
+            targets = self._queues if puller_ids is None else {
+                puller_id: self._queues[puller_id] for puller_id in puller_ids if puller_id in self._queues
+            }
+            deliveries = [(queue, message) for queues in targets.values() for queue in queues]
+        self._enqueue(deliveries)
+
+    def publish_many(self, messages: list[tuple[str, str, dict]]):
+        """Send individually addressed events [(puller_id, event_type, payload)]"""
+        with self._lock:
+            deliveries = [
+                (queue, json.dumps({"type": event_type, **payload}))
+                for puller_id, event_type, payload in messages
+                for queue in self._queues.get(puller_id, ())
+            ]
+        self._enqueue(deliveries)
+
+    def _enqueue(self, deliveries: list[tuple[asyncio.Queue, str]]):
+        if not deliveries or self._loop is None or self._loop.is_closed():
+            return
+        self._loop.call_soon_threadsafe(self._put_all, deliveries)
+
+    @staticmethod
+    def _put_all(deliveries: list[tuple[asyncio.Queue, Optional[str]]]):
+        for queue, message in deliveries:
+            try:
+                queue.put_nowait(message)
+            except asyncio.QueueFull:
+                # Replace the backlog with a close sentinel
+                while not queue.empty():
+                    queue.get_nowait()
+                queue.put_nowait(None)
+
+
+ride_events = RideEventHub()
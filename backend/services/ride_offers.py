@@ -0,0 +1,216 @@
+"""
+Exclusive ride offers for the dispatch engines (DISPATCH_MODE != "race")
+A dispatched ride is withheld from the open alert list; at most one puller
+at a time holds an offer on it for a short window, and only that puller
+sees it in /alerts and may accept it. A declined or lapsed offer marks the
+puller as passed, so the engine moves on to someone else, and a ride the
+engine gives up on is opened to every puller in range (race mode). Offers
+that end without their holder's reject (lapsed, moved on, dropped when the
+holder took another ride) are queued for an offer_withdrawn event. All
+checks are dict lookups in memory; each offer is also written to
+ride_offers, so accept_ride can enforce it inside its claiming UPDATE
+"""
+import heapq
+import os
+import threading
+import time
+from collections.abc import Container
+from datetime import datetime
+from typing import Optional
+from sqlalchemy import exists, update
+from sqlalchemy.orm import Session
+from models.db_models import Ride, RideOffer
+
+# "race": every puller in range sees a ride and the first accept wins
+# "batch": services.batch_dispatch matches pending rides to pullers every tick
+# "offer": services.offer_dispatch offers each ride to its nearest pullers in turn
+DISPATCH_MODE = os.getenv("DISPATCH_MODE", "race")
+
+# How long a puller holds an exclusive offer before it moves on
+OFFER_WINDOW_SECONDS = float(os.getenv("OFFER_WINDOW_SECONDS", "10"))
+
+# Rides still unassigned this long after they were requested are opened to
+# every puller, leaving time for the race before the 60s ride timeout
+DISPATCH_FALLBACK_SECONDS = float(os.getenv("DISPATCH_FALLBACK_SECONDS", "40"))
+
+_NO_PULLERS: frozenset = frozenset()
+
+
+class _HiddenRides:
+    """Ride ids a puller must not see: rejected by them, or withheld and not offered to them"""
+    __slots__ = ("_offers", "_puller_id", "_rejected")
+
+    def __init__(self, offers: "RideOffers", puller_id: str, rejected: Container[str]):
+        self._offers = offers
+        self._puller_id = puller_id
+        self._rejected = rejected
+
+    def __contains__(self, ride_id: str) -> bool:
+        return ride_id in self._rejected or self._offers.reserved_for_other(ride_id, self._puller_id)
+
+    def __bool__(self) -> bool:
+        return bool(self._rejected) or bool(self._offers._withheld)
+
+
+class RideOffers:
+    def __init__(self):
+        self._withheld: set[str] = set()  # pending rides the dispatcher still controls
+        self._offers: dict[str, tuple[str, float]] = {}  # ride_id -> (puller_id, monotonic deadline)
+        self._offered: dict[str, str] = {}  # puller_id -> ride_id they hold
+        self._passed: dict[str, set[str]] = {}  # ride_id -> pullers who declined or let an offer lapse
+        self._deadlines: list[tuple[float, str, str]] = []  # (deadline, ride_id, puller_id) min-heap
+        self._withdrawn: list[tuple[str, str]] = []  # (ride_id, puller_id) offers the holder must be told are gone
+        self._lock = threading.Lock()
+
+    def _drop_offer(self, ride_id: str) -> Optional[str]:
+        offer = self._offers.pop(ride_id, None)
+        if offer is None:
+            return None
+        if self._offered.get(offer[0]) == ride_id:
+            del self._offered[offer[0]]
+        return offer[0]
+
+    def _lapse(self, now: float):
+        """Offers past their deadline count as passed - O(lapsed)"""
+        while self._deadlines and self._deadlines[0][0] <= now:
+            deadline, ride_id, puller_id = heapq.heappop(self._deadlines)
+            if self._offers.get(ride_id) == (puller_id, deadline):
+                self._drop_offer(ride_id)
+                self._passed.setdefault(ride_id, set()).add(puller_id)
+                self._withdrawn.append((ride_id, puller_id))
+
+    def withhold(self, ride_id: str):
+        """Keep a newly PENDING ride out of the open alert list until it is offered or opened"""
+        with self._lock:
+            self._withheld.add(ride_id)
+
+    def offer(self, ride_id: str, puller_id: str, window: float = OFFER_WINDOW_SECONDS):
+        """Give puller_id an exclusive offer on a withheld ride for window seconds"""
+        deadline = time.monotonic() + window
+        with self._lock:
+            previous = self._drop_offer(ride_id)
+            if previous is not None and previous != puller_id:
+                self._withdrawn.append((ride_id, previous))
+            self._offers[ride_id] = (puller_id, deadline)
+            self._offered[puller_id] = ride_id
+            heapq.heappush(self._deadlines, (deadline, ride_id, puller_id))
+
+    def decline(self, ride_id: str, puller_id: str) -> bool:
+        """puller_id passes on ride_id; True if they were holding its offer"""
+        with self._lock:
+            if ride_id not in self._withheld:
+                return False
+            self._passed.setdefault(ride_id, set()).add(puller_id)
+            offer = self._offers.get(ride_id)
+            if offer is None or offer[0] != puller_id:
+                return False
+            self._drop_offer(ride_id)
+            return True
+
+    def lapse(self, ride_id: str, puller_id: str):
+        """puller_id's offer window on ride_id ran out - a pass, and their offer is withdrawn"""
+        with self._lock:
+            self._lapse(time.monotonic())
+            if ride_id not in self._withheld:
+                return
+            self._passed.setdefault(ride_id, set()).add(puller_id)
+            offer = self._offers.get(ride_id)
+            if offer is not None and offer[0] == puller_id:
+                self._drop_offer(ride_id)
+                self._withdrawn.append((ride_id, puller_id))
+
+    def open(self, ride_id: str):
+        """Stop dispatching ride_id - it becomes visible to every puller in range"""
+        with self._lock:
+            self._withheld.discard(ride_id)
+            self._drop_offer(ride_id)
+            self._passed.pop(ride_id, None)
+
+    def forget(self, ride_id: str):
+        """ride_id left PENDING (accepted or expired)"""
+        self.open(ride_id)
+
+    def accepted(self, ride_id: str, puller_id: str) -> Optional[str]:
+        """puller_id took ride_id - drop it and any other offer they were holding (returned)"""
+        with self._lock:
+            self._withheld.discard(ride_id)
+            self._drop_offer(ride_id)
+            self._passed.pop(ride_id, None)
+            other = self._offered.get(puller_id)
+            if other is not None:
+                self._drop_offer(other)
+                self._withdrawn.append((other, puller_id))
+            return other
+
+    def take_withdrawn(self) -> list[tuple[str, str]]:
+        """(ride_id, puller_id) offers withdrawn since the last call"""
+        with self._lock:
+            withdrawn, self._withdrawn = self._withdrawn, []
+            return withdrawn
+
+    def holder(self, ride_id: str) -> Optional[str]:
+        """Puller holding a live offer on ride_id, if any"""
+        with self._lock:
+            self._lapse(time.monotonic())
+            offer = self._offers.get(ride_id)
+            return offer[0] if offer else None
+
+    def reserved_for_other(self, ride_id: str, puller_id: str) -> bool:
+        """ride_id is withheld and puller_id does not hold its offer"""
+        if ride_id not in self._withheld:
+            return False
+        offer = self._offers.get(ride_id)
+        return offer is None or offer[0] != puller_id or offer[1] <= time.monotonic()
+
+    def hidden_from(self, puller_id: str, rejected: Container[str] = _NO_PULLERS) -> Container[str]:
+        """Membership view of the rides puller_id must not see (rides in `rejected` included)"""
+        return _HiddenRides(self, puller_id, rejected)
+
+    def unoffered(self, ride_ids) -> list[str]:
+        """The withheld rides among ride_ids with no live offer"""
+        with self._lock:
+            self._lapse(time.monotonic())
+            return [ride_id for ride_id in ride_ids if ride_id in self._withheld and ride_id not in self._offers]
+
+    def holding_offers(self) -> Container[str]:
+        """Pullers currently holding an offer - membership checks only"""
+        with self._lock:
+            self._lapse(time.monotonic())
+            return set(self._offered)
+
+    def holds_offer(self, puller_id: str) -> bool:
+        """puller_id holds a live offer on some ride"""
+        with self._lock:
+            self._lapse(time.monotonic())
+            return puller_id in self._offered
+
+    def passed(self, ride_id: str) -> Container[str]:
+        """Pullers who declined ride_id or let its offer lapse - membership checks only"""
+        with self._lock:
+            return self._passed.get(ride_id, _NO_PULLERS)
+
+
+def record_offer(db: Session, ride_id: str, puller_id: str, expires_at: datetime):
+    """Persist puller_id's offer on ride_id until expires_at, replacing the previous one (caller commits)"""
+    db.merge(RideOffer(ride_id=ride_id, puller_id=puller_id, expires_at=expires_at))
+
+
+def end_offer(db: Session, ride_id: str, puller_id: str):
+    """puller_id's offer on ride_id ends now - they declined it (caller commits)"""
+    db.execute(
+        update(RideOffer).where(RideOffer.ride_id == ride_id, RideOffer.puller_id == puller_id)
+        .values(expires_at=datetime.utcnow())
+    )
+
+
+def claimable_by(puller_id: str, now: datetime):
+    """
+    WHERE condition on rides for puller_id's claiming UPDATE: the ride has no
+    offer, the offer is puller_id's, or it has expired
+    """
+    return ~exists().where(
+        RideOffer.ride_id == Ride.ride_id, RideOffer.puller_id != puller_id, RideOffer.expires_at >= now
+    )
+
+
+ride_offers = RideOffers()
@@ -0,0 +1,84 @@
+"""
+Puller rejections of ride alerts
+A rejection is one (ride_id, puller_id) row in ride_rejections plus an entry
+in memory, keyed both ways, that lives until the ride's own deadline
+(requested_at + RIDE_TIMEOUT_SECONDS) - after that the ride has left
+PENDING and there is nothing left to hide. Alert reads and pushes exclude
+rejected rides with a dict membership check, no query per ride
+"""
+import heapq
+import threading
+from collections.abc import Container
+from datetime import datetime, timedelta
+from sqlalchemy import exc
+from sqlalchemy.orm import Session
+from models.db_models import Ride, RideRejection, RideStatus
+from services.ride_timeouts import RIDE_TIMEOUT_SECONDS
+
+_NO_REJECTIONS: frozenset = frozenset()
+
+
+class RideRejections:
+    def __init__(self, timeout_seconds: int = RIDE_TIMEOUT_SECONDS):
+        self.timeout = timedelta(seconds=timeout_seconds)
+        self._by_puller: dict[str, dict[str, datetime]] = {}  # puller_id -> {ride_id: ride deadline}
+        self._by_ride: dict[str, set[str]] = {}  # ride_id -> pullers who rejected it
+        self._expiries: list[tuple[datetime, str]] = []  # (ride deadline, ride_id) min-heap
+        self._lock = threading.Lock()
+
+    def _add(self, puller_id: str, ride_id: str, requested_at: datetime):
+        deadline = requested_at + self.timeout
+        self._by_puller.setdefault(puller_id, {})[ride_id] = deadline
+        if ride_id not in self._by_ride:
+            heapq.heappush(self._expiries, (deadline, ride_id))
+        self._by_ride.setdefault(ride_id, set()).add(puller_id)
+
+    def _purge(self, now: datetime):
+        """Forget rides past their deadline - O(expired)"""
+        while self._expiries and self._expiries[0][0] <= now:
+            _, ride_id = heapq.heappop(self._expiries)
+            for puller_id in self._by_ride.pop(ride_id, ()):
+                rejected = self._by_puller.get(puller_id)
+                if rejected is not None:
+                    rejected.pop(ride_id, None)
+                    if not rejected:
+                        del self._by_puller[puller_id]
+
+    def load(self, db: Session) -> int:
+        """Rebuild memory from the rejections of rides still PENDING (startup)"""
+        rows = db.query(RideRejection.puller_id, RideRejection.ride_id, Ride.requested_at).join(
+            Ride, Ride.ride_id == RideRejection.ride_id
+        ).filter(Ride.status == RideStatus.PENDING).all()
+        with self._lock:
+            self._by_puller.clear()
+            self._by_ride.clear()
+            self._expiries.clear()
+            for puller_id, ride_id, requested_at in rows:
+                self._add(puller_id, ride_id, requested_at)
+            self._purge(datetime.utcnow())
+            return len(self._by_ride)
+
+    def reject(self, db: Session, puller_id: str, ride_id: str, requested_at: datetime):
+        """Record that puller_id declined ride_id (requested at requested_at); idempotent"""
+        db.add(RideRejection(ride_id=ride_id, puller_id=puller_id))
+        try:
+            db.commit()
+        except exc.IntegrityError:
+            db.rollback()  # already rejected
+        with self._lock:
+            self._purge(datetime.utcnow())
+            self._add(puller_id, ride_id, requested_at)
+
+    def rejected_by(self, puller_id: str) -> Container[str]:
+        """Ride ids puller_id has rejected - for membership checks only, do not mutate"""
+        with self._lock:
+            self._purge(datetime.utcnow())
+            return self._by_puller.get(puller_id, _NO_REJECTIONS)
+
+    def rejecters(self, ride_id: str) -> Container[str]:
+        """Puller ids that rejected ride_id - for membership checks only, do not mutate"""
+        with self._lock:
+            return self._by_ride.get(ride_id, _NO_REJECTIONS)
+
+
+ride_rejections = RideRejections()
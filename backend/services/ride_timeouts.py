@@ -0,0 +1,161 @@
+"""
+Deadline-driven ride timeouts (MVP requirement: PENDING > 60s -> TIMEOUT)
+Every PENDING ride sits in a min-heap keyed by requested_at + 60s. A single
+timer thread sleeps until the earliest deadline and expires all due rides
+with one bulk UPDATE, so timeouts fire on time and cost O(expired). A
+batch whose UPDATE fails is re-armed EXPIRE_RETRY_SECONDS later
+"""
+import heapq
+import logging
+import threading
+from datetime import datetime, timedelta
+from typing import Optional
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+from database import SessionLocal
+from models.db_models import Ride, RideStatus
+from services.analytics_rollups import analytics_rollups
+from services.alerts_feed import alerts_feed
+from services.ride_events import ride_events, RIDE_EXPIRED
+from services.ride_offers import ride_offers
+from services.ride_versions import ride_versions
+
+RIDE_TIMEOUT_SECONDS = 60
+
+# Bound on ride ids per UPDATE ... IN (...) (SQLite parameter limit)
+EXPIRE_BATCH_SIZE = 500
+
+# Backoff before a batch whose UPDATE failed is tried again
+EXPIRE_RETRY_SECONDS = 5
+
+logger = logging.getLogger(__name__)
+
+
+def expire_rides(db: Session, *criteria) -> list[str]:
+    """
+    Bulk-mark PENDING rides matching `criteria` as TIMEOUT in one UPDATE
+    Returns the ids that actually expired (accepted rides are left alone)
+    """
+    stmt = update(Ride).where(
+        Ride.status == RideStatus.PENDING, *criteria
+    ).values(status=RideStatus.TIMEOUT).execution_options(synchronize_session=False)
+    
+    if db.get_bind().dialect.update_returning:
+        expired = db.execute(stmt.returning(Ride.ride_id, Ride.requested_at)).all()
+    else:
+        expired = db.query(Ride.ride_id, Ride.requested_at).filter(
+            Ride.status == RideStatus.PENDING, *criteria
+        ).with_for_update().all()
+        if expired:
+            db.execute(stmt.where(Ride.ride_id.in_([ride_id for ride_id, _ in expired])))
+    db.commit()
+    
+    expired_ids = [ride_id for ride_id, _ in expired]
+    for ride_id, requested_at in expired:
+        # The safety sweep can catch rides from days the rollups consider settled
+        analytics_rollups.ride_changed(requested_at)
+        ride_versions.bump(ride_id, None)
+        alerts_feed.remove(ride_id)
+        ride_offers.forget(ride_id)
+        ride_events.publish(RIDE_EXPIRED, {"ride_id": ride_id})
+    if expired_ids:
+        print(f"Marked {len(expired_ids)} rides as timeout")
+    return expired_ids
+
+
+class RideTimeoutScheduler:
+    def __init__(self, timeout_seconds: int = RIDE_TIMEOUT_SECONDS):
+        self.timeout = timedelta(seconds=timeout_seconds)
+        self._heap: list[tuple[datetime, str]] = []
+        # Live deadline per ride - heap entries that disagree are stale
+        # (cancelled or rescheduled) and skipped when popped
+        self._deadlines: dict[str, datetime] = {}
+        self._wakeup = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self._running = False
+
+    def schedule(self, ride_id: str, requested_at: datetime):
+        """Arm the timeout for a PENDING ride"""
+        deadline = requested_at + self.timeout
+        with self._wakeup:
+            self._deadlines[ride_id] = deadline
+            heapq.heappush(self._heap, (deadline, ride_id))
+            if self._heap[0][1] == ride_id:
+                self._wakeup.notify()
+
+    def cancel(self, ride_id: str):
+        """Disarm the timeout (ride accepted)"""
+        with self._wakeup:
+            self._deadlines.pop(ride_id, None)
+
+    def pending_count(self) -> int:
+        return len(self._deadlines)
+
+    def load(self, db: Session) -> int:
+        """Arm timeouts for every PENDING ride already in the database"""
+        rows = db.query(Ride.ride_id, Ride.requested_at).filter(
+            Ride.status == RideStatus.PENDING
+        ).all()
+        for ride_id, requested_at in rows:
+            self.schedule(ride_id, requested_at or datetime.utcnow())
+        return len(rows)
+
+    def start(self):
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name="ride-timeouts", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        with self._wakeup:
+            self._running = False
+            self._wakeup.notify()
+        if self._thread:
+            self._thread.join(timeout=5)
+
+    def _pop_due(self, now: datetime) -> list[str]:
+        due = []
+        while self._heap and self._heap[0][0] <= now:
+            deadline, ride_id = heapq.heappop(self._heap)
+            if self._deadlines.get(ride_id) == deadline:
+                del self._deadlines[ride_id]
+                due.append(ride_id)
+        return due
+
+    def _retry(self, ride_ids: list[str], deadline: datetime):
+        """Re-arm rides whose expiry failed, unless they were re-armed meanwhile"""
+        with self._wakeup:
+            for ride_id in ride_ids:
+                if ride_id not in self._deadlines:
+                    self._deadlines[ride_id] = deadline
+                    heapq.heappush(self._heap, (deadline, ride_id))
+
+    def _expire(self, due: list[str]):
+        for start in range(0, len(due), EXPIRE_BATCH_SIZE):
+            batch = due[start:start + EXPIRE_BATCH_SIZE]
+            db = SessionLocal()
+            try:
+                expire_rides(db, Ride.ride_id.in_(batch))
+            except Exception:
+                logger.exception("Error expiring %d rides, retrying in %ss", len(batch), EXPIRE_RETRY_SECONDS)
+                db.rollback()
+                self._retry(batch, datetime.utcnow() + timedelta(seconds=EXPIRE_RETRY_SECONDS))
+            finally:
+                db.close()
+
+    def _run(self):
+        while True:
+            with self._wakeup:
+                while self._running:
+                    now = datetime.utcnow()
+                    due = self._pop_due(now)
+                    if due:
+                        break
+                    timeout = (self._heap[0][0] - now).total_seconds() if self._heap else None
+                    self._wakeup.wait(timeout)
+                if not self._running:
+                    return
+            
+            self._expire(due)
+
+
+ride_timeouts = RideTimeoutScheduler()
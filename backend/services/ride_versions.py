@@ -0,0 +1,124 @@
+"""
+Per-ride status versions for conditional GETs and long-polling
+A ride's version changes whenever its status changes or its assigned puller
+moves (distance_to_pickup depends on both), so an unchanged ETag can be
+answered with 304 straight from memory. Versions and long-poll waiters
+belong to this process, so the backend runs as a single worker
+"""
+import asyncio
+import itertools
+import threading
+import uuid
+from collections import OrderedDict
+from typing import Optional
+
+# Rides tracked before the least recently touched are forgotten
+# (a forgotten ride simply costs one DB read on its next poll)
+MAX_TRACKED_RIDES = 100000
+
+
+class RideVersionTracker:
+    def __init__(self):
+        # Per-process token so ETags issued before a restart never match
+        self._boot_id = uuid.uuid4().hex[:8]
+        self._counter = itertools.count(1)
+        self._rides: OrderedDict[str, list] = OrderedDict()  # ride_id -> [version, puller_id]
+        self._puller_versions: dict[str, int] = {}
+        self._rides_by_puller: dict[str, set[str]] = {}
+        self._waiters: dict[str, set[asyncio.Future]] = {}
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def etag(self, ride_id: str) -> Optional[str]:
+        """Current ETag for a ride, or None if its state is not tracked"""
+        with self._lock:
+            entry = self._rides.get(ride_id)
+            if entry is None:
+                return None
+            version, puller_id = entry
+            puller_version = self._puller_versions.get(puller_id, 0) if puller_id else 0
+        return f'"{self._boot_id}-{ride_id}-{version}.{puller_version}"'
+
+    def track(self, ride_id: str, puller_id: Optional[str]) -> Optional[str]:
+        """
+        Start tracking a ride just read from the database, returns its ETag
+        Returns None if a concurrent change started tracking it first (the
+        read may be stale, so no ETag should be handed out for it)
+        """
+        with self._lock:
+            if ride_id in self._rides:
+                return None
+            self._set(ride_id, puller_id)
+        return self.etag(ride_id)
+
+    def bump(self, ride_id: str, puller_id: Optional[str]):
+        """Record a ride state change (call after commit) and wake long-pollers"""
+        with self._lock:
+            self._set(ride_id, puller_id)
+        self._wake([ride_id])
+
+    def bump_puller(self, puller_id: str):
+        """Record a puller location change for every ride it is assigned to"""
+        with self._lock:
+            ride_ids = list(self._rides_by_puller.get(puller_id, ()))
+            if not ride_ids:
+                return
+            self._puller_versions[puller_id] = next(self._counter)
+        self._wake(ride_ids)
+
+    def _set(self, ride_id: str, puller_id: Optional[str]):
+        old = self._rides.pop(ride_id, None)
+        if old and old[1] and old[1] != puller_id:
+            self._unlink(old[1], ride_id)
+        self._rides[ride_id] = [next(self._counter), puller_id]
+        if puller_id:
+            self._rides_by_puller.setdefault(puller_id, set()).add(ride_id)
+        while len(self._rides) > MAX_TRACKED_RIDES:
+            evicted_id, (_, evicted_puller) = self._rides.popitem(last=False)
+            if evicted_puller:
+                self._unlink(evicted_puller, evicted_id)
+
+    def _unlink(self, puller_id: str, ride_id: str):
+        rides = self._rides_by_puller.get(puller_id)
+        if rides is not None:
+            rides.discard(ride_id)
+            if not rides:
+                del self._rides_by_puller[puller_id]
+                self._puller_versions.pop(puller_id, None)
+
+    async def wait_for_change(self, ride_id: str, etag: str, timeout: float) -> bool:
+        """Wait until the ride's ETag differs from `etag`; False on timeout"""
+        loop = asyncio.get_running_loop()
+        self._loop = loop
+        future = loop.create_future()
+        with self._lock:
+            self._waiters.setdefault(ride_id, set()).add(future)
+        try:
+            if self.etag(ride_id) != etag:
+                return True
+            await asyncio.wait_for(future, timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+        finally:
+            with self._lock:
+                waiters = self._waiters.get(ride_id)
+                if waiters is not None:
+                    waiters.discard(future)
+                    if not waiters:
+                        del self._waiters[ride_id]
+
+    def _wake(self, ride_ids: list[str]):
+        with self._lock:
+            futures = [f for ride_id in ride_ids for f in self._waiters.get(ride_id, ())]
+        if futures and self._loop is not None and not self._loop.is_closed():
+            self._loop.call_soon_threadsafe(self._resolve, futures)
+
+    @staticmethod
+    def _resolve(futures: list[asyncio.Future]):
+        for future in futures:
+            if not future.done():
+                future.set_result(True)
+
+
+ride_versions = RideVersionTracker()
@@ -0,0 +1,61 @@
+"""
+Short-lived cache for admin dashboard aggregates
+A wall of dashboards refreshing every few seconds shares one aggregate query
+per TTL window instead of each running its own COUNTs
+"""
+import os
+import threading
+import time
+from typing import Callable
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from models.db_models import Ride, Puller
+
+STATS_TTL_SECONDS = float(os.getenv("ADMIN_STATS_TTL_SECONDS", "2"))
+
+
+class TTLCache:
+    def __init__(self, ttl_seconds: float):
+        self.ttl = ttl_seconds
+        self._values: dict[str, tuple[float, object]] = {}
+        self._locks: dict[str, threading.Lock] = {}
+        self._guard = threading.Lock()
+
+    def get_or_compute(self, key: str, compute: Callable[[], object]):
+        """Cached value for key, recomputed by one caller at a time once stale"""
+        entry = self._values.get(key)
+        if entry and time.monotonic() - entry[0] < self.ttl:
+            return entry[1]
+        with self._guard:
+            lock = self._locks.setdefault(key, threading.Lock())
+        with lock:
+            # Another caller may have refreshed it while we waited
+            entry = self._values.get(key)
+            if entry and time.monotonic() - entry[0] < self.ttl:
+                return entry[1]
+            value = compute()
+            self._values[key] = (time.monotonic(), value)
+            return value
+
+    def invalidate(self, key: str = None):
+        if key is None:
+            self._values.clear()
+        else:
+            self._values.pop(key, None)
+
+
+stats_cache = TTLCache(STATS_TTL_SECONDS)
+
+
+def ride_status_counts(db: Session) -> dict:
+    """{RideStatus: count} for every ride, one GROUP BY query per TTL window"""
+    return stats_cache.get_or_compute("ride_status_counts", lambda: dict(
+        db.query(Ride.status, func.count()).group_by(Ride.status).all()
+    ))
+
+
+def puller_status_counts(db: Session) -> dict:
+    """{PullerStatus: count}, one GROUP BY query per TTL window"""
+    return stats_cache.get_or_compute("puller_status_counts", lambda: dict(
+        db.query(Puller.status, func.count()).group_by(Puller.status).all()
+    ))
@@ -0,0 +1,93 @@
+"""
+Dispatch Mode Test Script
+Checks that offers reach pullers over WebSocket - start the backend with
+DISPATCH_MODE=offer (or batch) before running it
+"""
+import json
+import requests
+from websockets.sync.client import connect
+
+BASE_URL = "http://localhost:8000"
+WS_URL = "ws://localhost:8000"
+
+def print_test(name, passed, details=""):
+    status = "✅" if passed else "❌"
+    print(f"{status} {name}")
+    if details:
+        print(f"   {details}")
+
+def receive_event(socket, event_type, timeout):
+    """Next event of event_type on the socket, or None once timeout seconds pass without one"""
+    try:
+        while True:
+            event = json.loads(socket.recv(timeout=timeout))
+            if event["type"] == event_type:
+                return event
+    except TimeoutError:
+        return None
+
+def test_offer_reaches_puller():
+    """Test 1: The nearest puller gets the ride_offer, then offer_withdrawn once it lapses"""
+    print("\n📨 Test 1: Offer Reaches the Nearest Puller")
+    from database import SessionLocal
+    from models.db_models import Location, Puller, PullerStatus
+    from services.ride_offers import OFFER_WINDOW_SECONDS
+    db = SessionLocal()
+    puller = db.query(Puller).filter(Puller.status == PullerStatus.AVAILABLE).first()
+    pickup = db.query(Location).filter(Location.name == "CUET").first()
+    db.close()
+
+    if not puller or not pickup:
+        print_test("Offer reaches puller", False, "Need an available puller and locations. Run seed_data.py first.")
+        return False
+
+    # Standing on the pickup makes this puller the nearest one
+    requests.put(f"{BASE_URL}/api/pullers/{puller.puller_id}/location", params={"lat": pickup.lat, "lng": pickup.lng})
+    with connect(f"{WS_URL}/api/pullers/{puller.puller_id}/ws") as socket:
+        user_id = requests.post(f"{BASE_URL}/api/rides/verify", json={
+            "laser_frequency": 470.0,
+            "ultrasonic_duration": 3.3,
+            "location_block": "CUET"
+        }).json().get("user_id")
+        ride_id = requests.post(f"{BASE_URL}/api/rides/request", json={
+            "user_id": user_id,
+            "pickup_location": "CUET",
+            "destination": "Pahartoli"
+        }).json().get("ride_id")
+
+        offer = receive_event(socket, "ride_offer", 5)
+        passed = offer is not None and offer["alert"]["ride_id"] == ride_id and offer["alert"]["offer_expires_in"] > 0
+        print_test("Offered puller receives ride_offer", passed,
+                  f"Puller: {puller.puller_id}, Event: {offer and offer['alert']}")
+        if not passed:
+            return False
+
+        # Letting the window run out takes the offer back
+        withdrawn = receive_event(socket, "offer_withdrawn", OFFER_WINDOW_SECONDS + 5)
+        passed = withdrawn is not None and withdrawn["ride_id"] == ride_id
+        print_test("Lapsed offer is withdrawn", passed, f"Event: {withdrawn}")
+        return passed
+
+def run_all_tests():
+    """Run all dispatch tests"""
+    print("=" * 60)
+    print("🧪 AERAS Dispatch Test Suite")
+    print("=" * 60)
+
+    try:
+        test_offer_reaches_puller()
+
+        print("\n" + "=" * 60)
+        print("✅ Dispatch Test Suite Complete!")
+        print("=" * 60)
+
+    except Exception as e:
+        print(f"\n❌ Test failed with error: {e}")
+        import traceback
+        traceback.print_exc()
+
+if __name__ == "__main__":
+    print("\n⚠️  Make sure the backend is running on http://localhost:8000 with DISPATCH_MODE=offer")
+    print("⚠️  Make sure you've run 'python seed_data.py' to populate locations")
+    input("Press Enter to start tests...")
+    run_all_tests()
@@ -2,6 +2,7 @@
 MVP Backend Test Script
 Tests all 16 endpoints to verify functionality
 """
+import os
 import requests
 import time
 import json
@@ -227,6 +228,67 @@ def test_race_condition():
               f"One accepted (200), one rejected (400)")
     return passed
 
+def test_alert_window_refill():
+    """Test 13: Delta alerts refill the top-k window after rides are taken"""
+    print("\n🔁 Test 13: Delta Alert Window Refill")
+    # Must match the server's setting
+    alert_top_k = int(os.getenv("ALERT_TOP_K", "20"))
+    from database import SessionLocal
+    from models.db_models import Puller, PullerStatus
+    db = SessionLocal()
+    pullers = db.query(Puller).filter(Puller.status == PullerStatus.AVAILABLE).limit(2).all()
+    db.close()
+    
+    if len(pullers) < 2:
+        print_test("Alert window refill", False, "Need at least 2 available pullers")
+        return False
+    watcher, taker = pullers[0].puller_id, pullers[1].puller_id
+    
+    # Park the watcher at CUET and file more rides there than one window holds
+    requests.put(f"{BASE_URL}/api/pullers/{watcher}/location", params={"lat": 22.4599, "lng": 91.9712})
+    user_id = requests.post(f"{BASE_URL}/api/rides/verify", json={
+        "laser_frequency": 450.0,
+        "ultrasonic_duration": 3.2,
+        "location_block": "CUET"
+    }).json().get("user_id")
+    for _ in range(alert_top_k + 5):
+        requests.post(f"{BASE_URL}/api/rides/request", json={
+            "user_id": user_id,
+            "pickup_location": "CUET",
+            "destination": "Raojan"
+        })
+    
+    full = requests.get(f"{BASE_URL}/api/pullers/{watcher}/alerts").json()
+    shown = {alert["ride_id"] for alert in full["alerts"]}
+    
+    # Another puller takes every ride the watcher can see, finishing each
+    # one (dropped off at Raojan) so they are available for the next
+    taken = 0
+    for ride_id in shown:
+        accepted = requests.post(f"{BASE_URL}/api/pullers/{ride_id}/accept", params={"puller_id": taker})
+        taken += accepted.status_code == 200
+        requests.post(f"{BASE_URL}/api/rides/{ride_id}/user-accept")
+        requests.post(f"{BASE_URL}/api/pullers/{ride_id}/complete", json={
+            "puller_id": taker,
+            "dropoff_lat": 22.4500,
+            "dropoff_lng": 92.0600
+        })
+    
+    # Apply the delta the way a client would, then compare with a full poll
+    delta = requests.get(f"{BASE_URL}/api/pullers/{watcher}/alerts", params={"since": full["cursor"]}).json()
+    if delta.get("reset"):
+        shown = set()
+    shown = (shown - set(delta["removed"])) | {alert["ride_id"] for alert in delta["added"]}
+    expected = {
+        alert["ride_id"] for alert in requests.get(f"{BASE_URL}/api/pullers/{watcher}/alerts").json()["alerts"]
+    }
+    
+    passed = (len(full["alerts"]) == alert_top_k and taken == alert_top_k
+              and bool(expected) and shown == expected)
+    print_test("Delta refills the alert window", passed,
+              f"Took {taken} rides, client shows {len(shown)} rides, full poll shows {len(expected)}")
+    return passed
+
 def run_all_tests():
     """Run all MVP tests"""
     print("=" * 60)
@@ -265,6 +327,7 @@ def run_all_tests():
         print("=" * 60)
         
         test_race_condition()
+        test_alert_window_refill()
         
         # Timeout test (takes 65 seconds)
         print("\n⚠️  Timeout test will take 65 seconds...")
@@ -0,0 +1,29 @@
+"""
+Unit tests for the backend services, run in-process against a throwaway
+SQLite database: python -m pytest tests (from backend/). The live-server
+scripts (test_mvp.py and friends) still need a running server
+"""
+import os
+import sys
+import tempfile
+
+# Before any backend import - database.py builds its engines at import time
+os.environ["DATABASE_URL"] = f"sqlite:///{tempfile.mkdtemp()}/test.db"
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+
+@pytest.fixture
+def db():
+    """Session on freshly created tables, dropped again afterwards"""
+    from database import Base, SessionLocal, engine
+    import models.db_models  # noqa: F401 - registers the tables
+
+    Base.metadata.create_all(bind=engine)
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+        Base.metadata.drop_all(bind=engine)
@@ -0,0 +1,98 @@
+from services import alerts_feed as feed_module
+from services.alerts_feed import AlertsFeed
+
+CUET = (22.4599, 91.9712)
+
+
+def alert(ride_id):
+    return {"ride_id": ride_id, "pickup": "CUET", "destination": "Pahartoli"}
+
+
+def test_unchanged_feed_returns_no_changes():
+    feed = AlertsFeed()
+    feed.upsert(alert("ride_a"), *CUET)
+    cursor = feed.cursor
+
+    assert feed.changes_since(cursor) == (cursor, [], [], [])
+
+
+def test_added_changed_and_removed():
+    feed = AlertsFeed()
+    feed.upsert(alert("ride_a"), *CUET)
+    feed.upsert(alert("ride_b"), *CUET)
+    cursor = feed.cursor
+
+    feed.upsert(alert("ride_c"), *CUET)
+    feed.touch("ride_a")
+    feed.remove("ride_b")
+
+    next_cursor, added, changed, removed = feed.changes_since(cursor)
+    assert next_cursor == feed.cursor > cursor
+    assert [a["ride_id"] for a in added] == ["ride_c"]
+    assert [a["ride_id"] for a in changed] == ["ride_a"]
+    assert removed == ["ride_b"]
+
+
+def test_removing_an_unknown_ride_is_not_a_change():
+    feed = AlertsFeed()
+    cursor = feed.cursor
+
+    feed.remove("ride_missing")
+
+    assert feed.cursor == cursor
+
+
+def test_readded_after_removal_is_added():
+    feed = AlertsFeed()
+    feed.upsert(alert("ride_a"), *CUET)
+    cursor = feed.cursor
+
+    feed.remove("ride_a")
+    _, added, changed, removed = feed.changes_since(cursor)
+    assert (added, changed, removed) == ([], [], ["ride_a"])
+
+    feed.upsert(alert("ride_a"), *CUET)
+    _, added, changed, removed = feed.changes_since(cursor)
+    assert [a["ride_id"] for a in added] == ["ride_a"]
+    assert (changed, removed) == ([], [])
+
+
+def test_cursor_older_than_the_log_resyncs(monkeypatch):
+    monkeypatch.setattr(feed_module, "MAX_FEED_LOG", 3)
+    feed = AlertsFeed()
+    cursor = feed.cursor
+    for i in range(5):
+        feed.upsert(alert(f"ride_{i}"), *CUET)
+
+    assert feed.changes_since(cursor) is None
+    assert feed.changes_since(feed.cursor - 3) is not None
+
+
+def test_cursor_from_the_future_resyncs():
+    feed = AlertsFeed()
+
+    assert feed.changes_since(feed.cursor + 1) is None
+
+
+def test_replace_all_resyncs_earlier_cursors():
+    feed = AlertsFeed()
+    cursor = feed.cursor
+
+    feed.replace_all([(alert("ride_a"), *CUET)])
+
+    assert feed.changes_since(cursor) is None
+    assert feed.snapshot() == (feed.cursor, [alert("ride_a")])
+
+
+def test_nearest_since_agrees_with_the_log():
+    feed = AlertsFeed()
+    feed.upsert(alert("ride_near"), *CUET)
+    cursor = feed.cursor
+    feed.upsert(alert("ride_far"), CUET[0] + 0.05, CUET[1])
+    feed.touch("ride_near")
+
+    next_cursor, nearby, touched = feed.nearest_since(cursor, *CUET, 1, 10_000)
+    assert next_cursor == feed.cursor
+    assert [a["ride_id"] for a, _ in nearby] == ["ride_near"]
+    assert touched == {"ride_near", "ride_far"}
+    assert feed.nearest_since(feed.cursor + 1, *CUET, 1, 10_000) is None
@@ -0,0 +1,60 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from models.db_models import Ride, RideStatus
+from services import analytics_rollups as rollups_module
+from services.analytics_rollups import AnalyticsRollups, summarize
+
+
+def add_ride(db, ride_id, requested_at, status):
+    db.add(Ride(ride_id=ride_id, pickup="CUET", destination="Pahartoli", status=status,
+                requested_at=requested_at, points_awarded=0))
+
+
+def test_changes_on_older_days_are_rebuilt_by_the_next_compaction(db):
+    rollups = AnalyticsRollups()
+    old = datetime.utcnow() - timedelta(days=5)
+    add_ride(db, "ride_a", old, RideStatus.PENDING)
+    add_ride(db, "ride_b", old, RideStatus.COMPLETED)
+    db.commit()
+    assert rollups.load(db) == 5  # empty rollups backfill every past day
+    rollups.compact(db)
+    assert summarize(db)["rides_by_status"]["pending"] == 1
+
+    # Caught late by the safety sweep: its day is no longer rebuilt by default
+    db.query(Ride).filter(Ride.ride_id == "ride_a").update({"status": RideStatus.TIMEOUT})
+    db.commit()
+    rollups.compact(db)
+    assert summarize(db)["rides_by_status"]["pending"] == 1
+
+    rollups.ride_changed(old)
+    assert rollups.compact(db) == 3  # the dirty day, yesterday and today
+    summary = summarize(db)
+    assert summary["rides_by_status"]["pending"] == 0
+    assert summary["rides_by_status"]["timeout"] == 1
+    assert summary["completed_rides"] == 1
+
+
+def test_recent_changes_are_not_queued():
+    rollups = AnalyticsRollups()
+
+    rollups.ride_changed(datetime.utcnow())
+    rollups.ride_changed(datetime.utcnow() - timedelta(days=1))
+    rollups.ride_changed(None)
+
+    assert rollups._dirty == set()
+
+
+def test_failed_compaction_keeps_its_days(db, monkeypatch):
+    def broken_rebuild(db, day):
+        raise RuntimeError("disk full")
+
+    rollups = AnalyticsRollups()
+    old = (datetime.utcnow() - timedelta(days=5)).date()
+    rollups.mark_dirty(old)
+    monkeypatch.setattr(rollups_module, "rebuild_day", broken_rebuild)
+
+    with pytest.raises(RuntimeError):
+        rollups.compact(db)
+    assert old in rollups._dirty
@@ -0,0 +1,159 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+
+from models.db_models import PullerStatus
+from services import offer_dispatch
+from services.alerts_feed import AlertsFeed
+from services.offer_dispatch import OfferEngine
+from services.puller_index import PullerIndex
+from services.ride_offers import RideOffers
+from services.ride_rejections import RideRejections
+
+CUET = (22.4599, 91.9712)
+
+
+def test_decline_by_the_holder_ends_the_offer():
+    offers = RideOffers()
+    offers.withhold("ride_a")
+    offers.offer("ride_a", "puller_1")
+
+    assert offers.holder("ride_a") == "puller_1"
+    assert offers.decline("ride_a", "puller_1")
+    assert offers.holder("ride_a") is None
+    assert "puller_1" in offers.passed("ride_a")
+    # The holder rejected it themselves, so there is nothing to withdraw
+    assert offers.take_withdrawn() == []
+
+
+def test_decline_by_someone_else_keeps_the_offer():
+    offers = RideOffers()
+    offers.withhold("ride_a")
+    offers.offer("ride_a", "puller_1")
+
+    assert not offers.decline("ride_a", "puller_2")
+    assert offers.holder("ride_a") == "puller_1"
+    assert "puller_2" in offers.passed("ride_a")
+
+
+def test_lapsed_offer_is_passed_and_withdrawn():
+    offers = RideOffers()
+    offers.withhold("ride_a")
+    offers.offer("ride_a", "puller_1", window=0)
+
+    assert offers.holder("ride_a") is None
+    assert "puller_1" in offers.passed("ride_a")
+    assert offers.take_withdrawn() == [("ride_a", "puller_1")]
+    assert offers.take_withdrawn() == []
+
+
+def test_moving_the_offer_on_withdraws_it_from_the_previous_holder():
+    offers = RideOffers()
+    offers.withhold("ride_a")
+    offers.offer("ride_a", "puller_1")
+    offers.offer("ride_a", "puller_2")
+
+    assert offers.holder("ride_a") == "puller_2"
+    assert not offers.holds_offer("puller_1")
+    assert offers.take_withdrawn() == [("ride_a", "puller_1")]
+
+
+def test_withheld_ride_is_hidden_from_everyone_but_the_holder():
+    offers = RideOffers()
+    offers.withhold("ride_a")
+    offers.offer("ride_a", "puller_1")
+
+    assert "ride_a" not in offers.hidden_from("puller_1")
+    assert "ride_a" in offers.hidden_from("puller_2")
+
+    offers.open("ride_a")
+    assert "ride_a" not in offers.hidden_from("puller_2")
+
+
+def test_accepting_drops_the_other_offer_the_puller_held():
+    offers = RideOffers()
+    for ride_id in ("ride_a", "ride_b"):
+        offers.withhold(ride_id)
+    offers.offer("ride_b", "puller_1")
+
+    assert offers.accepted("ride_a", "puller_1") == "ride_b"
+    assert offers.holder("ride_b") is None
+    assert offers.take_withdrawn() == [("ride_b", "puller_1")]
+
+
+@pytest.fixture
+def engine(monkeypatch):
+    """OfferEngine on a private event loop, with fresh state and recorded side effects"""
+    feed, index, offers = AlertsFeed(), PullerIndex(), RideOffers()
+    calls = {"offered": [], "opened": [], "recorded": [], "withdrawn": 0}
+    monkeypatch.setattr(offer_dispatch, "alerts_feed", feed)
+    monkeypatch.setattr(offer_dispatch, "puller_index", index)
+    monkeypatch.setattr(offer_dispatch, "ride_offers", offers)
+    monkeypatch.setattr(offer_dispatch, "ride_rejections", RideRejections())
+    monkeypatch.setattr(offer_dispatch, "_record_offer",
+                        lambda ride_id, puller_id, expires_at: calls["recorded"].append((ride_id, puller_id)))
+    monkeypatch.setattr(offer_dispatch, "offer_alert",
+                        lambda alert, puller_id, distance, window: calls["offered"].append(puller_id))
+    monkeypatch.setattr(offer_dispatch, "open_alert",
+                        lambda alert, lat, lng: calls["opened"].append(alert["ride_id"]))
+    monkeypatch.setattr(offer_dispatch, "withdraw_offers",
+                        lambda: calls.__setitem__("withdrawn", calls["withdrawn"] + 1))
+
+    loop = asyncio.new_event_loop()
+    offer_engine = OfferEngine()
+    offer_engine.bind_loop(loop)
+    alert = {"ride_id": "ride_a", "expires_at": datetime.utcnow() + timedelta(seconds=60)}
+    feed.upsert(alert, *CUET)
+    offers.withhold("ride_a")
+    for i, offset in enumerate((0.001, 0.002, 0.003)):
+        index.set(f"puller_{i}", CUET[0] + offset, CUET[1], PullerStatus.AVAILABLE)
+
+    def settle():
+        # Let the offer writer and the announcement run
+        loop.run_until_complete(asyncio.sleep(0.05))
+
+    yield offer_engine, offers, calls, settle
+    offer_engine._writer.shutdown()
+    loop.close()
+
+
+def test_engine_offers_nearest_first_and_advances_on_decline_and_lapse(engine):
+    offer_engine, offers, calls, settle = engine
+    candidates = [("puller_0", 100.0), ("puller_1", 200.0), ("puller_2", 300.0)]
+
+    offer_engine._start("ride_a", candidates)
+    settle()
+    # Recorded for accept_ride's guard before the puller is told
+    assert calls["recorded"] == [("ride_a", "puller_0")]
+    assert calls["offered"] == ["puller_0"]
+
+    # Rejected: what reject_ride does, then the engine moves on
+    assert offers.decline("ride_a", "puller_0")
+    offer_engine._declined("ride_a", "puller_0")
+    settle()
+    assert calls["offered"] == ["puller_0", "puller_1"]
+    assert offers.holder("ride_a") == "puller_1"
+
+    # Silence: the window timer fires
+    offer_engine._lapsed("ride_a", "puller_1")
+    settle()
+    assert calls["withdrawn"] == 1
+    assert offers.take_withdrawn() == [("ride_a", "puller_1")]
+    assert calls["offered"] == ["puller_0", "puller_1", "puller_2"]
+
+    # Candidates used up: the ride is opened to everyone
+    offer_engine._lapsed("ride_a", "puller_2")
+    settle()
+    assert calls["opened"] == ["ride_a"]
+    assert offers.holder("ride_a") is None
+
+
+def test_engine_skips_pullers_who_already_passed(engine):
+    offer_engine, offers, calls, settle = engine
+    offers.decline("ride_a", "puller_0")
+
+    offer_engine._start("ride_a", [("puller_0", 100.0), ("puller_1", 200.0)])
+    settle()
+
+    assert calls["offered"] == ["puller_1"]
@@ -0,0 +1,56 @@
+from datetime import datetime, timedelta
+
+from models.db_models import Ride, RideStatus
+from services.ride_offers import RideOffers
+from services.ride_rejections import RideRejections
+
+
+def add_ride(db, ride_id, requested_at=None, status=RideStatus.PENDING):
+    db.add(Ride(ride_id=ride_id, pickup="CUET", destination="Pahartoli", status=status,
+                requested_at=requested_at or datetime.utcnow()))
+    db.commit()
+
+
+def test_rejected_ride_stays_hidden_once_opened_to_everyone(db):
+    add_ride(db, "ride_a")
+    rejections, offers = RideRejections(), RideOffers()
+    offers.withhold("ride_a")
+    offers.offer("ride_a", "puller_1")
+
+    # The holder rejects the offer, then the engine gives up and opens the ride
+    rejections.reject(db, "puller_1", "ride_a", datetime.utcnow())
+    offers.decline("ride_a", "puller_1")
+    offers.open("ride_a")
+
+    assert "ride_a" in offers.hidden_from("puller_1", rejections.rejected_by("puller_1"))
+    assert "ride_a" not in offers.hidden_from("puller_2", rejections.rejected_by("puller_2"))
+    assert rejections.rejecters("ride_a") == {"puller_1"}
+
+
+def test_rejection_survives_a_restart_while_the_ride_is_pending(db):
+    add_ride(db, "ride_a")
+    add_ride(db, "ride_b")
+    rejections = RideRejections()
+    rejections.reject(db, "puller_1", "ride_a", datetime.utcnow())
+    rejections.reject(db, "puller_1", "ride_b", datetime.utcnow())
+    # Rejecting twice is harmless
+    rejections.reject(db, "puller_1", "ride_a", datetime.utcnow())
+
+    # ride_b was taken meanwhile, so there is nothing left to hide
+    db.query(Ride).filter(Ride.ride_id == "ride_b").update({"status": RideStatus.PULLER_ASSIGNED})
+    db.commit()
+    reloaded = RideRejections()
+
+    assert reloaded.load(db) == 1
+    assert "ride_a" in reloaded.rejected_by("puller_1")
+    assert "ride_b" not in reloaded.rejected_by("puller_1")
+
+
+def test_rejection_is_forgotten_after_the_ride_deadline(db):
+    add_ride(db, "ride_a")
+    rejections = RideRejections(timeout_seconds=60)
+
+    rejections.reject(db, "puller_1", "ride_a", datetime.utcnow() - timedelta(seconds=61))
+
+    assert "ride_a" not in rejections.rejected_by("puller_1")
+    assert "puller_1" not in rejections.rejecters("ride_a")
@@ -0,0 +1,73 @@
+from datetime import datetime, timedelta
+
+from models.db_models import Ride, RideStatus
+from services import ride_timeouts as timeouts_module
+from services.analytics_rollups import analytics_rollups
+from services.ride_timeouts import EXPIRE_RETRY_SECONDS, RideTimeoutScheduler, expire_rides
+
+
+def test_due_rides_pop_once_and_cancelled_ones_never():
+    scheduler = RideTimeoutScheduler(timeout_seconds=60)
+    requested_at = datetime.utcnow() - timedelta(seconds=61)
+    scheduler.schedule("ride_a", requested_at)
+    scheduler.schedule("ride_b", requested_at)
+    scheduler.cancel("ride_b")
+
+    assert scheduler._pop_due(datetime.utcnow()) == ["ride_a"]
+    assert scheduler._pop_due(datetime.utcnow()) == []
+
+
+def test_failed_expiry_is_rearmed_with_backoff(monkeypatch):
+    calls = []
+
+    def flaky_expire(db, *criteria):
+        calls.append(criteria)
+        if len(calls) == 1:
+            raise RuntimeError("database is locked")
+        return []
+
+    monkeypatch.setattr(timeouts_module, "expire_rides", flaky_expire)
+    scheduler = RideTimeoutScheduler(timeout_seconds=60)
+    scheduler.schedule("ride_a", datetime.utcnow() - timedelta(seconds=61))
+
+    scheduler._expire(scheduler._pop_due(datetime.utcnow()))
+    assert len(calls) == 1
+    assert scheduler.pending_count() == 1
+    # Not retried before the backoff, due again after it
+    assert scheduler._pop_due(datetime.utcnow()) == []
+    retry_at = datetime.utcnow() + timedelta(seconds=EXPIRE_RETRY_SECONDS + 1)
+    due = scheduler._pop_due(retry_at)
+    assert due == ["ride_a"]
+
+    scheduler._expire(due)
+    assert len(calls) == 2
+    assert scheduler.pending_count() == 0
+
+
+def test_rearm_keeps_a_deadline_set_meanwhile():
+    scheduler = RideTimeoutScheduler(timeout_seconds=60)
+    requested_at = datetime.utcnow()
+    # Rescheduled (e.g. user-reject) while its failed expiry was in flight
+    scheduler.schedule("ride_a", requested_at)
+
+    scheduler._retry(["ride_a"], datetime.utcnow() + timedelta(seconds=EXPIRE_RETRY_SECONDS))
+
+    assert scheduler._deadlines["ride_a"] == requested_at + timedelta(seconds=60)
+
+
+def test_expire_rides_only_touches_pending_rides(db, monkeypatch):
+    monkeypatch.setattr(analytics_rollups, "_dirty", set())
+    old = datetime.utcnow() - timedelta(days=3)
+    db.add_all([
+        Ride(ride_id="ride_pending", status=RideStatus.PENDING, requested_at=old),
+        Ride(ride_id="ride_taken", status=RideStatus.PULLER_ASSIGNED, requested_at=old),
+    ])
+    db.commit()
+
+    expired = expire_rides(db, Ride.ride_id.in_(["ride_pending", "ride_taken"]))
+
+    assert expired == ["ride_pending"]
+    statuses = dict(db.query(Ride.ride_id, Ride.status))
+    assert statuses == {"ride_pending": RideStatus.TIMEOUT, "ride_taken": RideStatus.PULLER_ASSIGNED}
+    # A ride from a settled day queues that day for the rollups
+    assert analytics_rollups._dirty == {old.date()}
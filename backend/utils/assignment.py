@@ -0,0 +1,98 @@
+"""
+Minimum-cost bipartite assignment (rectangular linear assignment problem)
+Shortest augmenting path Hungarian method (Jonker-Volgenant style): each
+row is added with one Dijkstra search over reduced costs, and the search's
+inner loop is vectorized over columns with NumPy, so an n x m problem costs
+O(n^2 m) in the worst case but far less on geometric costs where most rows
+find a free column within a few steps
+"""
+import numpy as np
+
+
+def min_cost_assignment(cost) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Row and column indices of a minimum-cost matching of every row (or
+    every column, whichever side is smaller) - same contract as
+    scipy.optimize.linear_sum_assignment. Costs must be finite; model a
+    forbidden pair with a large cost and drop it from the result
+    """
+    cost = np.asarray(cost, dtype=np.float64)
+    if cost.ndim != 2:
+        raise ValueError("cost must be a 2-D matrix")
+    if not np.isfinite(cost).all():
+        raise ValueError("cost must be finite")
+    transposed = cost.shape[0] > cost.shape[1]
+    if transposed:
+        cost = cost.T
+    n, m = cost.shape
+    if n == 0:
+        empty = np.zeros(0, dtype=np.intp)
+        return empty, empty
+
+    row_ids = np.arange(n)
+    v = np.zeros(m)  # column potentials
+    col_of_row = np.full(n, -1, dtype=np.intp)
+    row_of_col = np.full(m, -1, dtype=np.intp)
+
+    # Greedy start: every row's cheapest column, taken by the first row that
+    # wants it. Row potentials at the row minima keep every reduced cost
+    # non-negative and those pairs tight, so only the rows that lost their
+    # column need a search
+    cheapest = cost.argmin(axis=1)
+    u = cost[row_ids, cheapest]  # row potentials
+    winners = np.unique(cheapest, return_index=True)[1]
+    col_of_row[winners] = cheapest[winners]
+    row_of_col[cheapest[winners]] = winners
+
+    through_row = np.empty(m)
+    better = np.empty(m, dtype=bool)
+    for start in np.flatnonzero(col_of_row < 0):
+        # frontier: tentative reduced path length to each unscanned column
+        # (inf once scanned); settled: its length when it was scanned
+        frontier = np.full(m, np.inf)
+        settled = np.zeros(m)
+        previous = np.full(m, -1, dtype=np.intp)  # row the shortest path reaches each column from
+        scanned = np.zeros(m, dtype=bool)
+        # Scanned columns get v = -inf, which makes every path through them
+        # inf, so they drop out of the relaxation without a mask
+        open_v = v.copy()
+        path_rows = [start]
+        row, reach, sink = start, 0.0, -1
+        while sink < 0:
+            np.subtract(cost[row], open_v, out=through_row)
+            through_row += reach - u[row]
+            np.less(through_row, frontier, out=better)
+            np.putmask(previous, better, row)
+            np.minimum(frontier, through_row, out=frontier)
+
+            column = int(frontier.argmin())
+            reach = frontier[column]
+            settled[column] = reach
+            frontier[column] = np.inf
+            open_v[column] = -np.inf
+            scanned[column] = True
+            if row_of_col[column] < 0:
+                sink = column
+            else:
+                row = row_of_col[column]
+                path_rows.append(row)
+
+        # Keep reduced costs non-negative for the next search
+        u[start] += reach
+        others = np.array(path_rows[1:], dtype=np.intp)
+        u[others] += reach - settled[col_of_row[others]]
+        v[scanned] -= reach - settled[scanned]
+
+        # Flip the augmenting path back to start
+        column = sink
+        while True:
+            row = previous[column]
+            row_of_col[column] = row
+            col_of_row[row], column = column, col_of_row[row]
+            if row == start:
+                break
+
+    if transposed:
+        order = np.argsort(col_of_row)
+        return col_of_row[order], row_ids[order]
+    return row_ids, col_of_row
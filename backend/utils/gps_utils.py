@@ -1,9 +1,12 @@
 import math
+import numpy as np
+
+EARTH_RADIUS_M = 6371000  # Earth's radius in meters
 
 def haversine_distance(lat1: float, lng1: float, lat2: float, lng2: float) -> float:
     """Calculate distance in meters between two coordinates using Haversine formula"""
     
-    R = 6371000  # Earth's radius in meters
+    R = EARTH_RADIUS_M
     
     phi1 = math.radians(lat1)
     phi2 = math.radians(lat2)
@@ -14,3 +17,32 @@ def haversine_distance(lat1: float, lng1: float, lat2: float, lng2: float) -> fl
     c = 2 * math.atan2(math.sqrt(a), math.sqrt(1 - a))
     
     return R * c
+
+def haversine_distances(lat: float, lng: float, lats, lngs) -> np.ndarray:
+    """
+    Distances in meters from one point to many (vectorized Haversine)
+    lats/lngs are equal-length sequences or arrays; returns a float array
+    """
+    lats = np.asarray(lats, dtype=np.float64)
+    lngs = np.asarray(lngs, dtype=np.float64)
+    
+    phi1 = math.radians(lat)
+    phi2 = np.radians(lats)
+    delta_phi = phi2 - phi1
+    delta_lambda = np.radians(lngs - lng)
+    
+    a = np.sin(delta_phi / 2) ** 2 + math.cos(phi1) * np.cos(phi2) * np.sin(delta_lambda / 2) ** 2
+    return 2 * EARTH_RADIUS_M * np.arctan2(np.sqrt(a), np.sqrt(1 - a))
+
+def haversine_matrix(lats1, lngs1, lats2, lngs2) -> np.ndarray:
+    """
+    Pairwise distances in meters between two point sets (vectorized Haversine)
+    Returns an array of shape (len(lats1), len(lats2))
+    """
+    phi1 = np.radians(np.asarray(lats1, dtype=np.float64))[:, None]
+    lam1 = np.radians(np.asarray(lngs1, dtype=np.float64))[:, None]
+    phi2 = np.radians(np.asarray(lats2, dtype=np.float64))[None, :]
+    lam2 = np.radians(np.asarray(lngs2, dtype=np.float64))[None, :]
+    
+    a = np.sin((phi2 - phi1) / 2) ** 2 + np.cos(phi1) * np.cos(phi2) * np.sin((lam2 - lam1) / 2) ** 2
+    return 2 * EARTH_RADIUS_M * np.arctan2(np.sqrt(a), np.sqrt(1 - a))
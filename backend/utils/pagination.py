@@ -0,0 +1,31 @@
+"""
+Opaque keyset pagination cursors
+A cursor carries the sort key of the last row on a page and the next page
+starts strictly after it, so every page costs the same index seek no matter
+how deep into the listing it is
+"""
+import base64
+import json
+from datetime import datetime
+
+
+def encode_cursor(*values) -> str:
+    """URL-safe cursor for a sort key (datetimes and JSON scalars)"""
+    payload = [value.isoformat() if isinstance(value, datetime) else value for value in values]
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, *types) -> tuple:
+    """Sort key of a cursor made by encode_cursor, converted to types - ValueError if malformed"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json.loads(raw)
+        if not isinstance(values, list) or len(values) != len(types):
+            raise ValueError("wrong number of cursor fields")
+        return tuple(
+            datetime.fromisoformat(value) if kind is datetime else kind(value)
+            for value, kind in zip(values, types)
+        )
+    except (ValueError, TypeError) as e:
+        raise ValueError(f"Invalid cursor: {e}") from e
@@ -0,0 +1,173 @@
+import heapq
+import math
+import threading
+from collections.abc import Container
+from typing import Hashable, Iterable, Optional
+from utils.gps_utils import haversine_distances
+
+# Meters per degree of latitude (and of longitude at the equator)
+METERS_PER_DEGREE = 111195.0
+
+
+class GridIndex:
+    """
+    Uniform lat/lng grid over point positions (e.g. pullers)
+    Each point lives in exactly one cell; nearest-neighbour queries walk
+    rings of cells outward from the query point and stop as soon as no
+    unvisited ring can hold a closer point, so cost depends on local density
+    instead of the total number of points
+    """
+
+    def __init__(self, cell_size_deg: float = 0.01):
+        self.cell_size = cell_size_deg
+        self._cells: dict[tuple[int, int], dict[Hashable, tuple[float, float]]] = {}
+        self._points: dict[Hashable, tuple[int, int]] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._points)
+
+    def __contains__(self, key):
+        return key in self._points
+
+    def _cell_of(self, lat: float, lng: float) -> tuple[int, int]:
+        return (math.floor(lat / self.cell_size), math.floor(lng / self.cell_size))
+
+    def upsert(self, key: Hashable, lat: float, lng: float):
+        """Insert a point or move it to a new position"""
+        cell = self._cell_of(lat, lng)
+        with self._lock:
+            old_cell = self._points.get(key)
+            if old_cell is not None and old_cell != cell:
+                self._discard(key, old_cell)
+            self._cells.setdefault(cell, {})[key] = (lat, lng)
+            self._points[key] = cell
+
+    def remove(self, key: Hashable):
+        with self._lock:
+            cell = self._points.pop(key, None)
+            if cell is not None:
+                self._discard(key, cell)
+
+    def _discard(self, key, cell):
+        bucket = self._cells.get(cell)
+        if bucket is not None:
+            bucket.pop(key, None)
+            if not bucket:
+                del self._cells[cell]
+
+    def position(self, key: Hashable) -> Optional[tuple[float, float]]:
+        cell = self._points.get(key)
+        if cell is None:
+            return None
+        return self._cells[cell].get(key)
+
+    def replace_all(self, points: Iterable[tuple[Hashable, float, float]]):
+        """Rebuild the index from scratch (used on startup / reload)"""
+        cells: dict[tuple[int, int], dict] = {}
+        index: dict[Hashable, tuple[int, int]] = {}
+        for key, lat, lng in points:
+            cell = self._cell_of(lat, lng)
+            cells.setdefault(cell, {})[key] = (lat, lng)
+            index[key] = cell
+        with self._lock:
+            self._cells = cells
+            self._points = index
+
+    def _ring(self, center: tuple[int, int], radius: int) -> list[tuple[int, int]]:
+        """Cells at Chebyshev distance `radius` from the center cell"""
+        ci, cj = center
+        if radius == 0:
+            return [center]
+        cells = []
+        for dj in range(-radius, radius + 1):
+            cells.append((ci - radius, cj + dj))
+            cells.append((ci + radius, cj + dj))
+        for di in range(-radius + 1, radius):
+            cells.append((ci + di, cj - radius))
+            cells.append((ci + di, cj + radius))
+        return cells
+
+    def _ring_min_distance(self, lat: float, radius: int) -> float:
+        """Lower bound (meters) on the distance to any point in ring `radius` or beyond"""
+        if radius <= 0:
+            return 0.0
+        # Longitude degrees shrink away from the equator - use the widest
+        # latitude the ring can reach, and a 1% margin because great-circle
+        # paths are slightly shorter than the parallel between two points
+        worst_lat = min(89.9, abs(lat) + (radius + 1) * self.cell_size)
+        degrees = (radius - 1) * self.cell_size
+        return 0.99 * degrees * METERS_PER_DEGREE * math.cos(math.radians(worst_lat))
+
+    def _candidates(self, lat: float, lng: float, max_distance: Optional[float], enough):
+        """
+        Yield (ring, [(key, lat, lng), ...]) walking rings outward until
+        `enough(ring)` says no further ring can matter
+        """
+        center = self._cell_of(lat, lng)
+        with self._lock:
+            cells = self._cells
+            occupied = len(cells)
+            radius = 0
+            while occupied:
+                if max_distance is not None and self._ring_min_distance(lat, radius) > max_distance:
+                    return
+                # Once a ring is wider than the whole occupied set, a direct
+                # pass over the remaining cells is cheaper than walking rings
+                if (2 * radius + 1) ** 2 > 4 * occupied + 16:
+                    remaining = [
+                        (key, plat, plng)
+                        for cell, bucket in cells.items()
+                        if max(abs(cell[0] - center[0]), abs(cell[1] - center[1])) >= radius
+                        for key, (plat, plng) in bucket.items()
+                    ]
+                    yield radius, remaining
+                    return
+                batch = [
+                    (key, plat, plng)
+                    for cell in self._ring(center, radius)
+                    for key, (plat, plng) in cells.get(cell, {}).items()
+                ]
+                yield radius, batch
+                if enough(radius + 1):
+                    return
+                radius += 1
+
+    @staticmethod
+    def _measure(lat: float, lng: float, batch: list) -> list[tuple[Hashable, float]]:
+        """Distances from the query point to a batch of (key, lat, lng) in one vectorized pass"""
+        if not batch:
+            return []
+        keys, lats, lngs = zip(*batch)
+        return list(zip(keys, haversine_distances(lat, lng, lats, lngs).tolist()))
+
+    def nearest(self, lat: float, lng: float, k: int, max_distance: Optional[float] = None,
+                exclude: Optional[Container] = None) -> list[tuple[Hashable, float]]:
+        """k nearest points as [(key, meters)] sorted by distance"""
+        if k <= 0:
+            return []
+        best: list[tuple[float, Hashable]] = []  # max-heap via negated distance
+
+        def enough(next_radius):
+            return len(best) >= k and -best[0][0] <= self._ring_min_distance(lat, next_radius)
+
+        for _, batch in self._candidates(lat, lng, max_distance, enough):
+            if exclude:
+                batch = [point for point in batch if point[0] not in exclude]
+            for key, distance in self._measure(lat, lng, batch):
+                if max_distance is not None and distance > max_distance:
+                    continue
+                if len(best) < k:
+                    heapq.heappush(best, (-distance, key))
+                elif distance < -best[0][0]:
+                    heapq.heapreplace(best, (-distance, key))
+        return [(key, -neg) for neg, key in sorted(best, reverse=True)]
+
+    def within(self, lat: float, lng: float, radius_m: float) -> list[tuple[Hashable, float]]:
+        """Every point within radius_m meters as [(key, meters)], unsorted"""
+        found = []
+        for _, batch in self._candidates(lat, lng, radius_m, lambda next_radius: False):
+            for key, distance in self._measure(lat, lng, batch):
+                if distance <= radius_m:
+                    found.append((key, distance))
+        return found
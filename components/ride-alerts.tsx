@@ -15,6 +15,8 @@ interface RideAlert {
   expires_in: number         // MVP: seconds until timeout
   requested_at: string
   local_expires_at?: number  // Client-side: timestamp when alert expires
+  offer_expires_in?: number  // Dispatch modes: seconds this puller holds the ride alone
+  local_offer_expires_at?: number  // Client-side: timestamp when the offer lapses
 }
 
 export function RideAlerts({ pullerId }: { pullerId: string }) {
@@ -24,7 +26,7 @@ export function RideAlerts({ pullerId }: { pullerId: string }) {
   const [error, setError] = useState<string | null>(null)
   const [currentTime, setCurrentTime] = useState(Date.now())
 
-  // Fetch alerts from backend every 5 seconds
+  // Fetch alerts from backend and subscribe to live ride events
   useEffect(() => {
     const fetchAlerts = async () => {
       try {
@@ -36,11 +38,15 @@ export function RideAlerts({ pullerId }: { pullerId: string }) {
           // MVP: Backend returns {alerts: [...]}
           // Add local expiration timestamp for client-side countdown
           const now = Date.now()
-          const alertsWithTimestamp = (data.alerts || []).map((alert: RideAlert) => ({
-            ...alert,
-            local_expires_at: now + (alert.expires_in * 1000)
-          }))
-          setAlerts(alertsWithTimestamp)
+          // Offers only arrive over the socket - keep their countdowns
+          setAlerts(prev => {
+            const offers = new Map(prev.map(a => [a.ride_id, a.local_offer_expires_at] as const))
+            return (data.alerts || []).map((alert: RideAlert) => ({
+              ...alert,
+              local_expires_at: now + (alert.expires_in * 1000),
+              local_offer_expires_at: offers.get(alert.ride_id)
+            }))
+          })
           setError(null)
         } else {
           setError('Failed to fetch alerts')
@@ -53,9 +59,64 @@ export function RideAlerts({ pullerId }: { pullerId: string }) {
       }
     }
 
+    // Ride events are pushed over WebSocket; polling is only a fallback
+    // while the socket is down
+    let socket: WebSocket | null = null
+    let interval: ReturnType<typeof setInterval> | null = null
+    let reconnectTimer: ReturnType<typeof setTimeout> | null = null
+    let closed = false
+
+    const startPolling = () => {
+      if (!interval) interval = setInterval(fetchAlerts, 5000) // Poll every 5 seconds
+    }
+    const stopPolling = () => {
+      if (interval) clearInterval(interval)
+      interval = null
+    }
+
+    const connect = () => {
+      socket = new WebSocket(`ws://localhost:8000/api/pullers/${pullerId}/ws`)
+      socket.onopen = () => {
+        stopPolling()
+        fetchAlerts() // Resync anything missed while disconnected
+      }
+      socket.onmessage = (message) => {
+        const event = JSON.parse(message.data)
+        if (event.type === 'ride_new' || event.type === 'ride_offer') {
+          // ride_offer: this puller alone may accept it for offer_expires_in seconds
+          const now = Date.now()
+          const alert: RideAlert = {
+            ...event.alert,
+            local_expires_at: now + (event.alert.expires_in * 1000),
+            local_offer_expires_at: event.type === 'ride_offer'
+              ? now + (event.alert.offer_expires_in * 1000)
+              : undefined
+          }
+          setAlerts(prev =>
+            [...prev.filter(a => a.ride_id !== alert.ride_id), alert]
+              .sort((a, b) => a.distance_to_pickup - b.distance_to_pickup)
+          )
+        } else if (
+          event.type === 'ride_taken' || event.type === 'ride_expired' || event.type === 'offer_withdrawn'
+        ) {
+          setAlerts(prev => prev.filter(a => a.ride_id !== event.ride_id))
+        }
+      }
+      socket.onclose = () => {
+        if (closed) return
+        startPolling()
+        reconnectTimer = setTimeout(connect, 5000)
+      }
+    }
+
     fetchAlerts()
-    const interval = setInterval(fetchAlerts, 5000) // Poll every 5 seconds
-    return () => clearInterval(interval)
+    connect()
+    return () => {
+      closed = true
+      stopPolling()
+      if (reconnectTimer) clearTimeout(reconnectTimer)
+      socket?.close()
+    }
   }, [pullerId])
 
   // Update countdown every second for smooth UI
@@ -63,9 +124,10 @@ export function RideAlerts({ pullerId }: { pullerId: string }) {
     const interval = setInterval(() => {
       setCurrentTime(Date.now())
       
-      // Remove expired alerts
+      // Remove expired alerts and lapsed offers
       setAlerts(prevAlerts => 
         prevAlerts.filter(alert => {
+          if (alert.local_offer_expires_at && alert.local_offer_expires_at <= Date.now()) return false
           if (!alert.local_expires_at) return true
           const remaining = Math.floor((alert.local_expires_at - Date.now()) / 1000)
           return remaining > 0
@@ -158,6 +220,9 @@ export function RideAlerts({ pullerId }: { pullerId: string }) {
           const remainingSeconds = alert.local_expires_at 
             ? Math.max(0, Math.floor((alert.local_expires_at - currentTime) / 1000))
             : alert.expires_in
+          const offerSeconds = alert.local_offer_expires_at
+            ? Math.max(0, Math.floor((alert.local_offer_expires_at - currentTime) / 1000))
+            : null
           
           return (
             <Card key={alert.ride_id} className="bg-slate-800 border-slate-700 hover:border-slate-600 transition-colors">
@@ -166,7 +231,11 @@ export function RideAlerts({ pullerId }: { pullerId: string }) {
                   <div className="flex-1">
                     <CardTitle className="text-lg flex items-center gap-2">
                       {alert.pickup} → {alert.destination}
-                      {remainingSeconds < 15 && (
+                      {offerSeconds !== null ? (
+                        <Badge className="text-xs bg-green-700">
+                          Offered to you — {offerSeconds}s to accept
+                        </Badge>
+                      ) : remainingSeconds < 15 && (
                         <Badge variant="destructive" className="text-xs animate-pulse">
                           Expiring soon!
                         </Badge>
@@ -198,7 +267,7 @@ export function RideAlerts({ pullerId }: { pullerId: string }) {
                   <Button
                     onClick={() => handleAcceptRide(alert.ride_id)}
                     className="flex-1 bg-green-600 hover:bg-green-700"
-                    disabled={remainingSeconds === 0}
+                    disabled={remainingSeconds === 0 || offerSeconds === 0}
                   >
                     Accept Ride
                   </Button>
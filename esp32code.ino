@@ -50,6 +50,15 @@ bool rideRequested = false;
 bool pullerAssigned = false;
 unsigned long lastPollTime = 0;
 const unsigned long POLL_INTERVAL = 2000; // Poll every 2 seconds
+const int STATUS_WAIT_SECONDS = 10; // Long-poll: backend holds unchanged polls up to this long
+String statusEtag = ""; // Last ETag from /status - unchanged polls come back as 304
+
+// Status polls run without blocking: the request is sent, then loop() keeps
+// reading sensors and buttons while the response trickles in
+WiFiClient statusClient;
+bool statusPollInFlight = false;
+unsigned long statusPollStartedAt = 0;
+String statusRaw = ""; // Status line, headers and body as received so far
 String laserFrequency = "650.5"; // Default laser frequency for this block
 
 #define SONAR_NUM 2
@@ -326,7 +335,18 @@ bool requestRide(String destination) {
   return false;
 }
 
-// Poll Ride Status
+// Split BACKEND_URL ("http://host:port") into host and port
+void backendHostPort(String& host, uint16_t& port) {
+  String address = String(BACKEND_URL);
+  int scheme = address.indexOf("://");
+  if (scheme >= 0) address = address.substring(scheme + 3);
+  int colon = address.indexOf(':');
+  host = colon >= 0 ? address.substring(0, colon) : address;
+  port = colon >= 0 ? address.substring(colon + 1).toInt() : 80;
+}
+
+// Poll Ride Status - sends the request and returns; serviceStatusPoll()
+// collects the response from loop()
 void pollRideStatus() {
   if (WiFi.status() != WL_CONNECTED) {
     Serial.println("ERROR: WiFi not connected for status poll");
@@ -338,100 +358,160 @@ void pollRideStatus() {
     return;
   }
   
-  HTTPClient http;
-  String url = String(BACKEND_URL) + "/api/rides/" + currentRideId + "/status";
-  Serial.println("Polling status: " + url);
+  String path = "/api/rides/" + currentRideId + "/status";
+  if (statusEtag != "") {
+    path += "?wait=" + String(STATUS_WAIT_SECONDS);
+  }
+  Serial.println("Polling status: " + path);
   
-  http.begin(url);
-  int httpCode = http.GET();
-  Serial.println("Poll Response Code: " + String(httpCode));
+  String host;
+  uint16_t port;
+  backendHostPort(host, port);
+  if (!statusClient.connect(host.c_str(), port, 2000)) {
+    Serial.println("ERROR: Connection failed for status poll");
+    return;
+  }
   
-  if (httpCode == 200) {
-    String response = http.getString();
-    Serial.println("Status response: " + response);
-    
-    StaticJsonDocument<512> doc;
-    DeserializationError error = deserializeJson(doc, response);
-    
-    if (error) {
-      Serial.print("ERROR: JSON parsing failed: ");
-      Serial.println(error.c_str());
-      http.end();
-      return;
-    }
-    
-    String status = doc["status"].as<String>();
-    Serial.println("Ride status: " + status);
-    
-    // Check LED states from backend (Test Case 4 Requirements)
-    bool ledYellow = doc["led_yellow"];
-    bool ledGreen = doc["led_green"];
-    bool ledRed = doc["led_red"];
-    
-    Serial.print("Backend LEDs - Yellow: ");
-    Serial.print(ledYellow);
-    Serial.print(", Green: ");
-    Serial.print(ledGreen);
-    Serial.print(", Red: ");
-    Serial.println(ledRed);
-    
-    // Update physical LEDs based on backend status
-    setLEDs(ledRed, ledYellow, ledGreen);
-    
-    if (ledYellow && !pullerAssigned) {
-      // Puller has accepted! (Test Case 4b & 6 & 9: < 3s latency)
-      Serial.println("✓ Puller accepted ride!");
-      pullerAssigned = true;
-      acknowledgeSound();
-    }
-    
-    // Show distance if puller is assigned and distance is available
-    if (ledYellow && doc.containsKey("distance_to_pickup") && !doc["distance_to_pickup"].isNull()) {
-      float distanceMeters = doc["distance_to_pickup"].as<float>();
-      Serial.print("Distance to pickup: ");
-      Serial.print(distanceMeters);
-      Serial.println(" meters");
-      
-      // Display distance on OLED
-      String distanceStr;
-      if (distanceMeters >= 1000) {
-        // Display in kilometers if >= 1km
-        float distanceKm = distanceMeters / 1000.0;
-        distanceStr = String(distanceKm, 1) + " KM";
-      } else {
-        // Display in meters
-        distanceStr = String((int)distanceMeters) + " M";
-      }
-      oledShow("Puller", distanceStr);
-    } else if (ledYellow) {
-      // Fallback if distance not available
-      oledShow("Puller", "Incoming...");
+  String request = "GET " + path + " HTTP/1.1\r\n";
+  request += "Host: " + host + "\r\n";
+  if (statusEtag != "") {
+    request += "If-None-Match: " + statusEtag + "\r\n";
+  }
+  request += "Connection: close\r\n\r\n";
+  statusClient.print(request);
+  
+  statusRaw = "";
+  statusPollStartedAt = millis();
+  statusPollInFlight = true;
+}
+
+// Read whatever part of the status response has arrived; handle it once
+// the backend closes the connection. Never waits
+void serviceStatusPoll() {
+  while (statusClient.available()) {
+    statusRaw += (char)statusClient.read();
+  }
+  
+  if (statusClient.connected()) {
+    if (millis() - statusPollStartedAt > (STATUS_WAIT_SECONDS + 5) * 1000UL) {
+      Serial.println("ERROR: Status poll timed out");
+      statusClient.stop();
+      statusPollInFlight = false;
     }
-    
-    if (ledGreen) {
-      // Pickup confirmed (Test Case 4d & 6: Yellow OFF, Green ON)
-      Serial.println("✓ Pickup confirmed!");
-      oledShow("Pickup", "Confirmed");
-      delay(2000);
-      resetRideState();
+    return;
+  }
+  
+  statusClient.stop();
+  statusPollInFlight = false;
+  
+  // "HTTP/1.1 200 OK" - the code follows the first space
+  int headerEnd = statusRaw.indexOf("\r\n\r\n");
+  int firstSpace = statusRaw.indexOf(' ');
+  if (headerEnd < 0 || firstSpace < 0) {
+    Serial.println("ERROR: Incomplete status response");
+    return;
+  }
+  int httpCode = statusRaw.substring(firstSpace + 1, firstSpace + 4).toInt();
+  String headers = statusRaw.substring(0, headerEnd);
+  String response = statusRaw.substring(headerEnd + 4);
+  statusRaw = "";
+  Serial.println("Poll Response Code: " + String(httpCode));
+  
+  if (httpCode == 304) {
+    // Status unchanged - keep current LEDs/display
+    Serial.println("Status unchanged");
+  } else if (httpCode == 200) {
+    String lowered = headers;
+    lowered.toLowerCase();
+    int etagAt = lowered.indexOf("\r\netag:");
+    if (etagAt >= 0) {
+      int valueEnd = headers.indexOf("\r\n", etagAt + 2);
+      statusEtag = headers.substring(etagAt + 7, valueEnd < 0 ? headers.length() : valueEnd);
+      statusEtag.trim();
     }
+    handleRideStatus(response);
+  } else {
+    Serial.println("ERROR: HTTP " + String(httpCode) + " - " + response);
+  }
+}
+
+// Apply a /status body to the LEDs and display
+void handleRideStatus(String response) {
+  Serial.println("Status response: " + response);
+  
+  StaticJsonDocument<512> doc;
+  DeserializationError error = deserializeJson(doc, response);
+  
+  if (error) {
+    Serial.print("ERROR: JSON parsing failed: ");
+    Serial.println(error.c_str());
+    return;
+  }
+  
+  String status = doc["status"].as<String>();
+  Serial.println("Ride status: " + status);
+  
+  // Check LED states from backend (Test Case 4 Requirements)
+  bool ledYellow = doc["led_yellow"];
+  bool ledGreen = doc["led_green"];
+  bool ledRed = doc["led_red"];
+  
+  Serial.print("Backend LEDs - Yellow: ");
+  Serial.print(ledYellow);
+  Serial.print(", Green: ");
+  Serial.print(ledGreen);
+  Serial.print(", Red: ");
+  Serial.println(ledRed);
+  
+  // Update physical LEDs based on backend status
+  setLEDs(ledRed, ledYellow, ledGreen);
+  
+  if (ledYellow && !pullerAssigned) {
+    // Puller has accepted! (Test Case 4b & 6 & 9: < 3s latency)
+    Serial.println("✓ Puller accepted ride!");
+    pullerAssigned = true;
+    acknowledgeSound();
+  }
+  
+  // Show distance if puller is assigned and distance is available
+  if (ledYellow && doc.containsKey("distance_to_pickup") && !doc["distance_to_pickup"].isNull()) {
+    float distanceMeters = doc["distance_to_pickup"].as<float>();
+    Serial.print("Distance to pickup: ");
+    Serial.print(distanceMeters);
+    Serial.println(" meters");
     
-    if (ledRed) {
-      // Timeout (Test Case 4c & 8: No puller within 60s)
-      Serial.println("✗ Ride timed out (60s expired)");
-      errorSound();
-      oledShow("Timeout", "Try Again");
-      delay(2000);
-      resetRideState();
+    // Display distance on OLED
+    String distanceStr;
+    if (distanceMeters >= 1000) {
+      // Display in kilometers if >= 1km
+      float distanceKm = distanceMeters / 1000.0;
+      distanceStr = String(distanceKm, 1) + " KM";
+    } else {
+      // Display in meters
+      distanceStr = String((int)distanceMeters) + " M";
     }
-  } else if (httpCode > 0) {
-    String errorResponse = http.getString();
-    Serial.println("ERROR: HTTP " + String(httpCode) + " - " + errorResponse);
-  } else {
-    Serial.println("ERROR: Connection failed, code: " + String(httpCode));
+    oledShow("Puller", distanceStr);
+  } else if (ledYellow) {
+    // Fallback if distance not available
+    oledShow("Puller", "Incoming...");
   }
   
-  http.end();
+  if (ledGreen) {
+    // Pickup confirmed (Test Case 4d & 6: Yellow OFF, Green ON)
+    Serial.println("✓ Pickup confirmed!");
+    oledShow("Pickup", "Confirmed");
+    delay(2000);
+    resetRideState();
+  }
+  
+  if (ledRed) {
+    // Timeout (Test Case 4c & 8: No puller within 60s)
+    Serial.println("✗ Ride timed out (60s expired)");
+    errorSound();
+    oledShow("Timeout", "Try Again");
+    delay(2000);
+    resetRideState();
+  }
 }
 
 // Reset Ride State (Test Case 13: Reset all LEDs to idle)
@@ -440,6 +520,11 @@ void resetRideState() {
   rideRequested = false;
   pullerAssigned = false;
   currentRideId = "";
+  statusEtag = "";
+  if (statusPollInFlight) {
+    statusClient.stop();
+    statusPollInFlight = false;
+  }
   userId = "";
   presenceDetected = false;
   turnOffAllLEDs(); // Turn off all LEDs when resetting
@@ -559,10 +644,14 @@ void loop() {
     Serial.println(" ms)");
   }
 
-  // Poll ride status if ride is active
-  if (rideRequested && (millis() - lastPollTime >= POLL_INTERVAL)) {
+  // Poll ride status if ride is active - a long-poll in flight is only
+  // checked for data, so sensors and buttons keep running meanwhile
+  if (statusPollInFlight) {
+    serviceStatusPoll();
+    if (!statusPollInFlight) lastPollTime = millis();
+  } else if (rideRequested && (millis() - lastPollTime >= POLL_INTERVAL)) {
     pollRideStatus();
-    lastPollTime = millis();
+    if (!statusPollInFlight) lastPollTime = millis();
   }
 
   // If we're in an active ride state, skip normal location selection UI